@@ -0,0 +1,7 @@
+"""
+Benchmarks of the board logic and the Tk widgets on seeded, reproducible scenarios. Run from the
+repository root:
+
+    python -m benchmarks run --output results.json
+    python -m benchmarks compare baseline.json results.json
+"""
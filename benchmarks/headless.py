@@ -0,0 +1,88 @@
+"""
+Benchmarks of the board logic without any widgets. Each case is a tuple of form (name, setup, run,
+teardown, max_cells): setup(scenario) builds untimed state, run(state) is the timed part, teardown(state)
+cleans up (or is None), and scenarios with more than max_cells cells are skipped (None for no limit).
+"""
+import random
+from board import Board
+from solver import Solver
+
+def _first_click(scenario):
+    # mines are placed by the click, from the scenario's seed
+    mines, first = scenario.get_layout()
+    return (Board(scenario.rows, scenario.columns, scenario.mines, random.Random(scenario.seed)), first)
+
+def _run_first_click(state):
+    board, first = state
+    board.reveal(*board.coordinates(first))
+
+def _set_mines(scenario):
+    mines, first = scenario.get_layout()
+    return (Board(scenario.rows, scenario.columns, scenario.mines), mines)
+
+def _run_set_mines(state):
+    board, mines = state
+    board.set_mines(mines)
+
+def _flood_fill(scenario):
+    # only the fill, on a board whose mines are already placed
+    mines, first = scenario.get_layout()
+    board = Board(scenario.rows, scenario.columns, scenario.mines)
+    board.set_mines(mines)
+    return (board, first)
+
+def _run_flood_fill(state):
+    board, first = state
+    board.flood_fill(first)
+
+def _adjacent(scenario):
+    mines, first = scenario.get_layout()
+    size = scenario.rows * scenario.columns
+    cells = random.Random(scenario.seed).sample(range(size), min(size, 10000))
+    return (scenario.make_board(mines), cells)
+
+def _run_adjacent(state):
+    board, cells = state
+    for index in cells:
+        board.get_adjacent_indices(index)
+
+def _lose_scan(scenario):
+    # a game in progress with half the mines flagged and a few wrong flags
+    mines, first = scenario.get_layout()
+    board = scenario.make_board(mines)
+    board.reveal(*board.coordinates(first))
+    rng = random.Random(scenario.seed)
+    for index in rng.sample(mines, len(mines) // 2):
+        board.toggle_flag(*board.coordinates(index))
+    for attempt in range(len(mines) // 10):
+        index = rng.randrange(scenario.rows * scenario.columns)
+        if not board.is_revealed(index) and not board.is_flagged(index):
+            board.toggle_flag(*board.coordinates(index))
+    return board
+
+def _run_lose_scan(board):
+    # the board work Game.lose does: the flag summary and the mines and flags to redraw
+    board.get_flag_summary()
+    shown = [index for index in board.get_mines() if not board.is_flagged(index)]
+    wrong = [index for index in board.get_flagged() if not board.is_mine(index)]
+    return (shown, wrong)
+
+def _solver(scenario):
+    mines, first = scenario.get_layout()
+    board = scenario.make_board(mines)
+    board.reveal(*board.coordinates(first))
+    return board
+
+def _run_solver(board):
+    solver = Solver(board)
+    solver.solve()
+    solver.detach()
+
+CASES = [
+    ('first_click', _first_click, _run_first_click, None, None),
+    ('set_mines', _set_mines, _run_set_mines, None, None),
+    ('flood_fill', _flood_fill, _run_flood_fill, None, None),
+    ('adjacent', _adjacent, _run_adjacent, None, None),
+    ('lose_scan', _lose_scan, _run_lose_scan, None, None),
+    ('solve', _solver, _run_solver, None, None),
+]
@@ -0,0 +1,134 @@
+"""
+Runs the benchmark cases over the scenarios, writes the timings to JSON, and compares two result files.
+"""
+import argparse
+import json
+import platform
+import statistics
+import sys
+import time
+from benchmarks import headless, widgets
+from benchmarks.scenarios import SCENARIOS
+
+def measure(scenario, case, repeat):
+    """
+    Runs one case on one scenario repeat times, each on freshly set up state, and returns a list of the
+    timed durations in seconds. A run that takes over a second cuts the repeats short at three.
+    """
+    name, setup, run, teardown, max_cells = case
+    durations = []
+    while len(durations) < repeat and not (len(durations) >= 3 and min(durations) > 1.0):
+        state = setup(scenario)
+        start = time.perf_counter()
+        run(state)
+        durations.append(time.perf_counter() - start)
+        if teardown is not None:
+            teardown(state)
+    return durations
+
+def run_benchmarks(repeat=5, pattern=None, use_widgets=True, log=None):
+    """
+    Runs every case on every scenario it fits (those whose name contains pattern, if given) and returns
+    a results dict ready to be saved as JSON. log, if given, is called with a line for each result.
+    """
+    groups = [('headless', headless.CASES)]
+    skipped = None
+    if use_widgets:
+        if widgets.open_display() is not None:
+            groups.append(('widgets', widgets.CASES))
+        else:
+            skipped = 'no display'
+    results = {}
+    try:
+        for group, cases in groups:
+            for case in cases:
+                for scenario in SCENARIOS:
+                    key = f'{group}/{case[0]}/{scenario.name}'
+                    if pattern is not None and pattern not in key:
+                        continue
+                    if case[4] is not None and scenario.rows * scenario.columns > case[4]:
+                        continue
+                    durations = measure(scenario, case, repeat)
+                    results[key] = {
+                        'median_ms': 1000 * statistics.median(durations),
+                        'min_ms': 1000 * min(durations),
+                        'mean_ms': 1000 * statistics.fmean(durations),
+                        'runs': len(durations),
+                    }
+                    if log is not None:
+                        log(f'{key:<45} {results[key]["median_ms"]:10.3f} ms')
+    finally:
+        widgets.close_display()
+    return {
+        'meta': {
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'time': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'repeat': repeat,
+            'widgets_skipped': skipped,
+        },
+        'results': results,
+    }
+
+def compare(baseline, current, threshold=0.1, min_delta=0.05):
+    """
+    Compares two results dicts by median time. Returns a tuple of form (rows, regressions): rows is a
+    list of (key, baseline ms, current ms, ratio) for every benchmark in both, and regressions lists the
+    keys that are more than threshold (a fraction) and min_delta milliseconds slower than the baseline.
+    """
+    rows = []
+    regressions = []
+    for key, result in current['results'].items():
+        before = baseline['results'].get(key)
+        if before is None:
+            continue
+        old = before['median_ms']
+        new = result['median_ms']
+        ratio = new / old if old > 0 else float('inf')
+        rows.append((key, old, new, ratio))
+        if ratio > 1 + threshold and new - old > min_delta:
+            regressions.append(key)
+    return (rows, regressions)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m benchmarks', description='Benchmark the board logic and widgets.')
+    commands = parser.add_subparsers(dest='command', required=True)
+    run_parser = commands.add_parser('run', help='run the benchmarks and write the results to JSON')
+    run_parser.add_argument('-o', '--output', default='benchmark-results.json')
+    run_parser.add_argument('-r', '--repeat', type=int, default=5)
+    run_parser.add_argument('-k', '--filter', help='only run benchmarks whose name contains this text')
+    run_parser.add_argument('--no-widgets', action='store_true', help='skip the Tk benchmarks')
+    compare_parser = commands.add_parser('compare', help='compare results against a baseline')
+    compare_parser.add_argument('baseline')
+    compare_parser.add_argument('current')
+    compare_parser.add_argument('--threshold', type=float, default=0.1,
+                                help='fraction slower than the baseline that counts as a regression')
+    compare_parser.add_argument('--min-delta', type=float, default=0.05,
+                                help='milliseconds slower that a regression must also exceed, to ignore noise')
+    args = parser.parse_args(argv)
+
+    if args.command == 'run':
+        results = run_benchmarks(args.repeat, args.filter, not args.no_widgets, print)
+        if results['meta']['widgets_skipped'] is not None:
+            print(f"widget benchmarks skipped: {results['meta']['widgets_skipped']}")
+        with open(args.output, 'w') as file:
+            json.dump(results, file, indent=1)
+        print(f"{len(results['results'])} results written to {args.output}")
+        return 0
+
+    with open(args.baseline) as file:
+        baseline = json.load(file)
+    with open(args.current) as file:
+        current = json.load(file)
+    rows, regressions = compare(baseline, current, args.threshold, args.min_delta)
+    for key, old, new, ratio in rows:
+        flag = '  REGRESSION' if key in regressions else ''
+        print(f'{key:<45} {old:10.3f} ms -> {new:10.3f} ms  {ratio:6.2f}x{flag}')
+    missing = sorted(set(baseline['results']) - set(current['results']))
+    if len(missing) > 0:
+        print(f'{len(missing)} baseline benchmarks were not run: {", ".join(missing)}')
+    print(f'{len(regressions)} regression(s) over {100 * args.threshold:.0f}%')
+    return 1 if len(regressions) > 0 else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
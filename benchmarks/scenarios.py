@@ -0,0 +1,63 @@
+"""
+The boards every benchmark runs on. Each scenario has a fixed seed, so a benchmark sees exactly the same
+mines and clicks on every run and results from different runs can be compared.
+"""
+import random
+from board import Board, PRESETS
+
+class Scenario ():
+    """
+    A board setup: its size, number of mines and the seed its mines and clicks are drawn from.
+    """
+    def __init__(self, name, rows, columns, mines, seed) -> None:
+        self.name = name
+        self.rows = rows
+        self.columns = columns
+        self.mines = mines
+        self.seed = seed
+        self._layout = None
+
+    def get_layout(self):
+        """
+        Returns a tuple of form (mines, first index): the scenario's mine indices and a first click on a
+        cell with no adjacent mines (or the first safe cell, on boards too dense to have one), so the
+        first click opens an area. The layout is worked out once and kept.
+        """
+        if self._layout is None:
+            self._layout = self._find_layout()
+        return self._layout
+
+    def _find_layout(self):
+        rng = random.Random(self.seed)
+        mines = rng.sample(range(self.rows * self.columns), self.mines)
+        board = Board(self.rows, self.columns, self.mines)
+        board.set_mines(mines)
+        first = None
+        for index in rng.sample(range(self.rows * self.columns), min(4096, self.rows * self.columns)):
+            if not board.is_mine(index):
+                if board.get_count(index) == 0:
+                    return (mines, index)
+                if first is None:
+                    first = index
+        return (mines, first)
+
+    def make_board(self, mines):
+        """
+        Returns a new Board that places the given mines on its first reveal.
+        """
+        return Board(self.rows, self.columns, self.mines, generator=lambda board, index: mines)
+
+    def __repr__(self):
+        return f'{self.name} ({self.rows}x{self.columns}, {self.mines} mines)'
+
+# densities the large boards are run at
+DENSITIES = [0.05, 0.12, 0.2]
+
+def _make_scenarios():
+    scenarios = [Scenario(name, *PRESETS[name], seed) for seed, name in enumerate(['easy', 'medium', 'hard'])]
+    for size in [100, 500, 1000]:
+        for density in DENSITIES:
+            scenarios.append(Scenario(f'{size}x{size}@{int(100 * density)}%', size, size, int(size * size * density), size + int(100 * density)))
+    return scenarios
+
+SCENARIOS = _make_scenarios()
@@ -0,0 +1,132 @@
+"""
+Benchmarks of the Tk side: building a game's widgets, painting a large reveal, the end-of-game redraw
+and the cell-coordinate helper. Cases have the same form as in headless.py. They need a display; when
+there is none, a virtual one is started with pyvirtualdisplay if it is installed, and the cases are
+skipped otherwise.
+"""
+import random
+import tkinter as tk
+
+_root = None
+_display = None
+
+def open_display():
+    """
+    Returns a hidden Tk root window to build widgets in, or None if no display can be opened.
+    """
+    global _root, _display
+    if _root is not None:
+        return _root
+    try:
+        _root = tk.Tk()
+    except tk.TclError:
+        try:
+            from pyvirtualdisplay import Display
+        except ImportError:
+            return None
+        _display = Display(visible=False, size=(1280, 1024))
+        _display.start()
+        try:
+            _root = tk.Tk()
+        except tk.TclError:
+            return None
+    _root.withdraw()
+    return _root
+
+def close_display():
+    """
+    Destroys the root window and stops the virtual display, if one was started.
+    """
+    global _root, _display
+    if _root is not None:
+        _root.destroy()
+        _root = None
+    if _display is not None:
+        _display.stop()
+        _display = None
+
+class _Master ():
+    # stands in for the app; the benchmarks never end a game through its pop-up
+    def make_new_game(self, rows, columns, bomb_count, no_guess=False):
+        pass
+
+    def open_start_menu(self):
+        pass
+
+    def recycle_board(self, frame, grid):
+        pass
+
+def _make_game(scenario, window, board, use_canvas=None):
+    from game import Game
+    game = Game(_Master(), window, scenario.rows, scenario.columns, scenario.mines, use_canvas=use_canvas, board=board)
+    game.popup = lambda win, message: None
+    return game
+
+def _window():
+    # every case builds inside its own window, so teardown is one destroy
+    window = tk.Toplevel(_root)
+    window.withdraw()
+    return window
+
+def _teardown(state):
+    state['window'].destroy()
+
+def _build(scenario, use_canvas):
+    mines, first = scenario.get_layout()
+    return {'scenario': scenario, 'window': _window(), 'board': scenario.make_board(mines), 'use_canvas': use_canvas}
+
+def _run_build(state):
+    _make_game(state['scenario'], state['window'], state['board'], state['use_canvas'])
+    state['window'].update_idletasks()
+
+def _played(scenario):
+    # a game ready for its first click, which places the scenario's mines
+    mines, first = scenario.get_layout()
+    window = _window()
+    game = _make_game(scenario, window, scenario.make_board(mines))
+    window.update_idletasks()
+    return {'window': window, 'game': game, 'first': divmod(first, scenario.columns), 'scenario': scenario}
+
+def _run_reveal(state):
+    game = state['game']
+    game.left_click(*state['first'])
+    # large reveals are painted in slices across the event loop; the benchmark covers all of them
+    while game.is_painting():
+        _root.update()
+    state['window'].update_idletasks()
+
+def _lost(scenario):
+    # a game in progress with half the mines flagged
+    state = _played(scenario)
+    game = state['game']
+    game.left_click(*state['first'])
+    while game.is_painting():
+        _root.update()
+    mines = scenario.get_layout()[0]
+    for index in random.Random(scenario.seed).sample(mines, len(mines) // 2):
+        game.right_click(*divmod(index, scenario.columns))
+    return state
+
+def _run_lose(state):
+    state['game'].lose()
+    state['window'].update_idletasks()
+
+def _adjacent(scenario):
+    state = _played(scenario)
+    size = scenario.rows * scenario.columns
+    state['cells'] = [divmod(index, scenario.columns) for index in random.Random(scenario.seed).sample(range(size), min(size, 10000))]
+    return state
+
+def _run_adjacent(state):
+    game = state['game']
+    for row, column in state['cells']:
+        game.get_adjacent_cell_indices(row, column)
+
+CASES = [
+    ('game_build', lambda scenario: _build(scenario, None), _run_build, _teardown, None),
+    ('cell_grid_build', lambda scenario: _build(scenario, False), _run_build, _teardown, 10000),
+    ('canvas_build', lambda scenario: _build(scenario, True), _run_build, _teardown, None),
+    ('reveal_paint', _played, _run_reveal, _teardown, None),
+    ('lose', _lost, _run_lose, _teardown, None),
+    ('adjacent_cells', _adjacent, _run_adjacent, _teardown, None),
+]
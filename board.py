@@ -0,0 +1,510 @@
+import random
+from array import array
+from presets import PRESETS # kept importable from here, where the game modules look for it
+
+# layout of the state byte kept for each cell
+COUNT_MASK = 0x0F # number of adjacent mines (0-8)
+MINE = 0x10
+FLAGGED = 0x20
+REVEALED = 0x40
+
+# board statuses
+READY = 'ready' # no cell has been revealed yet (mines are not placed)
+PLAYING = 'playing'
+WON = 'won'
+LOST = 'lost'
+
+# translation tables applied to runs of state bytes
+_KEEP_FLAGS = bytes(state & (FLAGGED | REVEALED) for state in range(256)) # clear all but flagged/revealed
+_OPEN_ZERO = bytes(int(not state & (COUNT_MASK | MINE | FLAGGED | REVEALED)) for state in range(256)) # 1 for hidden zero cells
+_HIDDEN = bytes(int(not state & (FLAGGED | REVEALED)) for state in range(256)) # 1 for cells a reveal may uncover
+_MARK_REVEALED = bytes(state if state & FLAGGED else state | REVEALED for state in range(256)) # reveal unless flagged
+
+def neighbour_counts(mask, rows, columns):
+    """
+    Takes a mine mask of (rows + 2) * (columns + 2) bytes, 1 for a mine, with one cell of padding
+    around the edge, and returns bytes of rows * columns state bytes holding each inner cell's adjacent
+    mine count and MINE bit.
+    """
+    width = columns + 2
+    # Treat the padded mask as one big integer with a byte per cell. Adding shifted copies sums each
+    # cell's 3x3 neighbourhood for the whole area at once; no byte can exceed 9, so nothing carries.
+    grid = int.from_bytes(mask, 'little')
+    horizontal = grid + (grid << 8) + (grid >> 8)
+    stride = 8 * width
+    neighbourhood = horizontal + (horizontal << stride) + (horizontal >> stride)
+    # remove each cell's own mine from its count, then set the mine bit (1 * 16 = MINE)
+    combined = neighbourhood - grid + grid * MINE
+    padded = combined.to_bytes(len(mask) + width + 1, 'little')
+    return b''.join(padded[(row + 1) * width + 1:(row + 1) * width + 1 + columns] for row in range(rows))
+
+class Snapshot ():
+    """
+    The state of a board at one moment, made by Board.snapshot and put back with Board.restore. The cells
+    are kept as one bytes object of state bytes per row; a snapshot taken relative to an earlier one
+    shares every row that has not changed since, so a snapshot after a move costs memory and time for the
+    rows the move touched (plus a tuple of row references), not for the whole board. Snapshots are never
+    changed once made.
+    """
+    def __init__(self, row_states, status, revealed, flag_count, correct_flags, mines) -> None:
+        self.row_states = row_states # tuple of bytes, one per row
+        self.status = status
+        self.revealed = revealed
+        self.flag_count = flag_count
+        self.correct_flags = correct_flags
+        self.mines = mines # array of mine indices; shared with the board, which replaces it rather than changing it
+
+    def get_states(self):
+        """
+        Returns bytes of the state byte of every cell, in flat index order.
+        """
+        return b''.join(self.row_states)
+
+class BaseBoard ():
+    """
+    Headless model of a minesweeper board: the rules shared by every kind of board. Cell state is one
+    byte per cell (see the bit layout above), indexed row-major as row * columns + column, in the store
+    made by _make_cells. The board owns revealing, flagging and win/loss detection; views subscribe to
+    its change events. Subclasses place the mines (_place_mines), fill open regions (flood_fill) and
+    list the mines (get_mines); Board is the one to use unless the grid is too large to hold.
+
+    Events are delivered to listeners as listener(event, data), where data is a flat cell index except
+    for 'reveal':
+        'start'   - the first cell was revealed and mines were placed (index is the clicked cell)
+        'reveal'  - a batch of cells was revealed by one click (data is the list of their indices)
+        'flag'    - a cell was flagged
+        'unflag'  - a cell was unflagged
+        'explode' - a mine was revealed (index is the mine)
+        'win'     - all non-mine cells have been revealed (index is the last cell revealed)
+        'lose'    - the game was lost (index is the mine that was revealed)
+        'restore' - the board was put back to a snapshot (data is the list of cells whose state changed)
+    """
+    def __init__(self, rows, columns, num_bombs, rng=None, safe_radius=0) -> None:
+        if num_bombs >= rows * columns:
+            raise ValueError('The board must have at least one cell that is not a mine.')
+        if safe_radius < 0:
+            raise ValueError('The safe radius cannot be negative.')
+        self._rows = rows
+        self._columns = columns
+        self._bomb_count = num_bombs
+        self._random = rng if rng is not None else random.Random()
+        self._safe_radius = safe_radius # cells within this distance of the first click never hold a mine
+        self._cells = self._make_cells()
+        self._listeners = []
+        self._status = READY
+        # running statistics, updated as cells are flagged, unflagged and revealed
+        self._revealed = 0
+        self._flagged = set() # flat indices of flagged cells
+        self._correct_flags = 0 # flagged cells holding a mine
+
+    def _make_cells(self):
+        """
+        A private method to create the cell state store. Subclasses may return any object indexed like a
+        bytearray of rows * columns state bytes.
+        """
+        return bytearray(self._rows * self._columns)
+
+    def subscribe(self, listener):
+        """
+        Registers a callable to be notified of board changes as listener(event, data).
+        """
+        self._listeners.append(listener)
+
+    def unsubscribe(self, listener):
+        """
+        Removes a previously registered listener.
+        """
+        self._listeners.remove(listener)
+
+    def _notify(self, event, data):
+        """
+        A private method to deliver an event to every listener.
+        """
+        for listener in self._listeners:
+            listener(event, data)
+
+    def index(self, row, column):
+        """
+        Returns the flat index of the cell at the given row, column.
+        """
+        return row * self._columns + column
+
+    def coordinates(self, index):
+        """
+        Returns a tuple of form (row, column) for the given flat index.
+        """
+        return divmod(index, self._columns)
+
+    def get_rows(self):
+        return self._rows
+
+    def get_columns(self):
+        return self._columns
+
+    def get_bomb_count(self):
+        return self._bomb_count
+
+    def get_safe_radius(self):
+        return self._safe_radius
+
+    def get_status(self):
+        """
+        Returns one of READY, PLAYING, WON or LOST.
+        """
+        return self._status
+
+    def is_over(self):
+        """
+        Returns True if the game has been won or lost.
+        """
+        return self._status == WON or self._status == LOST
+
+    def get_revealed_count(self):
+        return self._revealed
+
+    def get_flag_count(self):
+        return len(self._flagged)
+
+    def get_correct_flag_count(self):
+        """
+        Returns the number of flagged cells that hold a mine (0 before the mines are placed).
+        """
+        return self._correct_flags
+
+    def get_wrong_flag_count(self):
+        """
+        Returns the number of flagged cells that do not hold a mine.
+        """
+        return len(self._flagged) - self._correct_flags
+
+    def get_remaining_mines(self):
+        """
+        Returns the number of mines minus the number of flags, as shown on a mine counter.
+        """
+        return self._bomb_count - len(self._flagged)
+
+    def get_flagged(self):
+        """
+        Returns a set of the flat indices of all flagged cells.
+        """
+        return set(self._flagged)
+
+    def get_revealed(self):
+        """
+        Returns a list of the flat indices of all revealed cells.
+        """
+        return [index for index, state in enumerate(self._cells) if state & REVEALED]
+
+    def is_mine(self, index):
+        return bool(self._cells[index] & MINE)
+
+    def is_flagged(self, index):
+        return bool(self._cells[index] & FLAGGED)
+
+    def is_revealed(self, index):
+        return bool(self._cells[index] & REVEALED)
+
+    def get_count(self, index):
+        """
+        Returns the number of mines adjacent to the cell at the given index.
+        """
+        return self._cells[index] & COUNT_MASK
+
+    def get_mines(self):
+        """
+        Returns a list of the flat indices of all mines on the board (empty before the first reveal).
+        """
+        raise NotImplementedError
+
+    def get_adjacent_indices(self, index):
+        """
+        Returns a list containing the flat indices of all cells adjacent to the cell at the given index.
+        """
+        row, column = divmod(index, self._columns)
+        adj_cells = []
+        for i in range(max(0, row-1), min(self._rows, row+2)):
+            base = i * self._columns
+            for j in range(max(0, column-1), min(self._columns, column+2)):
+                if i != row or j != column:
+                    adj_cells.append(base + j)
+        return adj_cells
+
+    def get_safe_zone(self, index):
+        """
+        Returns a list of the flat indices that are guaranteed not to hold a mine when the first click is on
+        the cell at the given index: every cell within the safe radius of it. If the zone would leave too
+        few cells for the mines, only the clicked cell is kept safe.
+        """
+        row, column = divmod(index, self._columns)
+        radius = self._safe_radius
+        zone = [i * self._columns + j
+                for i in range(max(0, row-radius), min(self._rows, row+radius+1))
+                for j in range(max(0, column-radius), min(self._columns, column+radius+1))]
+        if len(self._cells) - len(zone) < self._bomb_count:
+            return [index]
+        return zone
+
+    def _place_mines(self, safe_index):
+        """
+        A private method to place the mines, never inside the safe zone around the given cell, and set
+        the adjacent mine counts. Called by the first reveal.
+        """
+        raise NotImplementedError
+
+    def reveal(self, row, column):
+        """
+        Reveals the cell at the given row, column. The first reveal places the mines. Revealing a cell with
+        no adjacent mines also reveals its neighbours. Has no effect on flagged or revealed cells or once
+        the game is over. Returns a list of the flat indices of the newly revealed safe cells.
+        """
+        index = self.index(row, column)
+        if self.is_over() or self._cells[index] & (FLAGGED | REVEALED):
+            return []
+        if self._status == READY:
+            self._place_mines(index)
+            self._status = PLAYING
+            self._notify('start', index)
+
+        if self._cells[index] & MINE:
+            self._cells[index] |= REVEALED
+            self._status = LOST
+            self._notify('explode', index)
+            self._notify('lose', index)
+            return []
+
+        revealed = self.flood_fill(index)
+        # the revealed-cell count is updated once for the whole batch
+        self._revealed += len(revealed)
+        self._notify('reveal', revealed)
+
+        if self._revealed == len(self._cells) - self._bomb_count:
+            self._status = WON
+            self._notify('win', revealed[-1])
+        return revealed
+
+    def flood_fill(self, index):
+        """
+        Marks the safe cell at the given index as revealed and, if it has no adjacent mines, reveals the
+        connected region of zero cells and its numbered border, leaving flagged cells alone. Returns a
+        list of the flat indices of every newly revealed cell.
+        """
+        raise NotImplementedError
+
+    def toggle_flag(self, row, column):
+        """
+        Flags the cell at the given row, column, or unflags it if it is already flagged. Revealed cells
+        cannot be flagged.
+        """
+        index = self.index(row, column)
+        if self.is_over() or self._cells[index] & REVEALED:
+            return
+        self._cells[index] ^= FLAGGED
+        is_mine = self._cells[index] & MINE
+        if self._cells[index] & FLAGGED:
+            self._flagged.add(index)
+            if is_mine:
+                self._correct_flags += 1
+            self._notify('flag', index)
+        else:
+            self._flagged.discard(index)
+            if is_mine:
+                self._correct_flags -= 1
+            self._notify('unflag', index)
+
+    def get_flag_summary(self):
+        """
+        Returns a tuple of form (correct flags, incorrect flags, unflagged mines) from the running counts.
+        """
+        return (self._correct_flags, self.get_wrong_flag_count(), self._bomb_count - self._correct_flags)
+
+class Board (BaseBoard):
+    """
+    A board held whole in memory as one bytearray. Besides playing, it can be copied whole: mines can be
+    set directly (set_mines), and snapshot/restore and get_states/set_states support undo, look-ahead,
+    save and resume. A generator, if given, is a callable(board, first index) returning the mine indices
+    to use instead of random ones.
+    """
+    def __init__(self, rows, columns, num_bombs, rng=None, safe_radius=0, generator=None) -> None:
+        super().__init__(rows, columns, num_bombs, rng, safe_radius)
+        self._generator = generator
+        self._mines = array('I') # flat indices of the mines, once placed (4 bytes each, not a list of ints)
+
+    def get_states(self):
+        """
+        Returns bytes of the state byte of every cell (see the bit layout above), in flat index order.
+        """
+        return bytes(self._cells)
+
+    def get_mines(self):
+        """
+        Returns a list of the flat indices of all mines on the board (empty before the first reveal).
+        """
+        return list(self._mines)
+
+    def _place_mines(self, safe_index):
+        """
+        A private method to place the mines randomly on the board, never inside the safe zone around
+        the given cell, and to record the adjacent mine count of every cell. If the board has a generator
+        it chooses the mines instead, unless it returns None.
+        """
+        if self._generator is not None:
+            mines = self._generator(self, safe_index)
+            if mines is not None:
+                self.set_mines(mines)
+                return
+        safe = set(self.get_safe_zone(safe_index))
+        # sampling without replacement and dropping the safe cells afterwards leaves a uniformly random
+        # choice among the remaining cells, so no rejection loop is needed
+        sample = self._random.sample(range(len(self._cells)), self._bomb_count + len(safe))
+        self.set_mines([i for i in sample if i not in safe][:self._bomb_count])
+
+    def set_mines(self, mines):
+        """
+        Places mines at the given flat indices and computes the adjacent mine count of every cell in one
+        pass. Any previously placed mines and counts are discarded; flags and revealed cells are kept.
+        """
+        rows = self._rows
+        columns = self._columns
+        width = columns + 2 # one cell of padding on either side of each row so shifts never wrap
+        mask = bytearray((rows + 2) * width)
+        offset = width + 1
+        for index in mines:
+            # (row + 1) * width + column + 1, without splitting the index into row and column
+            mask[index + 2 * (index // columns) + offset] = 1
+        counts = neighbour_counts(mask, rows, columns)
+        # keep the flag/revealed bits of each cell
+        kept = bytes(self._cells).translate(_KEEP_FLAGS)
+        self._cells = bytearray((int.from_bytes(counts, 'little') | int.from_bytes(kept, 'little'))
+                                .to_bytes(len(self._cells), 'little'))
+        self._mines = array('I', mines)
+        self._correct_flags = sum(1 for index in self._flagged if self._cells[index] & MINE)
+
+    def flood_fill(self, index):
+        """
+        Marks the safe cell at the given index as revealed and, if it has no adjacent mines, reveals the
+        connected region of zero cells and its numbered border. The region is filled a row span at a time
+        (scanline) and each zero cell is expanded at most once; flagged cells are left alone.
+        Returns a list of the flat indices of every newly revealed cell.
+        """
+        cells = self._cells
+        columns = self._columns
+        rows = self._rows
+        if cells[index] & COUNT_MASK:
+            cells[index] |= REVEALED
+            return [index]
+        revealed = []
+        # per-row masks of the zero cells still to be expanded, built before anything in that row changes
+        open_rows = {}
+        row, column = divmod(index, columns)
+        open_rows[row] = cells[row * columns:(row + 1) * columns].translate(_OPEN_ZERO)
+        seeds = [(row, column)]
+        while len(seeds) > 0:
+            row, column = seeds.pop()
+            zeros = open_rows[row]
+            if not zeros[column]:
+                continue # already expanded as part of another span
+            # widen the seed to the whole run of zero cells in this row and mark it expanded
+            left = zeros.rfind(0, 0, column) + 1
+            right = zeros.find(0, column)
+            if right == -1:
+                right = columns
+            zeros[left:right] = bytes(right - left)
+            low = max(0, left - 1)
+            high = min(columns, right + 1)
+            for i in range(max(0, row-1), min(rows, row+2)):
+                if i not in open_rows:
+                    open_rows[i] = cells[i * columns:(i + 1) * columns].translate(_OPEN_ZERO)
+                # reveal the span and its border in this row
+                start = i * columns + low
+                stop = i * columns + high
+                segment = cells[start:stop]
+                hidden = segment.translate(_HIDDEN)
+                if 0 not in hidden:
+                    revealed.extend(range(start, stop))
+                elif 1 in hidden:
+                    revealed.extend([start + k for k, is_hidden in enumerate(hidden) if is_hidden])
+                else:
+                    continue
+                cells[start:stop] = segment.translate(_MARK_REVEALED)
+                # queue one seed for each run of unexpanded zero cells bordering the span
+                if i != row:
+                    neighbours = open_rows[i]
+                    position = neighbours.find(1, low, high)
+                    while position != -1:
+                        seeds.append((i, position))
+                        position = neighbours.find(0, position, high)
+                        if position == -1:
+                            break
+                        position = neighbours.find(1, position, high)
+        return revealed
+
+    def snapshot(self, previous=None, changed_rows=None):
+        """
+        Returns a Snapshot of the board. Given an earlier snapshot of this board and an iterable of the
+        rows changed since it was taken, only those rows are copied and the rest are shared with it;
+        otherwise every row is copied.
+        """
+        columns = self._columns
+        cells = self._cells
+        if previous is None or changed_rows is None:
+            row_states = tuple(bytes(cells[row * columns:(row + 1) * columns]) for row in range(self._rows))
+        else:
+            row_states = list(previous.row_states)
+            for row in changed_rows:
+                row_states[row] = bytes(cells[row * columns:(row + 1) * columns])
+            row_states = tuple(row_states)
+        return Snapshot(row_states, self._status, self._revealed, len(self._flagged), self._correct_flags, self._mines)
+
+    def restore(self, snapshot, current=None):
+        """
+        Puts the board back to the state of the given snapshot and notifies a 'restore' event with the
+        cells that changed. current may be a snapshot of the board as it is now (sharing rows with the
+        target, e.g. from the same History); then only the rows that differ between the two are compared
+        and written, otherwise every row is compared.
+        """
+        columns = self._columns
+        cells = self._cells
+        changed = []
+        for row, states in enumerate(snapshot.row_states):
+            if current is not None and states is current.row_states[row]:
+                continue
+            start = row * columns
+            old = cells[start:start + columns]
+            if old == states:
+                continue
+            cells[start:start + columns] = states
+            for column in range(columns):
+                if old[column] != states[column]:
+                    index = start + column
+                    changed.append(index)
+                    if (old[column] ^ states[column]) & FLAGGED:
+                        if states[column] & FLAGGED:
+                            self._flagged.add(index)
+                        else:
+                            self._flagged.discard(index)
+        self._status = snapshot.status
+        self._revealed = snapshot.revealed
+        self._correct_flags = snapshot.correct_flags
+        self._mines = snapshot.mines
+        self._notify('restore', changed)
+
+    def set_states(self, states):
+        """
+        Replaces the state byte of every cell with the given bytes (e.g. a saved game) and works out the
+        status, counts and mines from them. Listeners are not notified.
+        """
+        if len(states) != len(self._cells):
+            raise ValueError(f'Expected {len(self._cells)} cell states, got {len(states)}.')
+        self._cells = bytearray(states)
+        self._mines = array('I', [index for index, state in enumerate(states) if state & MINE])
+        self._flagged = {index for index, state in enumerate(states) if state & FLAGGED}
+        self._correct_flags = sum(1 for index in self._flagged if states[index] & MINE)
+        self._revealed = sum(1 for state in states if state & REVEALED and not state & MINE)
+        if any(state & MINE and state & REVEALED for state in states):
+            self._status = LOST
+        elif len(self._mines) == 0 and self._revealed == 0:
+            self._status = READY
+        elif self._revealed == len(states) - self._bomb_count:
+            self._status = WON
+        else:
+            self._status = PLAYING
@@ -1,6 +1,10 @@
 import tkinter as tk
 
 class Cell ():
+    """
+    The button displaying one cell of the board. The cell holds no game state of its own; clicks are
+    forwarded to the game and the game updates the cell's appearance in response to board events.
+    """
     def __init__(self, root, game, row, column) -> None:
         # construct button object
         self._button = tk.Button(root, image=game.get_icon('blank'), command=self.left_click)
@@ -9,105 +13,160 @@ class Cell ():
         self._game = game # reference parent game
         self._row = row
         self._column = column
-        # by default:
-        self._is_mine = False 
-        self._flagged = False
-        self._adjacent_mines = 0
-    
-    def add_adjacent_bomb(self):
-        """
-        Adds 1 to the count of adjacent mines. 
-        """
-        self._adjacent_mines += 1
+        self._active = True
+        self._changed = False # whether the button looks different from a fresh cell
+        self._background = self._button.cget('background')
 
     def left_click(self):
         """
         Event handler for left-click of a button.
         """
-        if not self._flagged and self._button is not None: # if the button is not flagged and has not been previously left-clicked
-            self._button.configure(
-                command=lambda: None,
-                relief=tk.SUNKEN,
-                background='gray64'
-            )
-            if self._is_mine:
-                self._button["image"] = self._game.get_icon('mine')
-                self._game.lose()
-            else:
-                self._game.cell_clicked(self._row, self._column)
-                if self._adjacent_mines == 0: 
-                    self._button = None
-                    self._game.zero_cell_reveals(self._row, self._column)
-                else:
-                    if self._button is not None: # this check is to avoid an error when the final cell is clicked
-                        self._button["image"] = self._game.get_icon(self._adjacent_mines)
-                        self._button = None # remove button reference to indicate button should no longer function          
+        if self._active and not self._game.is_frozen():
+            self._game.left_click(self._row, self._column)
 
     def right_click(self, event):
         """
         Event handler for right-click of a button.
         """
-        if self._flagged and self._button is not None: 
-            # unflag cell
-            self._button["image"] = self._game.get_icon('blank')
-            self._flagged = False
-        elif self._button is not None: # if the button has not been left-clicked
-            self._button["image"] = self._game.get_icon('flag')
-            self._flagged = True
-    
-    def set_bomb(self):
+        if self._active and not self._game.is_frozen():
+            self._game.right_click(self._row, self._column)
+
+    def set_icon(self, name):
+        """
+        Changes the icon shown on the button without otherwise changing its appearance.
+        """
+        self._button["image"] = self._game.get_icon(name)
+        self._changed = True
+
+    def highlight(self):
         """
-        Sets the cell to be a bomb.
+        Colours the button to point out the cell, e.g. for a hint.
         """
-        self._is_mine = True
-            
-    def reveal_adj_mines(self):
+        self._button["background"] = 'pale green'
+        self._changed = True
+
+    def shade(self, colour):
         """
-        Performs the button appearance change to reveal the number of adjacent bombs without the cell having
-        been left-clicked. This is a helper method for revealing cells adjacent to a revealed 0-value cell. 
+        Colours the background of an unrevealed button, e.g. for the probability heatmap. A colour of None
+        restores the normal background.
         """
-        # TESTING
-        #if self._is_mine:
-        #    print("ERROR! NON-0 CELL PICKED IN METHOD")
+        if self._active:
+            self._button["background"] = self._background if colour is None else colour
+            self._changed = True
+
+    def reveal(self, name):
+        """
+        Performs the button appearance change for a revealed cell, showing the given icon. The cell
+        is inactive after being revealed.
+        """
+        self._button.configure(
+            command=lambda: None,
+            relief=tk.SUNKEN,
+            background='gray64',
+            image=self._game.get_icon(name)
+        )
+        self._active = False
+        self._changed = True
+
+    def conceal(self, name):
+        """
+        Returns the button to the appearance of an unrevealed cell showing the given icon, e.g. when a
+        move is undone. The cell is active again.
+        """
+        self._button.configure(
+            command=self.left_click,
+            relief=tk.RAISED,
+            background=self._background,
+            image=self._game.get_icon(name)
+        )
+        self._active = True
+        self._changed = True
 
-        if self._button is not None:
+    def reset(self, game):
+        """
+        Returns the cell to its initial appearance and functionality for use in the given game.
+        """
+        self._game = game
+        self._active = True
+        if self._changed:
             self._button.configure(
-                command=lambda: None,
-                relief=tk.SUNKEN,
-                background='gray64',
-                image=self._game.get_icon(self._adjacent_mines)
+                command=self.left_click,
+                relief=tk.RAISED,
+                background=self._background,
+                image=game.get_icon('blank')
             )
-            self._button = None # cell should be inactive after being revealed
-    
-    def reveal_bad_cell(self):
+            self._changed = False
+
+    def destroy(self):
         """
-        Reveals an unflagged mine or an incorrectly placed flag.
+        Removes the cell's button from the window.
         """
-        if self._button is None:
-            return
-        
-        if self._is_mine:
-            self._button["image"] = self._game.get_icon('mine')
-        elif self._flagged:
-            self._button["image"] = self._game.get_icon('xflag')
+        self._button.destroy()
 
-    def get_adj_mine_count(self):
+
+class CellGrid ():
+    """
+    Renders the board as one Cell button per board cell, gridded into the given frame.
+    """
+    def __init__(self, root, game, rows, columns) -> None:
+        self._root = root
+        self._cells = []
+        self._add_cells(game, rows, columns)
+
+    def _add_cells(self, game, rows, columns):
+        """
+        A private method to create cells for every position in the given dimensions that has none yet.
+        """
+        for i in range(rows):
+            if i == len(self._cells):
+                self._cells.append([])
+            row = self._cells[i]
+            for j in range(len(row), columns):
+                row.append(Cell(self._root, game, i, j))
+
+    def reset(self, game, rows, columns):
+        """
+        Prepares the grid for a new game with the given dimensions, reusing the existing cells. Only the
+        cells outside the new dimensions are destroyed, and only the missing ones are created.
+        """
+        for row in self._cells[rows:]:
+            for cell in row:
+                cell.destroy()
+        del self._cells[rows:]
+        for row in self._cells:
+            for cell in row[columns:]:
+                cell.destroy()
+            del row[columns:]
+            for cell in row:
+                cell.reset(game)
+        self._add_cells(game, rows, columns)
+
+    def reveal(self, row, column, name):
+        """
+        Shows the cell at the given row, column as revealed with the given icon.
         """
-        Returns the number of recorded adjacent mines.
+        self._cells[row][column].reveal(name)
+
+    def conceal(self, row, column, name):
+        """
+        Shows the cell at the given row, column as unrevealed with the given icon.
         """
-        if self._button is None or self._is_mine:
-            # the mine count for this cell is irrelevant (either it is inactive or is a mine)
-            return -1 
-        return self._adjacent_mines
-    
-    def get_if_flagged(self):
+        self._cells[row][column].conceal(name)
+
+    def set_icon(self, row, column, name):
         """
-        Returns True if the cell is flagged; returns False otherwise. 
+        Changes the icon of the cell at the given row, column.
         """
-        return self._flagged
-    
-    def set_inactive(self):
+        self._cells[row][column].set_icon(name)
+
+    def highlight(self, row, column):
+        """
+        Highlights the cell at the given row, column.
+        """
+        self._cells[row][column].highlight()
+
+    def shade(self, row, column, colour):
         """
-        Sets the cell to inactive so it has no functionality if clicked. Note: no appearance change occurs.
+        Colours the background of the cell at the given row, column (None restores it).
         """
-        self._button = None
\ No newline at end of file
+        self._cells[row][column].shade(colour)
\ No newline at end of file
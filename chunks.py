@@ -0,0 +1,308 @@
+"""
+Boards too large to hold in memory. A ChunkedBoard splits the grid into square chunks whose mines are
+generated from the board's seed only when a chunk is first looked at, so a game only costs memory for
+the area that has been explored. make_board picks a plain Board or a ChunkedBoard by size.
+"""
+import random
+import zlib
+from array import array
+from collections import OrderedDict
+from board import BaseBoard, Board, neighbour_counts, COUNT_MASK, MINE, FLAGGED, REVEALED, _KEEP_FLAGS
+
+# boards with more cells than this are generated chunk by chunk
+CHUNKED_THRESHOLD = 1 << 22
+CHUNK_SIZE = 32
+# most chunks kept decoded at once; older ones are compacted or dropped
+MAX_LIVE_CHUNKS = 4096
+# most cells one click may reveal; a larger empty area is opened again by clicking its hidden edge
+FLOOD_LIMIT = 1000000
+
+# state byte of the cells of an edge chunk that lie outside the board: a flagged, revealed mine, which
+# no cell on the board can be, so they are never counted as unfinished or as played
+_OUTSIDE = MINE | FLAGGED | REVEALED
+_PLAYED = bytes(int(state != _OUTSIDE and bool(state & (FLAGGED | REVEALED))) for state in range(256))
+_UNFINISHED = bytes(int(not state & (MINE | REVEALED)) for state in range(256))
+_REVEAL_SAFE = bytes(state if state & MINE else state | REVEALED for state in range(256))
+
+def make_board(rows, columns, num_bombs, rng=None, safe_radius=0, generator=None):
+    """
+    Returns a Board, or a ChunkedBoard if the board has more than CHUNKED_THRESHOLD cells (the generator
+    is then ignored; chunked boards always place their mines from the seed).
+    """
+    if rows * columns > CHUNKED_THRESHOLD:
+        return ChunkedBoard(rows, columns, num_bombs, rng, safe_radius)
+    return Board(rows, columns, num_bombs, rng, safe_radius, generator)
+
+class _ChunkStore ():
+    """
+    Stands in for the Board's bytearray of cell states, mapping each flat index to a byte of its chunk.
+    """
+    def __init__(self, board) -> None:
+        self._board = board
+
+    def __len__(self):
+        return self._board.get_rows() * self._board.get_columns()
+
+    def __getitem__(self, index):
+        chunk, position = self._board._locate(index)
+        return chunk[position]
+
+    def __setitem__(self, index, state):
+        chunk, position = self._board._locate(index)
+        chunk[position] = state
+
+class ChunkedBoard (BaseBoard):
+    """
+    A board whose cells are kept in CHUNK_SIZE x CHUNK_SIZE chunks, generated on first use. Each chunk's
+    share of the mines is fixed by its position, so the board holds exactly num_bombs mines, and the
+    mines inside a chunk come from a random generator seeded with the board's seed and the chunk's
+    position: any chunk can be rebuilt at any time, and counts along chunk edges are found by generating
+    just the mines of the neighbouring chunks. Mines in the safe zone around the first click are moved
+    elsewhere in their chunk.
+
+    Up to MAX_LIVE_CHUNKS chunks are kept decoded, least recently used first out. An evicted chunk
+    nobody has played on is dropped, a finished chunk (every safe cell revealed) is kept as the list of
+    its flags, and any other is kept zlib-compressed. It is played like a Board, but it is never held
+    whole, so it has none of Board's whole-board operations (set_mines, snapshot and restore,
+    get_states and set_states).
+    """
+    def __init__(self, rows, columns, num_bombs, rng=None, safe_radius=0) -> None:
+        self._live = OrderedDict() # (chunk row, chunk column) -> bytearray of CHUNK_SIZE ** 2 states
+        self._compressed = {} # chunk key -> zlib-compressed states of an evicted chunk
+        self._finished = {} # chunk key -> array of flagged positions of an evicted finished chunk
+        self._mine_cache = OrderedDict() # chunk key -> list of mine positions, for edge counts
+        self._last = (None, None) # the most recently used (key, chunk), checked before the LRU
+        self._safe = () # flat indices of the safe zone, once the first cell is revealed
+        self._placed = False # chunks made before the first reveal hold no mines
+        super().__init__(rows, columns, num_bombs, rng, safe_radius)
+        self._seed = self._random.getrandbits(64)
+
+    def _make_cells(self):
+        return _ChunkStore(self)
+
+    def get_live_chunk_count(self):
+        """
+        Returns the number of chunks currently decoded in memory.
+        """
+        return len(self._live)
+
+    def get_stored_chunk_count(self):
+        """
+        Returns the number of evicted chunks kept in compact form.
+        """
+        return len(self._compressed) + len(self._finished)
+
+    def _locate(self, index):
+        """
+        A private method to return a tuple of form (chunk, position) for the given flat index, loading or
+        generating the chunk if it is not decoded.
+        """
+        row, column = divmod(index, self._columns)
+        key = (row // CHUNK_SIZE, column // CHUNK_SIZE)
+        position = row % CHUNK_SIZE * CHUNK_SIZE + column % CHUNK_SIZE
+        if self._last[0] == key:
+            return (self._last[1], position)
+        chunk = self._live.get(key)
+        if chunk is None:
+            chunk = self._load(key)
+            self._live[key] = chunk
+            if len(self._live) > MAX_LIVE_CHUNKS:
+                self._evict()
+        else:
+            self._live.move_to_end(key)
+        self._last = (key, chunk)
+        return (chunk, position)
+
+    def _chunk_shape(self, key):
+        """
+        A private method to return a tuple of form (height, width) of the chunk with the given key; chunks
+        on the bottom and right edges may be cut short by the board.
+        """
+        return (min(CHUNK_SIZE, self._rows - key[0] * CHUNK_SIZE), min(CHUNK_SIZE, self._columns - key[1] * CHUNK_SIZE))
+
+    def _chunk_mine_count(self, key):
+        """
+        A private method to return how many mines the chunk with the given key holds. Numbering the cells
+        chunk by chunk, a chunk holds the mines due to the cells up to its end minus those due before it,
+        so the counts always add up to the board's mine count.
+        """
+        chunk_row, chunk_column = key
+        height, width = self._chunk_shape(key)
+        before = chunk_row * CHUNK_SIZE * self._columns + height * chunk_column * CHUNK_SIZE
+        total = self._rows * self._columns
+        return self._bomb_count * (before + height * width) // total - self._bomb_count * before // total
+
+    def _chunk_mines(self, key):
+        """
+        A private method to return a list of the positions (row * CHUNK_SIZE + column within the chunk) of
+        the mines in the chunk with the given key. Recently used results are cached.
+        """
+        mines = self._mine_cache.get(key)
+        if mines is not None:
+            return mines
+        height, width = self._chunk_shape(key)
+        top = key[0] * CHUNK_SIZE
+        left = key[1] * CHUNK_SIZE
+        safe = set()
+        for index in self._safe:
+            row, column = divmod(index, self._columns)
+            if top <= row < top + height and left <= column < left + width:
+                safe.add((row - top) * width + column - left)
+        count = self._chunk_mine_count(key)
+        chunk_random = random.Random(f'{self._seed}:{key[0]}:{key[1]}')
+        # as in Board._place_mines, sampling extra cells and dropping the safe ones stays uniform
+        sample = chunk_random.sample(range(height * width), min(height * width, count + len(safe)))
+        mines = [cell // width * CHUNK_SIZE + cell % width for cell in sample if cell not in safe][:count]
+        self._mine_cache[key] = mines
+        if len(self._mine_cache) > 4 * MAX_LIVE_CHUNKS:
+            self._mine_cache.popitem(last=False)
+        return mines
+
+    def _generate(self, key):
+        """
+        A private method to build the states of the chunk with the given key: mines and adjacent mine
+        counts, including mines in the neighbouring chunks. Returns a bytearray of CHUNK_SIZE ** 2 states.
+        """
+        if not self._placed:
+            return self._blank(key)
+        width = CHUNK_SIZE + 2
+        mask = bytearray(width * width)
+        chunk_rows = (self._rows + CHUNK_SIZE - 1) // CHUNK_SIZE
+        chunk_columns = (self._columns + CHUNK_SIZE - 1) // CHUNK_SIZE
+        for i in range(max(0, key[0] - 1), min(chunk_rows, key[0] + 2)):
+            for j in range(max(0, key[1] - 1), min(chunk_columns, key[1] + 2)):
+                # position of this chunk's first cell inside the padded mask
+                top = (i - key[0]) * CHUNK_SIZE + 1
+                left = (j - key[1]) * CHUNK_SIZE + 1
+                for position in self._chunk_mines((i, j)):
+                    row = top + position // CHUNK_SIZE
+                    column = left + position % CHUNK_SIZE
+                    if 0 <= row < width and 0 <= column < width:
+                        mask[row * width + column] = 1
+        chunk = bytearray(neighbour_counts(mask, CHUNK_SIZE, CHUNK_SIZE))
+        self._mark_outside(key, chunk)
+        return chunk
+
+    def _blank(self, key):
+        """
+        A private method to return the states of a chunk before any mine is placed.
+        """
+        chunk = bytearray(CHUNK_SIZE * CHUNK_SIZE)
+        self._mark_outside(key, chunk)
+        return chunk
+
+    def _mark_outside(self, key, chunk):
+        """
+        A private method to mark the cells of an edge chunk that lie outside the board.
+        """
+        height, width = self._chunk_shape(key)
+        if height == CHUNK_SIZE and width == CHUNK_SIZE:
+            return
+        for row in range(CHUNK_SIZE):
+            start = row * CHUNK_SIZE + (width if row < height else 0)
+            chunk[start:(row + 1) * CHUNK_SIZE] = bytes([_OUTSIDE]) * ((row + 1) * CHUNK_SIZE - start)
+
+    def _load(self, key):
+        """
+        A private method to decode an evicted chunk, or generate it if it was never played on.
+        """
+        data = self._compressed.pop(key, None)
+        if data is not None:
+            return bytearray(zlib.decompress(data))
+        flags = self._finished.pop(key, None)
+        chunk = self._generate(key)
+        if flags is not None:
+            chunk = bytearray(chunk.translate(_REVEAL_SAFE))
+            for position in flags:
+                chunk[position] |= FLAGGED
+        return chunk
+
+    def _evict(self):
+        """
+        A private method to remove the least recently used chunk from memory, keeping what has been played
+        on it in compact form.
+        """
+        key, chunk = self._live.popitem(last=False)
+        if self._last[0] == key:
+            self._last = (None, None)
+        if 1 not in chunk.translate(_PLAYED):
+            return # nothing to keep; it is generated again if needed
+        if self._placed and 1 not in chunk.translate(_UNFINISHED):
+            self._finished[key] = array('H', [position for position, state in enumerate(chunk) if state & FLAGGED and state != _OUTSIDE])
+        else:
+            self._compressed[key] = zlib.compress(bytes(chunk))
+
+    def _place_mines(self, safe_index):
+        """
+        A private method to fix the safe zone around the given cell and give the mines to every chunk
+        already created (which so far only hold flags). Other chunks get their mines when first used.
+        """
+        self._safe = tuple(self.get_safe_zone(safe_index))
+        self._placed = True
+        played = list(self._live.items()) + [(key, bytearray(zlib.decompress(data))) for key, data in self._compressed.items()]
+        self._live.clear()
+        self._compressed.clear()
+        self._last = (None, None)
+        for key, chunk in played:
+            mined = self._generate(key)
+            kept = chunk.translate(_KEEP_FLAGS)
+            self._live[key] = bytearray(state | flags for state, flags in zip(mined, kept))
+        self._correct_flags = sum(1 for index in self._flagged if self._cells[index] & MINE)
+
+    def get_mines(self):
+        """
+        Returns a list of the flat indices of the mines in every chunk held, decoded or stored; chunks
+        evicted with nothing played on them are dropped, so their mines are left out.
+        """
+        mines = []
+        if not self._placed:
+            return mines
+        for key in list(self._live) + list(self._compressed) + list(self._finished):
+            top = key[0] * CHUNK_SIZE
+            left = key[1] * CHUNK_SIZE
+            for position in self._chunk_mines(key):
+                mines.append((top + position // CHUNK_SIZE) * self._columns + left + position % CHUNK_SIZE)
+        return mines
+
+    def get_revealed(self):
+        """
+        Returns a list of the flat indices of all revealed cells.
+        """
+        revealed = []
+        for key in list(self._live) + list(self._compressed) + list(self._finished):
+            chunk = self._live.get(key)
+            if chunk is None:
+                chunk = self._load(key)
+                self._live[key] = chunk # kept decoded; get_revealed is only used when setting up
+            top = key[0] * CHUNK_SIZE
+            left = key[1] * CHUNK_SIZE
+            height, width = self._chunk_shape(key)
+            for position, state in enumerate(chunk):
+                row, column = divmod(position, CHUNK_SIZE)
+                if state & REVEALED and row < height and column < width:
+                    revealed.append((top + row) * self._columns + left + column)
+        return revealed
+
+    def flood_fill(self, index):
+        """
+        Marks the safe cell at the given index as revealed and, if it has no adjacent mines, reveals the
+        connected region of zero cells and its numbered border, crossing chunk edges as needed. At most
+        FLOOD_LIMIT cells are revealed; zero cells past the limit keep their neighbours hidden.
+        Returns a list of the flat indices of every newly revealed cell.
+        """
+        cells = self._cells
+        cells[index] |= REVEALED
+        revealed = [index]
+        if cells[index] & COUNT_MASK:
+            return revealed
+        queue = [index]
+        while len(queue) > 0 and len(revealed) < FLOOD_LIMIT:
+            for adj in self.get_adjacent_indices(queue.pop()):
+                state = cells[adj]
+                if state & (FLAGGED | REVEALED):
+                    continue
+                cells[adj] = state | REVEALED
+                revealed.append(adj)
+                if not state & COUNT_MASK:
+                    queue.append(adj)
+        return revealed
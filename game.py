@@ -1,12 +1,45 @@
 import tkinter as tk
-from stopwatch import Timer
-from cells import Cell
 import random
-import os
-import sys
+import time
+from collections import deque
+from stopwatch import Timer
+from cells import CellGrid
+from renderer import CanvasGrid
+from iconCache import get_icon_cache
+from board import Board, READY, PLAYING
+from chunks import make_board, ChunkedBoard, CHUNKED_THRESHOLD
+from solver import Solver
+from probability import ProbabilityEngine
+from generator import generate_no_guess, NO_GUESS_SAFE_RADIUS
+from replay import Recorder, REVEAL, FLAG, UNDO, REDO
+from history import History, save_game
+from stats import setup_name
+from ioerrors import report_write_error
+
+# boards with more cells than this are drawn on a canvas instead of with one button per cell
+CANVAS_THRESHOLD = 1000
+# milliseconds between moves while auto-playing
+AUTO_PLAY_DELAY = 100
+# reveals of up to this many cells are painted straight away; larger ones are painted in slices
+PAINT_AT_ONCE = 256
+# milliseconds of painting per slice, leaving the rest of each frame for input and redrawing
+PAINT_BUDGET = 12
+# moves that can be undone
+UNDO_LIMIT = 500
 
 class Game ():
-    def __init__(self, master, root, rows, columns, num_bombs) -> None:
+    def __init__(self, master, root, rows, columns, num_bombs, use_canvas=None, recycled=None, no_guess=False,
+                 board=None, record_to=None, elapsed=0.0, save_to=None, stats=None) -> None:
+        """
+        recycled may be a (frame, grid) pair left over from a previous game; a button grid is reset and
+        reused instead of building every cell again. A no_guess game places its mines so the board can
+        be solved from the first click without guessing. board may be a ready Board to play on (e.g.
+        one set up by a replay), and record_to the path of a replay archive to record the game to.
+        A board already being played is a resumed game, whose clock carries on from elapsed seconds.
+        save_to is the path the Save button writes the game to (no button without it), and stats a
+        function returning the StatsStore the result is recorded in. It is only called when the game
+        ends, so the statistics database is not opened before a result needs it.
+        """
         # maintain reference to App 
         self._master = master
         # reference to main window
@@ -16,159 +49,437 @@ class Game ():
         time_label = self._timer.get_label()
         time_label['font'] = ('Yu Gothic Medium', '16')
         time_label.pack()
-        # set up grid of cells
-        self._frame = tk.Frame(self._root, padx=20, pady=20)
-        self._frame.pack()
-        self._icons = {}
-        self._init_icons()
-        self._cells = []
+        # hint and auto-play controls
+        self._controls = tk.Frame(self._root)
+        self._controls.pack()
+        hint_button = tk.Button(self._controls, text='Hint', command=self.hint)
+        hint_button.pack(side=tk.LEFT)
+        self._auto_button = tk.Button(self._controls, text='Auto-play', command=self.toggle_auto_play)
+        self._auto_button.pack(side=tk.LEFT)
+        self._auto_playing = False
+        self._heatmap_button = tk.Button(self._controls, text='Probabilities', command=self.toggle_heatmap)
+        self._heatmap_button.pack(side=tk.LEFT)
+        self._heatmap_label = tk.Label(self._controls, text='')
+        self._heatmap_label.pack(side=tk.LEFT)
+        self._undo_button = tk.Button(self._controls, text='Undo', command=self.undo)
+        self._undo_button.pack(side=tk.LEFT)
+        self._redo_button = tk.Button(self._controls, text='Redo', command=self.redo)
+        self._redo_button.pack(side=tk.LEFT)
+        self._save_to = save_to
+        self._save_button = None
+        if save_to is not None:
+            self._save_button = tk.Button(self._controls, text='Save', command=self.save)
+            self._save_button.pack(side=tk.LEFT)
+        self._root.bind('<Control-z>', self.undo)
+        self._root.bind('<Control-y>', self.redo)
+        self._heatmap = False
+        self._heatmap_pending = False
+        self._shaded = set() # flat indices of cells currently shaded by the heatmap
+        # icons are decoded once per interpreter and shared by every game
+        self._icons = get_icon_cache(self._root)
+        self._icons.preload()
         self._bomb_count = num_bombs # number of bombs to place on the board
         self._rows = rows
         self._columns = columns
-        self._bombs = []
-        self._clicked_cells = 0
-        for i in range(self._rows):
-            row = []
-            for j in range(self._columns):
-                row.append(Cell(self._frame, self, i, j))
-            self._cells.append(row)
-
-    def _init_icons(self):
-        """
-        Initializes all icons for later display on cells.
-        """
-        self._icons['blank'] = tk.PhotoImage(file=self.resource_path('icons/blank.png')).subsample(3)
-        self._icons['mine'] = tk.PhotoImage(file=self.resource_path('icons/mine.png')).subsample(3)
-        self._icons['flag'] = tk.PhotoImage(file=self.resource_path('icons/flag.png')).subsample(3)
-        self._icons['xflag'] = tk.PhotoImage(file=self.resource_path('icons/xflag.png')).subsample(3)
-        self._icons[1] = tk.PhotoImage(file=self.resource_path('icons/1.png')).subsample(3)
-        self._icons[2] = tk.PhotoImage(file=self.resource_path('icons/2.png')).subsample(3)
-        self._icons[3] = tk.PhotoImage(file=self.resource_path('icons/3.png')).subsample(3)
-        self._icons[4] = tk.PhotoImage(file=self.resource_path('icons/4.png')).subsample(3)
-        self._icons[5] = tk.PhotoImage(file=self.resource_path('icons/5.png')).subsample(3)
-        self._icons[6] = tk.PhotoImage(file=self.resource_path('icons/6.png')).subsample(3)
-        self._icons[7] = tk.PhotoImage(file=self.resource_path('icons/7.png')).subsample(3)
-        self._icons[8] = tk.PhotoImage(file=self.resource_path('icons/8.png')).subsample(3)
-        self._icons[9] = tk.PhotoImage(file=self.resource_path('icons/9.png')).subsample(3)
-    
-    def resource_path(self, relative_path):
-        """ 
-        Get absolute path to resource, works for dev and for PyInstaller 
-        * NOTE: This method is not original code. It is courtesy of the 
-        following fourm post to help with bundling required files into a
-        single executable. 
-        https://stackoverflow.com/a/13790741/
+        # no-guess generation searches the whole board, so huge boards are always random
+        self._no_guess = no_guess = no_guess and rows * columns <= CHUNKED_THRESHOLD
+        # all game state lives in the board; the cells only display it
+        self._recorder = None
+        self._stats = stats # opens the statistics store when called
+        self._seed = None # the seed the mines are placed from, when known
+        self._clicks = 0
+        if board is not None:
+            self._board = board
+        else:
+            # the mines are placed from a recorded seed so the game can be replayed
+            seed = self._seed = random.getrandbits(63)
+            safe_radius = NO_GUESS_SAFE_RADIUS if no_guess else 0
+            generator = self._no_guess_mines if no_guess else None
+            self._board = make_board(rows, columns, num_bombs, random.Random(seed), safe_radius, generator)
+            if record_to is not None:
+                self._recorder = Recorder(record_to, rows, columns, num_bombs, safe_radius, seed)
+        if not isinstance(self._board, Board):
+            # a chunked board: exact probabilities need every hidden cell of the board; there are too many
+            self._heatmap_button['state'] = tk.DISABLED
+            # and it is too large to snapshot for undo
+            self._undo_button['state'] = tk.DISABLED
+            self._redo_button['state'] = tk.DISABLED
+            # or to save
+            if self._save_button is not None:
+                self._save_button['state'] = tk.DISABLED
+            self._history = None
+        else:
+            self._history = History(self._board, UNDO_LIMIT)
+        self._board.subscribe(self._on_board_event)
+        self._solver = Solver(self._board)
+        self._probabilities = ProbabilityEngine(self._board, self._solver)
+        self._frozen = False
+        # revealed cells not painted yet: lists of flat indices, and the position reached in the first
+        self._paint_queue = deque()
+        self._paint_position = 0
+        self._after_painting = [] # callables to run once the queue is empty
+        # set up grid of cells
+        if use_canvas is None:
+            use_canvas = rows * columns > CANVAS_THRESHOLD
+        if recycled is not None and not use_canvas and isinstance(recycled[1], CellGrid):
+            self._frame, self._grid = recycled
+            self._frame.pack()
+            self._grid.reset(self, rows, columns)
+        else:
+            if recycled is not None:
+                recycled[0].destroy()
+            self._frame = tk.Frame(self._root, padx=20, pady=20)
+            self._frame.pack()
+            if use_canvas:
+                self._grid = CanvasGrid(self._frame, self, rows, columns)
+                if isinstance(self._board, ChunkedBoard):
+                    # a huge board is played from the middle, where auto-play opens it
+                    self._grid.center_on(rows // 2, columns // 2)
+            else:
+                self._grid = CellGrid(self._frame, self, rows, columns)
+        if self._board.get_status() == PLAYING:
+            # a resumed game: show the cells played so far and carry on the clock
+            for index in self._board.get_flagged():
+                self._grid.set_icon(*self._board.coordinates(index), 'flag')
+            self.zero_cell_reveals(self._board.get_revealed())
+            self._timer.start(elapsed)
+
+    def _no_guess_mines(self, board, first_index):
         """
-        try:
-            # PyInstaller creates a temp folder and stores path in _MEIPASS
-            base_path = sys._MEIPASS
-        except Exception:
-            base_path = os.path.abspath(".")
+        Returns the mines for a no-guess board with the given first click: a ready board from the pool
+        if there is one, otherwise one generated now. Returns None (random mines) if generation fails.
+        """
+        mines = self._master.get_no_guess_pool().take(self._rows, self._columns, self._bomb_count, first_index)
+        if mines is None:
+            mines = generate_no_guess(self._rows, self._columns, self._bomb_count, first_index)
+        return mines
+
+    def get_root(self):
+        """
+        Returns the window the game is shown in.
+        """
+        return self._root
+
+    def get_board(self):
+        """
+        Returns the board the game is played on.
+        """
+        return self._board
 
-        return os.path.join(base_path, relative_path)
-    
     def get_icon(self, name):
         """
-        Takes one of the following strings: 'mine', 'flag', 'blank'
+        Takes one of the following strings: 'mine', 'flag', 'xflag', 'blank'
         or an integer 0-8 and returns the PhotoImage icon.
         Note that 0 is equivalent to 'blank'.
         """
-        if name == 0:
-            name = 'blank'
-        return self._icons[name]
+        return self._icons.get(name)
 
-    def _start_game(self, row, column):
+    def left_click(self, row, column):
         """
-        Triggers the start of the game by starting the game's timer and placing bombs on the board.
+        Reveals the cell at the given row, column on the board.
         """
-        # start timer
-        self._timer.start()
-        # place [bomb_count] number of bombs randomly on board
-        for i in range(self._bomb_count):
-            bomb_location = (random.randint(0, self._rows - 1), random.randint(0, self._columns - 1))
-            while bomb_location in self._bombs or bomb_location == (row, column):
-                bomb_location = (random.randint(0, self._rows - 1), random.randint(0,self._columns - 1))
-            self._bombs.append(bomb_location)
-            self._cells[bomb_location[0]][bomb_location[1]].set_bomb()
-            # update the adjacent bomb count for all adjacent cells
-            self.add_adjacent_bombs(bomb_location[0], bomb_location[1]) 
+        self._clicks += 1
+        if self._recorder is not None:
+            self._recorder.record(REVEAL, row, column)
+        ready = self._board.get_status() == READY
+        self._board.reveal(row, column)
+        self._checkpoint(ready)
+
+    def right_click(self, row, column):
+        """
+        Flags or unflags the cell at the given row, column on the board.
+        """
+        self._clicks += 1
+        if self._recorder is not None:
+            self._recorder.record(FLAG, row, column)
+        ready = self._board.get_status() == READY
+        self._board.toggle_flag(row, column)
+        self._checkpoint(ready)
+
+    def _checkpoint(self, was_ready):
+        """
+        A private method to add the move just made to the undo history. The first click, which places the
+        mines, starts the history over so it is never undone.
+        """
+        if self._history is None:
+            return
+        if was_ready and self._board.get_status() != READY:
+            self._history.reset()
+        else:
+            self._history.checkpoint()
+
+    def undo(self, event=None):
+        """
+        Takes back the last move while the game is being played. Rings the bell if there is none.
+        """
+        self._step(True)
+
+    def redo(self, event=None):
+        """
+        Makes the last move taken back again, unless another move has been made since.
+        """
+        self._step(False)
+
+    def _step(self, back):
+        """
+        A private method to undo (back) or redo a move, once the cells of earlier moves are painted.
+        """
+        if self.is_painting():
+            self.when_painted(lambda: self._step(back))
+            return
+        history = self._history
+        if history is None or self._frozen or not (history.undo() if back else history.redo()):
+            self._root.bell()
+            return
+        if self._auto_playing:
+            self.toggle_auto_play()
+        if self._recorder is not None:
+            self._recorder.record(UNDO if back else REDO, 0, 0)
+
+    def save(self):
+        """
+        Saves the game being played so it can be resumed from the start menu, and returns to the menu.
+        """
+        if self._frozen or self._history is None or self._board.get_status() != PLAYING or self.is_painting():
+            self._root.bell()
+            return
+        try:
+            save_game(self._save_to, self._board, self._timer.get_elapsed())
+        except OSError:
+            self._root.bell()
+            return
+        self._timer.stop()
+        # the game is not over, so it is not added to the replays
+        self._recorder = None
+        self.deactivate_board()
+        self._close()
+        self._master.open_start_menu()
+
+    def hint(self):
+        """
+        Highlights a cell the solver proves is safe. If no cell is certainly safe, flags a cell that is
+        certainly a mine instead; if nothing is certain, rings the bell.
+        """
+        if self._frozen:
+            return
+        move = self._solver.next_move()
+        if move is None:
+            self._root.bell()
+            return
+        action, index = move
+        row, column = self._board.coordinates(index)
+        if action == 'reveal':
+            self._grid.highlight(row, column)
+        else:
+            self.right_click(row, column)
+
+    def toggle_auto_play(self):
+        """
+        Starts or stops auto-play, which plays the solver's certain moves one after another.
+        """
+        self._auto_playing = not self._auto_playing
+        self._auto_button['relief'] = tk.SUNKEN if self._auto_playing else tk.RAISED
+        if self._auto_playing:
+            self._auto_play_step()
+
+    def _auto_play_step(self):
+        """
+        A private method to play one certain move and schedule the next. Auto-play opens the game in the
+        centre of the board and stops when the game ends or no move is certain.
+        """
+        if not self._auto_playing or self._frozen:
+            return
+        if self._board.get_status() == READY:
+            move = ('reveal', self._board.index(self._rows // 2, self._columns // 2))
+        else:
+            move = self._solver.next_move()
+        if move is None:
+            self._root.bell()
+            self.toggle_auto_play()
+            return
+        action, index = move
+        row, column = self._board.coordinates(index)
+        if action == 'reveal':
+            self.left_click(row, column)
+        else:
+            self.right_click(row, column)
+        self._root.after(AUTO_PLAY_DELAY, self._auto_play_step)
+
+    def toggle_heatmap(self):
+        """
+        Shows or hides the probability heatmap, which shades each hidden cell bordering a revealed number
+        from green (certainly safe) to red (certainly a mine) and shows the probability for all other
+        hidden cells next to the button.
+        """
+        self._heatmap = not self._heatmap
+        self._heatmap_button['relief'] = tk.SUNKEN if self._heatmap else tk.RAISED
+        if self._heatmap:
+            self._update_heatmap()
+        else:
+            self._clear_heatmap()
+
+    def _schedule_heatmap(self):
+        """
+        A private method to recompute the heatmap once the current batch of board changes is handled.
+        """
+        if self._heatmap and not self._heatmap_pending:
+            self._heatmap_pending = True
+            self._root.after_idle(self._update_heatmap)
+
+    def _update_heatmap(self):
+        """
+        A private method to recompute the mine probabilities and shade the cells with them.
+        """
+        self._heatmap_pending = False
+        if not self._heatmap or self._board.is_over():
+            return
+        self._clear_heatmap()
+        if self._board.get_status() == READY:
+            return
+        probabilities, other = self._probabilities.compute()
+        for index, probability in probabilities.items():
+            if not self._board.is_revealed(index):
+                row, column = self._board.coordinates(index)
+                self._grid.shade(row, column, _heat_colour(probability))
+                self._shaded.add(index)
+        # with no hidden cells away from the numbers there is nothing to report
+        self._heatmap_label['text'] = f'Other cells: {100 * other:.1f}%' if other is not None else ''
+
+    def _clear_heatmap(self):
+        """
+        A private method to remove the heatmap shading from every cell.
+        """
+        for index in self._shaded:
+            row, column = self._board.coordinates(index)
+            self._grid.shade(row, column, None)
+        self._shaded = set()
+        self._heatmap_label['text'] = ''
+
+    def _on_board_event(self, event, data):
+        """
+        Updates the cells, timer and pop-ups to reflect a change on the board.
+        """
+        self._schedule_heatmap()
+        if event == 'reveal':
+            self.zero_cell_reveals(data)
+            return
+        if event == 'restore':
+            # repaint the cells an undo or redo changed
+            board = self._board
+            for index in data:
+                row, column = board.coordinates(index)
+                if board.is_revealed(index):
+                    self._grid.reveal(row, column, 'mine' if board.is_mine(index) else board.get_count(index))
+                else:
+                    self._grid.conceal(row, column, 'flag' if board.is_flagged(index) else 'blank')
+            return
+        index = data
+        row, column = self._board.coordinates(index)
+        if event == 'flag':
+            self._grid.set_icon(row, column, 'flag')
+        elif event == 'unflag':
+            self._grid.set_icon(row, column, 'blank')
+        elif event == 'explode':
+            self._grid.reveal(row, column, 'mine')
+        elif event == 'start':
+            # start timer
+            self._timer.start()
+            if self._recorder is not None and self._no_guess:
+                # no-guess mines come from the pool, not the seed, so they are stored with the replay
+                self._recorder.set_layout(self._board.get_mines())
+        elif event == 'win' or event == 'lose':
+            # stop the clock and take no more input now; the pop-up waits for the last cells to be painted
+            self._timer.stop()
+            self._frozen = True
+            self.when_painted(self.win if event == 'win' else self.lose)
+
+    def zero_cell_reveals(self, revealed):
+        """
+        Renders a batch of cells revealed by one click (the clicked cell plus, for a cell with 0 adjacent
+        bombs, the whole region flood-filled by the board). A small batch is painted at once; a large one
+        is queued and painted in slices of PAINT_BUDGET milliseconds, so the window keeps responding.
+        The board is already up to date, so clicks on cells still waiting to be painted are ignored by it.
+        """
+        if len(self._paint_queue) == 0 and len(revealed) <= PAINT_AT_ONCE:
+            board = self._board
+            grid = self._grid
+            columns = self._columns
+            for index in revealed:
+                grid.reveal(index // columns, index % columns, board.get_count(index))
+            return
+        self._paint_queue.append(revealed)
+        if len(self._paint_queue) == 1:
+            self._paint_slice()
+
+    def _paint_slice(self):
+        """
+        A private method to paint queued cells until the time budget is used up, then schedule the next
+        slice. Runs the callables waiting on painting once the queue is empty.
+        """
+        board = self._board
+        grid = self._grid
+        columns = self._columns
+        deadline = time.perf_counter() + PAINT_BUDGET / 1000
+        while len(self._paint_queue) > 0 and time.perf_counter() < deadline:
+            batch = self._paint_queue[0]
+            stop = min(len(batch), self._paint_position + 64) # check the clock every 64 cells
+            for index in batch[self._paint_position:stop]:
+                grid.reveal(index // columns, index % columns, board.get_count(index))
+            self._paint_position = stop
+            if stop == len(batch):
+                self._paint_queue.popleft()
+                self._paint_position = 0
+        if len(self._paint_queue) > 0:
+            self._root.after(1, self._paint_slice)
+            return
+        waiting = self._after_painting
+        self._after_painting = []
+        for callback in waiting:
+            callback()
+
+    def is_painting(self):
+        """
+        Returns True while revealed cells are still waiting to be painted.
+        """
+        return len(self._paint_queue) > 0
+
+    def when_painted(self, callback):
+        """
+        Runs the given callable once every revealed cell has been painted (at once if none is waiting).
+        """
+        if self.is_painting():
+            self._after_painting.append(callback)
+        else:
+            callback()
 
-            # TESTING
-            #print(bomb_location) 
-    
-    def add_adjacent_bombs(self, row, column):
-        """
-        Adds 1 to the adjacent bomb count for all cells adjacent to the cell at the given row, column.
-        """
-        adj_cells = self.get_adjacent_cell_indices(row,column)
-        for (i,j) in adj_cells:
-            self._cells[i][j].add_adjacent_bomb()
-
-    def cell_clicked(self, row, column):
-        """
-        Should be called when a non-bomb cell is clicked. Updates the count of selected cells and triggers
-        game start (if first cell clicked) or win state (if all non-bomb cells clicked).
-        """
-        self._clicked_cells += 1
-        if self._clicked_cells == 1:
-            self._start_game(row, column)
-        elif self._clicked_cells == (self._rows * self._columns) - self._bomb_count: # all non-bomb cells clicked
-            # TESTING
-            print(f'Final cell: ', row, ' ', column)
-            
-            self._cells[row][column].reveal_adj_mines()
-            self.win()
-        
-        # TESTING
-        #if self._clicked_cells % 10 == 0:
-        #    print(self._clicked_cells)
-    
-    def zero_cell_reveals(self, row, column):
-        """
-        Reveals all cells adjacent to the cell at the given row, column. If any of the revealed
-        cells have 0 adjacent mines, those also have all adjacent cells revealed. 
-        Note that the given row, column should correspond to a cell with 0 adjacent bombs.
-        """
-        zero_cells = [(row, column)]
-        while len(zero_cells) > 0:
-            zero_cell = zero_cells.pop() # remove a zero cell from the list
-            adj_cells = self.get_adjacent_cell_indices(zero_cell[0], zero_cell[1])
-            for (i,j) in adj_cells:
-                if self._cells[i][j].get_adj_mine_count() == 0:
-                    zero_cells.append((i,j))
-                if self._cells[i][j].get_adj_mine_count() >= 0:
-                    self._cells[i][j].reveal_adj_mines()
-                    self.cell_clicked(i,j)
-        
     def get_adjacent_cell_indices(self, row, column):
         """
         Returns a list of tuples in form (row, column) containing the indices of all
         adjacent cells on the board to the cell at the given row, column.
         """
-        adj_cells = []
-        for i in range(max(0, row-1), min(self._rows, row+2)):
-            for j in range(max(0, column-1), min(self._columns, column+2)):
-                if (i,j) != (row, column):
-                    adj_cells.append((i,j))
-        
-        return adj_cells
+        return [self._board.coordinates(i) for i in self._board.get_adjacent_indices(self._board.index(row, column))]
 
     def win(self):
         """
         Performs the win-state functions of the game, including stopping the timer, making all cells inactive,
         and showing win-state info in a pop-up.
         """
-        self._timer.stop()
+        if self._timer.is_active():
+            self._timer.stop()
         # set all cells to inactive
         self.deactivate_board()
+        best = self._save_result(True)
         # call pop-up
         final_time = self._timer.get_final_time()
+        seconds = final_time[1] + "." + final_time[2]
         if final_time[0] == "00":
-            win_message = "You won in "+ final_time[1]+ " seconds. \n Play again?"
+            win_message = "You won in "+ seconds+ " seconds. \n Play again?"
         elif final_time[0] == "01":
-            win_message = "You won in " + final_time[0]+ " minute and "+ final_time[1]+ " seconds. \n Play again?"
+            win_message = "You won in " + final_time[0]+ " minute and "+ seconds+ " seconds. \n Play again?"
         else:
-            win_message = "You won in " + final_time[0]+ " minutes and "+ final_time[1]+ " seconds. \n Play again?"
+            win_message = "You won in " + final_time[0]+ " minutes and "+ seconds+ " seconds. \n Play again?"
+        if self._stats is not None and (best is None or self._get_duration_ms() < best):
+            win_message = "New best time!\n" + win_message
         self.popup(True, win_message)
 
     def lose(self):
@@ -176,33 +487,26 @@ class Game ():
         Performs the lose-state functions of the game, including stopping the timer, making all cells inactive,
         showing all remaining bombs on the board, and showing lose-state info in a pop-up.
         """
-        self._timer.stop()
+        if self._timer.is_active():
+            self._timer.stop()
         # perform lose-state actions
 
-        # compile game info
-        correct_flags = 0
-        incorrect_flags = 0
-        unflagged_bombs = 0
-        for i in range(self._rows):
-            for j in range(self._columns):
-                if (i,j) in self._bombs:
-                    if self._cells[i][j].get_if_flagged():
-                        # cell is a bomb and was flagged
-                        correct_flags += 1
-                    else:
-                        # cell is a bomb and was NOT flagged
-                        unflagged_bombs += 1
-                        # reveal bomb
-                        self._cells[i][j].reveal_bad_cell()
-
-                elif self._cells[i][j].get_if_flagged():
-                    # cell is not a bomb and is flagged
-                    incorrect_flags += 1
-                    # mark flag as incorrect
-                    self._cells[i][j].reveal_bad_cell()
-        
+        # game info is kept up to date by the board as the game is played
+        correct_flags, incorrect_flags, unflagged_bombs = self._board.get_flag_summary()
+        for index in self._board.get_mines():
+            if not self._board.is_flagged(index):
+                # reveal bomb
+                row, column = self._board.coordinates(index)
+                self._grid.set_icon(row, column, 'mine')
+        for index in self._board.get_flagged():
+            if not self._board.is_mine(index):
+                # mark flag as incorrect
+                row, column = self._board.coordinates(index)
+                self._grid.set_icon(row, column, 'xflag')
+
         # set all cells to inactive
         self.deactivate_board()
+        self._save_result(False)
 
         # call pop-up
         message = ("OOPS, you clicked on a mine!\n"
@@ -210,13 +514,48 @@ class Game ():
         f" missed {unflagged_bombs} bomb(s) on the board.\n Play again?")
         self.popup(False, message)
     
+    def _get_duration_ms(self):
+        """
+        A private method to return how long the game took in milliseconds.
+        """
+        return self._timer.get_elapsed_ms()
+
+    def _save_result(self, won):
+        """
+        A private method to record the finished game in the statistics, if the game has a store. Returns
+        the best time for the board setup from before this game (None if there was none). The store
+        writes on its own thread, so this does not wait on the disk.
+        """
+        if self._stats is None:
+            return None
+        setup = setup_name(self._rows, self._columns, self._bomb_count)
+        store = self._stats()
+        best = store.get_best_time(setup)
+        store.record(self._rows, self._columns, self._bomb_count, won, self._get_duration_ms(), self._clicks,
+                     self._board.get_correct_flag_count(), self._board.get_wrong_flag_count(), self._seed,
+                     self._no_guess)
+        return best
+
     def deactivate_board(self):
         """
         Deactivates all cells on the board so they are no longer function when left/right clicked.
+        The cells check this one flag rather than each being deactivated.
+        """
+        self._frozen = True
+        self._auto_playing = False
+        self._clear_heatmap()
+        if self._recorder is not None:
+            try:
+                self._recorder.finish()
+            except OSError as error:
+                report_write_error('replays', error)
+            self._recorder = None
+
+    def is_frozen(self):
+        """
+        Returns True once the board has been deactivated at the end of the game.
         """
-        for row in self._cells:
-            for cell in row:
-                cell.set_inactive()
+        return self._frozen
 
     def popup(self, win, message):
         """
@@ -246,7 +585,7 @@ class Game ():
         Ends the pop-up window and the current game before starting a new game.
         """
         self.end_game(popup, False)
-        self._master.make_new_game(self._rows, self._columns, self._bomb_count)
+        self._master.make_new_game(self._rows, self._columns, self._bomb_count, no_guess=self._no_guess)
     
     def return_to_menu(self, popup):
         """
@@ -264,5 +603,24 @@ class Game ():
         if close_root_window:
             self._root.destroy()
         else:
-            self._timer.get_label().destroy()
-            self._frame.destroy()
\ No newline at end of file
+            self._close()
+
+    def _close(self):
+        """
+        A private method to remove the game's content from the root window, keeping the board widgets
+        around so the next game can reuse them.
+        """
+        self._root.unbind('<Control-z>')
+        self._root.unbind('<Control-y>')
+        self._timer.get_label().destroy()
+        self._controls.destroy()
+        self._frame.pack_forget()
+        self._master.recycle_board(self._frame, self._grid)
+
+def _heat_colour(probability):
+    """
+    Returns a colour from green (probability 0) through yellow to red (probability 1).
+    """
+    red = int(255 * min(1.0, 2 * probability))
+    green = int(255 * min(1.0, 2 * (1 - probability)))
+    return f'#{red:02x}{green:02x}40'
\ No newline at end of file
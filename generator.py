@@ -0,0 +1,305 @@
+"""
+Generation of no-guess boards: boards that the deterministic solver can clear from the first click
+without ever guessing. Because a search can take a while, a BoardPool keeps ready boards for each board
+setup, filled by background worker processes and saved to a compact file between runs.
+"""
+import concurrent.futures
+import os
+import random
+import struct
+import threading
+from board import Board, WON
+from solver import Solver
+from ioerrors import report_write_error
+
+# the safe zone used for no-guess boards; the first click always opens an area
+NO_GUESS_SAFE_RADIUS = 1
+
+def solve_from(rows, columns, mines, first_index, safe_radius=NO_GUESS_SAFE_RADIUS):
+    """
+    Plays the board with the given mines from the given first click using only certain moves. Returns
+    a tuple of form (solved, board, solver) with the board in the state where the solver stopped.
+    """
+    board = Board(rows, columns, len(mines), safe_radius=safe_radius, generator=lambda board, index: mines)
+    board.reveal(*board.coordinates(first_index))
+    solver = Solver(board)
+    move = solver.next_move()
+    while move is not None and not board.is_over():
+        action, index = move
+        if action == 'reveal':
+            board.reveal(*board.coordinates(index))
+        else:
+            board.toggle_flag(*board.coordinates(index))
+        move = solver.next_move()
+    return (board.get_status() == WON, board, solver)
+
+def generate_no_guess(rows, columns, mines, first_index, safe_radius=NO_GUESS_SAFE_RADIUS, rng=None, attempts=50):
+    """
+    Returns a list of mine indices for a board that can be solved without guessing when the first click
+    is on the given cell, or None if no such board was found in the given number of attempts.
+
+    Each attempt starts from a random board. While the solver gets stuck, one mine bordering the
+    revealed area is moved to a random hidden cell away from it and the board is checked again from the
+    first click; an attempt is abandoned when no such move is possible.
+    """
+    rng = rng if rng is not None else random.Random()
+    for attempt in range(attempts):
+        board = Board(rows, columns, mines, rng, safe_radius)
+        board.reveal(*board.coordinates(first_index))
+        layout = board.get_mines()
+        safe_zone = set(board.get_safe_zone(first_index))
+        for repair in range(2 * mines + 1):
+            solved, board, solver = solve_from(rows, columns, layout, first_index, safe_radius)
+            if solved:
+                return layout
+            # the hidden cells the revealed numbers say something about
+            bordering = set()
+            for index in solver.get_frontier():
+                bordering.update(solver.get_constraint(index)[0])
+            stuck_mines = [index for index in bordering if board.is_mine(index)]
+            known = solver.get_mine_cells() | solver.get_safe_cells()
+            destinations = [index for index in range(rows * columns)
+                            if not board.is_revealed(index) and not board.is_mine(index)
+                            and index not in bordering and index not in known and index not in safe_zone]
+            if len(stuck_mines) == 0 or len(destinations) == 0:
+                break
+            moved = rng.choice(stuck_mines)
+            layout = [index for index in layout if index != moved] + [rng.choice(destinations)]
+    return None
+
+def encode_mines(size, mines):
+    """
+    Packs a list of mine indices into a bitmask of (size + 7) // 8 bytes.
+    """
+    mask = 0
+    for index in mines:
+        mask |= 1 << index
+    return mask.to_bytes((size + 7) // 8, 'little')
+
+def decode_mines(data):
+    """
+    Unpacks a bitmask made by encode_mines into a list of mine indices.
+    """
+    mask = int.from_bytes(data, 'little')
+    mines = []
+    index = 0
+    while mask:
+        if mask & 1:
+            mines.append(index)
+        mask >>= 1
+        index += 1
+    return mines
+
+def _symmetries(rows, columns, row, column):
+    """
+    Returns the canonical (row, column) for the given first click and whether the rows and columns were
+    flipped to reach it. Boards mirrored top-to-bottom or left-to-right are equally valid, so one stored
+    board serves all four mirror-image first clicks.
+    """
+    flip_rows = row > rows - 1 - row
+    flip_columns = column > columns - 1 - column
+    return (rows - 1 - row if flip_rows else row, columns - 1 - column if flip_columns else column, flip_rows, flip_columns)
+
+def _flip(rows, columns, mines, flip_rows, flip_columns):
+    """
+    Returns the given mine indices mirrored as requested.
+    """
+    flipped = []
+    for index in mines:
+        row, column = divmod(index, columns)
+        if flip_rows:
+            row = rows - 1 - row
+        if flip_columns:
+            column = columns - 1 - column
+        flipped.append(row * columns + column)
+    return flipped
+
+def _generate_job(rows, columns, mines, safe_radius, first_index, seed):
+    """
+    Worker process entry point: generates one no-guess board and returns its encoded mines, or None.
+    """
+    layout = generate_no_guess(rows, columns, mines, first_index, safe_radius, random.Random(seed))
+    if layout is None:
+        return None
+    return encode_mines(rows * columns, layout)
+
+# file header and record header of the on-disk pool
+_MAGIC = b'MSNG1'
+_RECORD = struct.Struct('<HHIBI') # rows, columns, mines, safe radius, first index
+
+class BoardPool ():
+    """
+    A bounded store of ready no-guess boards. Boards are keyed by (rows, columns, mines, safe radius)
+    and by the first click they were generated for (up to mirror symmetry), with at most capacity
+    boards kept for each first click. fill has background processes top up a setup's keys, the
+    likeliest first clicks first and one board per worker at a time; take removes a board if one is
+    ready. The pool is saved to cache_path after each new board so boards generated in one run are
+    ready in the next.
+    """
+    def __init__(self, cache_path=None, capacity=2, workers=None) -> None:
+        self._cache_path = cache_path
+        self._capacity = capacity
+        self._workers = workers or max(1, (os.cpu_count() or 2) - 1)
+        self._boards = {} # (rows, columns, mines, safe radius, first index) -> list of encoded mines
+        self._lock = threading.Lock()
+        self._save_lock = threading.Lock() # saves come from both the UI thread and completion callbacks
+        self._executor = None
+        self._closed = False # set by shutdown, after which no more jobs are started
+        self._pending = {} # key -> number of boards being generated for it
+        self._wanted = [] # keys to keep topped up, likeliest first click first
+        self._opened = {} # key -> number of games opened with its first click in this run
+        self._random = random.Random()
+        if cache_path is not None and os.path.exists(cache_path):
+            self._load()
+
+    def take(self, rows, columns, mines, first_index, safe_radius=NO_GUESS_SAFE_RADIUS):
+        """
+        Returns a list of mine indices for a ready no-guess board with the given setup and first click,
+        removing it from the pool, or None if none is ready.
+        """
+        row, column = divmod(first_index, columns)
+        row, column, flip_rows, flip_columns = _symmetries(rows, columns, row, column)
+        key = (rows, columns, mines, safe_radius, row * columns + column)
+        with self._lock:
+            self._opened[key] = self._opened.get(key, 0) + 1
+            if key in self._wanted:
+                # the player opens here, so this key is refilled before the others
+                self._wanted.remove(key)
+                self._wanted.insert(0, key)
+            boards = self._boards.get(key)
+            data = boards.pop() if boards else None
+        if data is None:
+            self._submit()
+            return None
+        self._save()
+        self._submit()
+        return _flip(rows, columns, decode_mines(data), flip_rows, flip_columns)
+
+    def get_ready_count(self, rows, columns, mines, safe_radius=NO_GUESS_SAFE_RADIUS):
+        """
+        Returns the number of ready boards for the given setup, over all first clicks.
+        """
+        with self._lock:
+            return sum(len(boards) for key, boards in self._boards.items() if key[:4] == (rows, columns, mines, safe_radius))
+
+    def fill(self, rows, columns, mines, safe_radius=NO_GUESS_SAFE_RADIUS):
+        """
+        Starts background generation of boards for the first clicks of the given setup that have fewer
+        than capacity boards ready, ahead of any other setup still being filled. The likeliest first
+        clicks come first: those the player has opened with in this run, then the centre and the
+        corners, then the rest by distance from the centre. Returns immediately.
+        """
+        centre = ((rows - 1) // 2, (columns - 1) // 2)
+        def likelihood(key):
+            row, column = divmod(key[4], columns)
+            usual = (row, column) in (centre, (0, 0))
+            return (-self._opened.get(key, 0), not usual, abs(row - centre[0]) + abs(column - centre[1]))
+        keys = sorted(((rows, columns, mines, safe_radius, row * columns + column)
+                       for row in range((rows + 1) // 2) for column in range((columns + 1) // 2)), key=likelihood)
+        with self._lock:
+            if self._closed:
+                return
+            self._wanted = keys + [key for key in self._wanted if key[:4] != keys[0][:4]]
+        self._submit()
+
+    def _submit(self):
+        """
+        A private method to start generating boards for the first wanted keys short of capacity. At most
+        one job per worker is in flight, so a setup with many first clicks does not queue minutes of
+        work ahead of the clicks that matter; each finished job starts the next.
+        """
+        started = []
+        with self._lock:
+            if self._closed:
+                return
+            in_flight = sum(self._pending.values())
+            try:
+                for key in self._wanted:
+                    while in_flight < self._workers and len(self._boards.get(key, [])) + self._pending.get(key, 0) < self._capacity:
+                        if self._executor is None:
+                            self._executor = concurrent.futures.ProcessPoolExecutor(max_workers=self._workers)
+                        rows, columns, mines, safe_radius, first_index = key
+                        future = self._executor.submit(_generate_job, rows, columns, mines, safe_radius, first_index,
+                                                       self._random.getrandbits(64))
+                        self._pending[key] = self._pending.get(key, 0) + 1
+                        in_flight += 1
+                        started.append((key, future))
+                    if in_flight >= self._workers:
+                        break
+            except RuntimeError:
+                pass # a worker process died and broke the executor; the ready boards can still be taken
+        # outside the lock, since a job that is already done runs its callback right away
+        for key, future in started:
+            future.add_done_callback(lambda future, key=key: self._finished(key, future))
+
+    def _finished(self, key, future):
+        """
+        A private method run on the executor's thread when a worker finishes a board: stores it and
+        starts the next job.
+        """
+        failed = future.cancelled() or future.exception() is not None
+        data = None if failed else future.result()
+        with self._lock:
+            self._pending[key] -= 1
+            if self._pending[key] == 0:
+                del self._pending[key]
+            if data is not None:
+                self._boards.setdefault(key, []).append(data)
+        if data is not None:
+            self._save()
+        if not failed: # a broken worker is not given more work
+            self._submit()
+
+    def shutdown(self):
+        """
+        Stops the worker processes, abandoning boards still being generated. No jobs are started after
+        this, even by workers finishing meanwhile.
+        """
+        with self._lock:
+            self._closed = True
+            executor = self._executor
+            self._executor = None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def _load(self):
+        """
+        A private method to read the saved pool. A damaged file is ignored.
+        """
+        try:
+            with open(self._cache_path, 'rb') as file:
+                data = file.read()
+        except OSError:
+            return
+        if not data.startswith(_MAGIC):
+            return
+        position = len(_MAGIC)
+        while position + _RECORD.size <= len(data):
+            rows, columns, mines, safe_radius, first_index = _RECORD.unpack_from(data, position)
+            position += _RECORD.size
+            length = (rows * columns + 7) // 8
+            if position + length > len(data):
+                break
+            self._boards.setdefault((rows, columns, mines, safe_radius, first_index), []).append(data[position:position + length])
+            position += length
+
+    def _save(self):
+        """
+        A private method to write the pool to the cache file, replacing the old file atomically.
+        """
+        if self._cache_path is None:
+            return
+        with self._lock:
+            parts = [_MAGIC]
+            for key, boards in self._boards.items():
+                for data in boards:
+                    parts.append(_RECORD.pack(*key))
+                    parts.append(data)
+        temporary = self._cache_path + '.tmp'
+        with self._save_lock:
+            try:
+                with open(temporary, 'wb') as file:
+                    file.write(b''.join(parts))
+                os.replace(temporary, self._cache_path)
+            except OSError as error:
+                report_write_error('the board cache', error) # the pool still works without it
@@ -0,0 +1,177 @@
+"""
+Undo, redo, look-ahead and saving for boards, built on copy-on-write snapshots (see board.Snapshot).
+A History follows a board's events to know which rows each move changed, so taking a snapshot after a
+move and stepping back to an earlier one both cost time and memory for the changed rows only.
+
+Look-ahead branches the same way: note get_current(), play moves on the board, then rewind to the noted
+snapshot. Listeners of the board see the moves and then a 'restore' event, so a branch is best explored
+on a board no view is following.
+
+A saved game is a small file: a header with the board setup and the elapsed time, followed by the
+zlib-compressed state bytes of every cell. Everything else (mines, flags, status) is worked out from
+the states when the game is loaded.
+"""
+import struct
+import zlib
+from board import Board
+
+_SAVE_HEADER = struct.Struct('<4sIIIBQ') # magic, rows, columns, mines, safe radius, elapsed milliseconds
+_SAVE_MAGIC = b'MSSV'
+
+class History ():
+    """
+    The snapshots of one board after each move, with the position of the one it is currently at. Moves
+    made since the last checkpoint are tracked as changed rows until the next checkpoint. Only plain
+    Boards can be followed; chunked boards are too large to snapshot.
+    """
+    def __init__(self, board, limit=None) -> None:
+        self._board = board
+        self._columns = board.get_columns()
+        self._limit = limit # most snapshots kept; the oldest are dropped beyond it
+        self._changed = set() # rows changed since the current snapshot
+        self._all_changed = False # whether every row may have changed (the mines were placed)
+        self._snapshots = [board.snapshot()]
+        self._position = 0
+        board.subscribe(self._on_board_event)
+
+    def detach(self):
+        """
+        Stops following the board's events.
+        """
+        self._board.unsubscribe(self._on_board_event)
+
+    def _on_board_event(self, event, data):
+        """
+        Records which rows a move changed. 'restore' events come from the history itself.
+        """
+        if event == 'reveal':
+            columns = self._columns
+            self._changed.update(index // columns for index in data)
+        elif event == 'flag' or event == 'unflag' or event == 'explode':
+            self._changed.add(data // self._columns)
+        elif event == 'start':
+            self._all_changed = True
+
+    def reset(self):
+        """
+        Forgets every snapshot and starts again from the board as it is now (e.g. after the first move,
+        so it cannot be undone).
+        """
+        self._snapshots = [self._board.snapshot()]
+        self._position = 0
+        self._changed = set()
+        self._all_changed = False
+
+    def _take(self):
+        """
+        A private method to return a snapshot of the board relative to the current one, without adding it.
+        """
+        rows = None if self._all_changed else self._changed
+        snapshot = self._board.snapshot(self._snapshots[self._position], rows)
+        self._changed = set()
+        self._all_changed = False
+        return snapshot
+
+    def checkpoint(self):
+        """
+        Adds a snapshot of the board if it changed since the last one, discarding any snapshots that
+        could have been redone. Returns the current snapshot.
+        """
+        if len(self._changed) > 0 or self._all_changed:
+            del self._snapshots[self._position + 1:]
+            self._snapshots.append(self._take())
+            self._position += 1
+            if self._limit is not None and len(self._snapshots) > self._limit:
+                del self._snapshots[:len(self._snapshots) - self._limit]
+                self._position = len(self._snapshots) - 1
+        return self._snapshots[self._position]
+
+    def get_current(self):
+        """
+        Returns the snapshot of the board as it is now, checkpointing any moves made since the last one.
+        """
+        return self.checkpoint()
+
+    def can_undo(self):
+        return self._position > 0 or len(self._changed) > 0 or self._all_changed
+
+    def can_redo(self):
+        return self._position < len(self._snapshots) - 1 and len(self._changed) == 0 and not self._all_changed
+
+    def get_undo_snapshot(self):
+        """
+        Returns the snapshot undo would go back to, or None if there is nothing to undo.
+        """
+        if len(self._changed) > 0 or self._all_changed:
+            return self._snapshots[self._position]
+        return self._snapshots[self._position - 1] if self._position > 0 else None
+
+    def undo(self):
+        """
+        Puts the board back to the snapshot before the last move. Returns False if there is none.
+        """
+        self.checkpoint()
+        if self._position == 0:
+            return False
+        self.rewind(self._snapshots[self._position - 1])
+        return True
+
+    def redo(self):
+        """
+        Makes the move undone last again. Returns False if there is none, or moves were made since.
+        """
+        if not self.can_redo():
+            return False
+        self.rewind(self._snapshots[self._position + 1])
+        return True
+
+    def rewind(self, snapshot):
+        """
+        Puts the board back to the given snapshot from this history. Moves made since the last
+        checkpoint are dropped without being kept, so a look-ahead branch leaves no trace; the
+        snapshots before and after the one rewound to stay available to undo and redo.
+        """
+        position = len(self._snapshots) - 1
+        while position >= 0 and self._snapshots[position] is not snapshot:
+            position -= 1
+        if position < 0:
+            raise ValueError('The snapshot is not from this history.')
+        current = self._snapshots[self._position]
+        if len(self._changed) > 0 or self._all_changed:
+            current = self._take()
+        self._board.restore(snapshot, current)
+        self._position = position
+
+    def get_size(self):
+        """
+        Returns the number of snapshots kept.
+        """
+        return len(self._snapshots)
+
+def save_game(path, board, elapsed=0.0):
+    """
+    Writes the board and the seconds elapsed in its game to the given path.
+    """
+    header = _SAVE_HEADER.pack(_SAVE_MAGIC, board.get_rows(), board.get_columns(), board.get_bomb_count(),
+                               board.get_safe_radius(), int(1000 * elapsed))
+    with open(path, 'wb') as file:
+        file.write(header + zlib.compress(board.get_states()))
+
+def load_game(path):
+    """
+    Reads a game saved by save_game. Returns a tuple of form (board, elapsed seconds).
+    """
+    with open(path, 'rb') as file:
+        data = file.read()
+    if len(data) < _SAVE_HEADER.size:
+        raise ValueError(f'{path} is not a saved game.')
+    magic, rows, columns, mines, safe_radius, elapsed = _SAVE_HEADER.unpack_from(data)
+    if magic != _SAVE_MAGIC:
+        raise ValueError(f'{path} is not a saved game.')
+    try:
+        states = zlib.decompress(data[_SAVE_HEADER.size:])
+    except zlib.error:
+        raise ValueError(f'{path} is damaged.')
+    board = Board(rows, columns, mines, safe_radius=safe_radius)
+    board.set_states(states)
+    return (board, elapsed / 1000)
@@ -0,0 +1,98 @@
+import tkinter as tk
+import time
+import os
+import sys
+
+# the factor icons are subsampled by for display on the board
+DEFAULT_SUBSAMPLE = 3
+# icons needed as soon as a board is shown; the rest ('mine', 'xflag', 9) load on first use
+COMMON_ICONS = ['blank', 'flag', 1, 2, 3, 4, 5, 6, 7, 8]
+
+def resource_path(relative_path):
+    """
+    Get absolute path to resource, works for dev and for PyInstaller
+    * NOTE: This function is not original code. It is courtesy of the
+    following fourm post to help with bundling required files into a
+    single executable.
+    https://stackoverflow.com/a/13790741/
+    """
+    try:
+        # PyInstaller creates a temp folder and stores path in _MEIPASS
+        base_path = sys._MEIPASS
+    except Exception:
+        base_path = os.path.abspath(".")
+
+    return os.path.join(base_path, relative_path)
+
+class IconCache ():
+    """
+    Decoded icons for one Tk interpreter. Each PNG is read from disk at most once, and every subsampled
+    variant is kept, keyed by its subsample factor, so games after the first reuse the same images.
+    """
+    def __init__(self, master) -> None:
+        self._master = master
+        self._originals = {} # name -> full-size PhotoImage
+        self._scaled = {} # (name, subsample) -> PhotoImage
+        self._load_time = 0.0
+        self._load_count = 0
+
+    def get(self, name, subsample=DEFAULT_SUBSAMPLE):
+        """
+        Takes one of the following strings: 'mine', 'flag', 'xflag', 'blank'
+        or an integer 0-9 and returns the PhotoImage icon, loading it if needed.
+        Note that 0 is equivalent to 'blank'.
+        """
+        if name == 0:
+            name = 'blank'
+        icon = self._scaled.get((name, subsample))
+        if icon is None:
+            icon = self._load(name, subsample)
+        return icon
+
+    def _load(self, name, subsample):
+        """
+        A private method to decode (if not yet decoded) and scale the named icon, recording the time taken.
+        """
+        start = time.perf_counter()
+        original = self._originals.get(name)
+        if original is None:
+            original = tk.PhotoImage(master=self._master, file=resource_path(f'icons/{name}.png'))
+            self._originals[name] = original
+            self._load_count += 1
+        icon = original.subsample(subsample) if subsample != 1 else original
+        self._scaled[(name, subsample)] = icon
+        self._load_time += time.perf_counter() - start
+        return icon
+
+    def preload(self, names=COMMON_ICONS, subsample=DEFAULT_SUBSAMPLE):
+        """
+        Loads the given icons now so the first board can be drawn without waiting on disk.
+        """
+        for name in names:
+            self.get(name, subsample)
+
+    def get_load_time(self):
+        """
+        Returns the total number of seconds spent decoding and scaling icons.
+        """
+        return self._load_time
+
+    def get_load_count(self):
+        """
+        Returns the number of icon files that have been decoded.
+        """
+        return self._load_count
+
+# one cache per Tk interpreter, since images cannot be shared between interpreters
+_caches = {}
+
+def get_icon_cache(master):
+    """
+    Returns the shared IconCache for the Tk interpreter of the given widget, creating it on first use.
+    """
+    interpreter = master.tk
+    cache = _caches.get(interpreter)
+    if cache is None:
+        cache = IconCache(master)
+        _caches[interpreter] = cache
+    return cache
@@ -0,0 +1,298 @@
+"""
+Opt-in instrumentation of the hot paths of the game. Nothing is measured until enable is called: it
+wraps the instrumented methods with timing code and disable puts the originals back, so a game that is
+not instrumented runs exactly the code it would without this module.
+
+Each operation gets a latency histogram (count, p50/p95/p99, max) and counters can be added for
+anything countable. 'click.to_paint' measures from a left click until its revealed cells have been
+painted and Tk has had the chance to redraw. The numbers can be shown in a debug overlay (F12), and
+are written as JSON when a game ends or the process receives SIGUSR1 (seen by poll_dump_signal).
+"""
+import importlib
+import json
+import math
+import signal
+import time
+import tkinter as tk
+from ioerrors import report_write_error
+
+# (module, class, method, operation name) of every timed method
+_HOOKS = [
+    ('cells', 'Cell', 'left_click', 'click.cell'),
+    ('renderer', 'CanvasGrid', 'left_click', 'click.canvas'),
+    ('game', 'Game', 'left_click', 'game.left_click'),
+    ('game', 'Game', 'right_click', 'game.right_click'),
+    ('board', 'Board', 'flood_fill', 'board.flood_fill'),
+    ('chunks', 'ChunkedBoard', 'flood_fill', 'board.flood_fill'),
+    ('cells', 'Cell', 'set_icon', 'icon.set'),
+    ('cells', 'Cell', 'reveal', 'icon.reveal'),
+    ('renderer', 'CanvasGrid', 'set_icon', 'icon.set'),
+    ('renderer', 'CanvasGrid', 'reveal', 'icon.reveal'),
+    ('game', 'Game', 'lose', 'game.lose'),
+    ('stopwatch', 'Timer', '_update_time', 'timer.tick'),
+]
+
+_BUCKET_BASE = 1.1
+_BUCKET_MIN = 1e-6
+
+class LatencyHistogram ():
+    """
+    Durations of one operation, kept in buckets of 1.1x width from one microsecond, so percentiles are
+    within 10% and the memory used stays fixed however many times the operation runs.
+    """
+    def __init__(self) -> None:
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self._buckets = {} # bucket -> number of durations in it
+
+    def add(self, seconds):
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+        bucket = max(0, math.ceil(math.log(max(seconds, _BUCKET_MIN) / _BUCKET_MIN, _BUCKET_BASE)))
+        self._buckets[bucket] = self._buckets.get(bucket, 0) + 1
+
+    def percentile(self, percent):
+        """
+        Returns the approximate duration in seconds below which the given percent of durations fall.
+        """
+        target = self.count * percent / 100
+        seen = 0
+        for bucket in sorted(self._buckets):
+            seen += self._buckets[bucket]
+            if seen >= target:
+                return min(self.max, _BUCKET_MIN * _BUCKET_BASE ** bucket)
+        return self.max
+
+    def summary(self):
+        """
+        Returns a dict of the count and the mean, p50, p95, p99 and max durations in milliseconds.
+        """
+        return {
+            'count': self.count,
+            'mean_ms': 1000 * self.total / self.count if self.count else 0.0,
+            'p50_ms': 1000 * self.percentile(50),
+            'p95_ms': 1000 * self.percentile(95),
+            'p99_ms': 1000 * self.percentile(99),
+            'max_ms': 1000 * self.max,
+        }
+
+class Metrics ():
+    """
+    The latency histograms and counters collected while instrumentation is enabled.
+    """
+    def __init__(self) -> None:
+        self._latencies = {} # operation name -> LatencyHistogram
+        self._counters = {} # counter name -> value
+
+    def record(self, name, seconds):
+        """
+        Adds a duration to the histogram of the named operation.
+        """
+        histogram = self._latencies.get(name)
+        if histogram is None:
+            histogram = self._latencies[name] = LatencyHistogram()
+        histogram.add(seconds)
+
+    def count(self, name, amount=1):
+        """
+        Adds to the named counter.
+        """
+        self._counters[name] = self._counters.get(name, 0) + amount
+
+    def snapshot(self):
+        """
+        Returns a dict of every counter and latency summary, ready to be saved as JSON.
+        """
+        return {
+            'time': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'counters': dict(sorted(self._counters.items())),
+            'latencies': {name: histogram.summary() for name, histogram in sorted(self._latencies.items())},
+        }
+
+    def dump(self, path):
+        """
+        Writes a snapshot to the given path as JSON.
+        """
+        with open(path, 'w') as file:
+            json.dump(self.snapshot(), file, indent=1)
+
+    def report(self):
+        """
+        Returns the latency summaries and counters as lines of text, for the overlay.
+        """
+        lines = [f"{'operation':<18}{'count':>7}{'p50':>9}{'p95':>9}{'p99':>9}{'max':>9}  (ms)"]
+        for name, histogram in sorted(self._latencies.items()):
+            summary = histogram.summary()
+            lines.append(f"{name:<18}{summary['count']:>7}{summary['p50_ms']:>9.3f}{summary['p95_ms']:>9.3f}"
+                         f"{summary['p99_ms']:>9.3f}{summary['max_ms']:>9.3f}")
+        for name, value in sorted(self._counters.items()):
+            lines.append(f'{name:<18}{value:>7}')
+        return '\n'.join(lines)
+
+# the metrics being collected, or None while instrumentation is disabled
+metrics = None
+_originals = [] # (class, method name, original function) for every wrapped method
+_dump_path = None
+_dump_requested = False # set by the SIGUSR1 handler, cleared by the poll that writes the dump
+
+def is_enabled():
+    return metrics is not None
+
+def enable(dump_path=None):
+    """
+    Starts collecting metrics by wrapping the instrumented methods. If dump_path is given, the metrics
+    are written there as JSON at the end of every game and, once poll_dump_signal is running, when the
+    process receives SIGUSR1.
+    """
+    global metrics, _dump_path
+    if metrics is not None:
+        return metrics
+    metrics = Metrics()
+    _dump_path = dump_path
+    for module_name, class_name, method, name in _HOOKS:
+        cls = getattr(importlib.import_module(module_name), class_name)
+        original = cls.__dict__[method]
+        _originals.append((cls, method, original))
+        setattr(cls, method, _timed(original, name))
+    game_class = importlib.import_module('game').Game
+    for method, wrapper in [('left_click', _click_to_paint), ('deactivate_board', _dump_at_end)]:
+        original = game_class.__dict__[method]
+        _originals.append((game_class, method, original))
+        setattr(game_class, method, wrapper(original))
+    if dump_path is not None and hasattr(signal, 'SIGUSR1'):
+        signal.signal(signal.SIGUSR1, _request_dump)
+    return metrics
+
+def _request_dump(number, frame):
+    """
+    A private function to handle SIGUSR1 by asking the next poll for a dump.
+    """
+    global _dump_requested
+    _dump_requested = True
+
+def poll_dump_signal(root, interval=200):
+    """
+    Writes a dump whenever SIGUSR1 has arrived, checking every interval milliseconds while metrics are
+    collected. Python runs signal handlers only between bytecodes, which never happens while Tk's
+    mainloop waits for events in C, so without these wakeups a signal to an idle game would go unseen
+    until the next mouse move. The dump is written from the Tk thread, between events.
+    """
+    def poll():
+        global _dump_requested
+        if metrics is None:
+            return
+        if _dump_requested:
+            _dump_requested = False
+            dump()
+        root.after(interval, poll)
+    root.after(interval, poll)
+
+def disable():
+    """
+    Restores the original methods and stops collecting metrics.
+    """
+    global metrics
+    while len(_originals) > 0:
+        cls, method, original = _originals.pop()
+        setattr(cls, method, original)
+    metrics = None
+
+def dump(path=None):
+    """
+    Writes the current metrics as JSON to the given path (by default, the one given to enable).
+    """
+    path = path if path is not None else _dump_path
+    if metrics is not None and path is not None:
+        try:
+            metrics.dump(path)
+        except OSError as error:
+            report_write_error('metrics', error)
+
+def _timed(function, name):
+    """
+    A private function to return a wrapper of function that records its duration under name.
+    """
+    def wrapper(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return function(*args, **kwargs)
+        finally:
+            if metrics is not None:
+                metrics.record(name, time.perf_counter() - start)
+    wrapper.__wrapped__ = function
+    return wrapper
+
+def _click_to_paint(left_click):
+    """
+    A private function to wrap Game.left_click so the time from the click until its cells are painted
+    and Tk is idle again is recorded as 'click.to_paint'.
+    """
+    def wrapper(game, row, column):
+        start = time.perf_counter()
+        revealed = game.get_board().get_revealed_count()
+        left_click(game, row, column)
+        if metrics is None:
+            return
+        metrics.count('clicks')
+        metrics.count('cells.revealed', game.get_board().get_revealed_count() - revealed)
+        def painted():
+            # idle callbacks run in order, so this runs after the redraws queued by the painting
+            game.get_root().after_idle(lambda: metrics is not None and metrics.record('click.to_paint', time.perf_counter() - start))
+        game.when_painted(painted)
+    wrapper.__wrapped__ = left_click
+    return wrapper
+
+def _dump_at_end(deactivate_board):
+    """
+    A private function to wrap Game.deactivate_board so the metrics are dumped when a game ends.
+    """
+    def wrapper(game):
+        deactivate_board(game)
+        if metrics is not None:
+            metrics.count('games')
+            # once the end-of-game handling (e.g. lose) that called this has been timed too
+            game.get_root().after_idle(dump)
+    wrapper.__wrapped__ = deactivate_board
+    return wrapper
+
+class Overlay ():
+    """
+    A small window showing the current metrics, refreshed twice a second while it is open.
+    """
+    def __init__(self, root) -> None:
+        self._window = tk.Toplevel(root)
+        self._window.title('Instrumentation')
+        self._label = tk.Label(self._window, font=('Courier', '9'), justify='left', anchor='w', padx=10, pady=10)
+        self._label.pack()
+        self._refresh()
+
+    def _refresh(self):
+        """
+        A private method to redraw the metrics and schedule the next refresh.
+        """
+        if not self._window.winfo_exists():
+            return
+        self._label['text'] = metrics.report() if metrics is not None else 'Instrumentation is disabled.'
+        self._window.after(500, self._refresh)
+
+    def close(self):
+        self._window.destroy()
+
+    def is_open(self):
+        return bool(self._window.winfo_exists())
+
+def bind_overlay(root, key='<F12>'):
+    """
+    Makes the given key toggle the overlay in the application of the given root window.
+    """
+    overlay = [None]
+    def toggle(event=None):
+        if overlay[0] is not None and overlay[0].is_open():
+            overlay[0].close()
+            overlay[0] = None
+        else:
+            overlay[0] = Overlay(root)
+    root.bind_all(key, toggle)
@@ -0,0 +1,25 @@
+"""
+How failures of background writes are handled. Replays, statistics, metrics and the board cache are
+written alongside the game, so a failure to write one must never stop play; instead it is written to
+stderr the first time it happens for each kind of file, and every failure is counted, so a full disk or
+a locked database does not go unnoticed.
+"""
+import sys
+
+_failures = {} # kind of file -> number of failed writes
+
+def report_write_error(what, error):
+    """
+    Records that writing what (e.g. 'statistics') failed with the given error. Only the first failure of
+    each kind is shown, so a persistent problem does not flood the terminal.
+    """
+    count = _failures.get(what, 0)
+    _failures[what] = count + 1
+    if count == 0:
+        print(f'minesweeper: could not save {what}: {error} (further failures are counted, not shown)', file=sys.stderr)
+
+def get_write_error_count(what):
+    """
+    Returns the number of failed writes of the given kind.
+    """
+    return _failures.get(what, 0)
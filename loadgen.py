@@ -0,0 +1,179 @@
+"""
+Load generator for server.py. Runs many concurrent sessions, each a bot playing random games (it opens a
+random hidden cell until the game ends, then starts another), spread over a few connections on which
+requests are pipelined. Reports the sustained moves per second and the request latency percentiles seen
+by the clients, leaving out a warm-up period at the start.
+
+Example:
+    python server.py &
+    python loadgen.py --sessions 10000 --connections 100 --duration 30
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+from board import PRESETS, WON, LOST
+from server import MAX_CELLS
+
+class _Connection ():
+    """
+    One client connection. Many sessions send requests on it at once; responses come back in order, so
+    each is matched to the oldest request still waiting.
+    """
+    def __init__(self, reader, writer) -> None:
+        self._reader = reader
+        self._writer = writer
+        self._waiting = [] # futures of requests sent, oldest first
+        self._next = 0 # position of the oldest waiting future
+        self._reading = asyncio.ensure_future(self._read())
+
+    async def request(self, message):
+        """
+        Sends a request and returns a tuple of form (response, seconds until it arrived).
+        """
+        future = asyncio.get_running_loop().create_future()
+        self._waiting.append(future)
+        start = time.perf_counter()
+        self._writer.write(json.dumps(message, separators=(',', ':')).encode() + b'\n')
+        response = await future
+        return (response, time.perf_counter() - start)
+
+    async def _read(self):
+        pending = b''
+        try:
+            while True:
+                data = await self._reader.read(1 << 16)
+                if not data:
+                    break
+                *lines, pending = (pending + data).split(b'\n')
+                for line in lines:
+                    self._waiting[self._next].set_result(json.loads(line))
+                    self._next += 1
+                if self._next > 1024:
+                    # drop the answered futures now and then rather than popping one at a time
+                    del self._waiting[:self._next]
+                    self._next = 0
+        finally:
+            for future in self._waiting[self._next:]:
+                if not future.done():
+                    future.set_exception(ConnectionError('connection closed'))
+
+    async def close(self):
+        self._reading.cancel()
+        self._writer.close()
+        await self._writer.wait_closed()
+
+class LoadStats ():
+    """
+    Counts of the moves, games and errors seen after the warm-up, and every request latency.
+    """
+    def __init__(self) -> None:
+        self.moves = 0
+        self.games = 0
+        self.wins = 0
+        self.errors = 0
+        self.latencies = []
+
+    def report(self, seconds, sessions, connections):
+        lines = [f'{sessions} sessions over {connections} connections, measured for {seconds:.1f} s']
+        lines.append(f'moves:    {self.moves} ({self.moves / seconds:.0f}/s)')
+        lines.append(f'requests: {len(self.latencies)} ({len(self.latencies) / seconds:.0f}/s), {self.errors} errors')
+        lines.append(f'games:    {self.games} finished, {self.wins} won')
+        if len(self.latencies) > 0:
+            ordered = sorted(self.latencies)
+            def at(percent):
+                return 1000 * ordered[min(len(ordered) - 1, int(len(ordered) * percent / 100))]
+            lines.append(f'latency:  p50 {at(50):.2f} ms, p90 {at(90):.2f} ms, p99 {at(99):.2f} ms, '
+                         f'p99.9 {at(99.9):.2f} ms, max {1000 * ordered[-1]:.2f} ms')
+        return '\n'.join(lines)
+
+async def _play(connection, board_request, rng, stats, measure_from, stop_at):
+    """
+    A private coroutine to play random games on one session until stop_at, recording the requests made
+    after measure_from.
+    """
+    def record(response, seconds):
+        if time.perf_counter() >= measure_from:
+            stats.latencies.append(seconds)
+            if 'error' in response:
+                stats.errors += 1
+        return response
+
+    while time.perf_counter() < stop_at:
+        game = record(*await connection.request(board_request))
+        if 'error' in game:
+            return
+        session = game['session']
+        columns = game['columns']
+        hidden = list(range(game['rows'] * columns)) # cells the bot may still open, in no particular order
+        opened = bytearray(len(hidden))
+        status = None
+        while status != WON and status != LOST and time.perf_counter() < stop_at:
+            # swap-remove a random cell, skipping ones already opened by an earlier flood fill
+            position = rng.randrange(len(hidden))
+            index = hidden[position]
+            hidden[position] = hidden[-1]
+            hidden.pop()
+            if opened[index]:
+                continue
+            response = record(*await connection.request({'op': 'reveal', 'session': session, 'row': index // columns, 'column': index % columns}))
+            if 'error' in response:
+                return
+            status = response['status']
+            for cell in response['revealed']:
+                opened[cell] = 1
+            if time.perf_counter() >= measure_from:
+                stats.moves += 1
+                if status == WON or status == LOST:
+                    stats.games += 1
+                    stats.wins += status == WON
+        record(*await connection.request({'op': 'close', 'session': session}))
+
+async def run_load(board_request, sessions, connections, duration, warmup=2.0, host='127.0.0.1', port=7469, unix=None, seed=0):
+    """
+    Runs the given number of sessions against a server for warmup + duration seconds and returns the
+    LoadStats of the last duration seconds.
+    """
+    links = []
+    for i in range(connections):
+        if unix is not None:
+            reader, writer = await asyncio.open_unix_connection(unix)
+        else:
+            reader, writer = await asyncio.open_connection(host, port)
+        links.append(_Connection(reader, writer))
+    stats = LoadStats()
+    start = time.perf_counter()
+    measure_from = start + warmup
+    stop_at = measure_from + duration
+    rng = random.Random(seed)
+    players = [_play(links[i % connections], board_request, random.Random(rng.getrandbits(64)), stats, measure_from, stop_at)
+               for i in range(sessions)]
+    try:
+        await asyncio.gather(*players)
+    finally:
+        for link in links:
+            await link.close()
+    return stats
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Generate load against a minesweeper server.')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=7469)
+    parser.add_argument('--unix', metavar='PATH', help='connect to a Unix domain socket instead of TCP')
+    parser.add_argument('--sessions', type=int, default=10000)
+    parser.add_argument('--connections', type=int, default=100)
+    parser.add_argument('--duration', type=float, default=10.0, help='seconds to measure for')
+    parser.add_argument('--warmup', type=float, default=2.0, help='seconds to run before measuring')
+    # the server refuses boards larger than MAX_CELLS
+    playable = sorted(preset for preset, (rows, columns, mines) in PRESETS.items() if rows * columns <= MAX_CELLS)
+    parser.add_argument('--preset', choices=playable, default='medium')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args(argv)
+
+    stats = asyncio.run(run_load({'op': 'new', 'preset': args.preset}, args.sessions, args.connections, args.duration,
+                                 args.warmup, args.host, args.port, args.unix, args.seed))
+    print(stats.report(args.duration, args.sessions, args.connections))
+
+if __name__ == '__main__':
+    main()
@@ -1,27 +1,189 @@
+import time
+_import_start = time.perf_counter() # taken before the other imports so --profile-startup can time them
 import tkinter as tk
-from game import Game
+import argparse
+import multiprocessing
+import os
 from startMenu import StartMenu
+from iconCache import get_icon_cache, COMMON_ICONS
+_import_end = time.perf_counter()
+# the game modules (game, board, solver, generator, ...) are imported when the first game starts
+
+# where ready no-guess boards are kept between runs
+NO_GUESS_CACHE = os.path.join(os.path.expanduser('~'), '.minesweeper_boards')
+# every finished game is appended to this replay archive
+REPLAY_ARCHIVE = os.path.join(os.path.expanduser('~'), '.minesweeper_replays')
+# where --instrument writes its metrics at the end of each game
+METRICS_FILE = os.path.join(os.path.expanduser('~'), '.minesweeper_metrics.json')
+# the game saved by the Save button, until it is resumed
+SAVED_GAME = os.path.join(os.path.expanduser('~'), '.minesweeper_save')
+# the statistics database every finished game is recorded in
+STATS_DB = os.path.join(os.path.expanduser('~'), '.minesweeper_stats.db')
 
 class MinesweeperApp():
-    def __init__(self):
-        # initializes with a game
+    def __init__(self, profile_startup=False, instrument=False):
+        """
+        Builds the main window and start menu. Nothing else is loaded until the window is idle: icons and
+        instructions are then warmed up a piece at a time, and the game modules wait for Start Game.
+        With profile_startup, a timing breakdown is printed once the menu is drawn and warmed up. With
+        instrument, hot-path metrics are collected, shown by pressing F12 and saved to METRICS_FILE.
+        """
         self._root = tk.Tk()
         self._root.title("Minesweeper")
+        self._board_pool = None # (frame, grid) from the last game, reused by the next one
+        self._no_guess_pool = None # created when the first no-guess game is started
+        self._stats = None # opened when the first game ends or the statistics are shown
         self._start_menu = StartMenu(self, self._root)
+        if instrument:
+            import instrument as instrumentation
+            instrumentation.enable(METRICS_FILE)
+            instrumentation.bind_overlay(self._root)
+            instrumentation.poll_dump_signal(self._root)
+        # (label, seconds since the imports started) for each startup milestone, when profiling
+        self._timings = None
+        if profile_startup:
+            self._timings = [('import', _import_end - _import_start), ('init', time.perf_counter() - _import_start)]
+            self._root.bind('<Expose>', self._on_first_expose)
+        self._root.after_idle(self._warm_up, list(COMMON_ICONS))
 
-        # run application
+    def run(self):
+        """
+        Runs the application until the main window is closed.
+        """
         self._root.mainloop()
-    
+        if self._no_guess_pool is not None:
+            self._no_guess_pool.shutdown()
+        if self._stats is not None:
+            self._stats.close()
+
+    def _warm_up(self, names):
+        """
+        A private method to decode one icon per idle callback, so the menu stays responsive, and then
+        read the instructions.
+        """
+        if len(names) > 0:
+            get_icon_cache(self._root).get(names.pop(0))
+            self._root.after_idle(self._warm_up, names)
+            return
+        self._start_menu.load_instructions()
+        self._mark('warm-up')
+
+    def _on_first_expose(self, event):
+        """
+        A private method to record when the window is first drawn (once pending redraws have run).
+        """
+        self._root.unbind('<Expose>')
+        self._root.after_idle(self._mark, 'first paint')
+
+    def _mark(self, label):
+        """
+        A private method to record a startup milestone and print the breakdown once the menu has been
+        both drawn and warmed up.
+        """
+        if self._timings is None:
+            return
+        self._timings.append((label, time.perf_counter() - _import_start))
+        if len(self._timings) == 4:
+            print_timings(self._timings)
+            icons = get_icon_cache(self._root)
+            print(f'icons        {1000 * icons.get_load_time():8.1f} ms ({icons.get_load_count()} decoded)')
+
     def open_start_menu(self):
         """
         Adds the start menu contents to the root window.
         """
         self._start_menu.open_menu()
 
-    def make_new_game(self, rows, columns, bomb_count):
+    def make_new_game(self, rows, columns, bomb_count, no_guess=False):
+        """
+        Starts a new game of minesweeper in the root window. A no-guess game also has background
+        workers top up the pool of ready no-guess boards for its setup.
+        """
+        start = time.perf_counter()
+        from game import Game
+        from chunks import CHUNKED_THRESHOLD
+        imported = time.perf_counter()
+        recycled = self._board_pool
+        self._board_pool = None
+        if no_guess and rows * columns <= CHUNKED_THRESHOLD: # huge boards are never no-guess
+            self.get_no_guess_pool().fill(rows, columns, bomb_count)
+        icons = get_icon_cache(self._root)
+        icon_count = icons.get_load_count()
+        icon_time = icons.get_load_time()
+        Game(self, self._root, rows, columns, bomb_count, recycled=recycled, no_guess=no_guess, record_to=REPLAY_ARCHIVE,
+             save_to=SAVED_GAME, stats=self.get_stats_store)
+        if self._timings is not None:
+            # a restart should decode no icons; they are cached from the first game or the warm-up
+            print(f'game: import {1000 * (imported - start):.1f} ms, init {1000 * (time.perf_counter() - imported):.1f} ms, '
+                  f'icons {1000 * (icons.get_load_time() - icon_time):.1f} ms ({icons.get_load_count() - icon_count} decoded)')
+
+    def has_saved_game(self):
+        """
+        Returns True if there is a saved game to resume.
+        """
+        return os.path.exists(SAVED_GAME)
+
+    def resume_game(self):
+        """
+        Resumes the saved game in the root window. The save is removed, so a game is resumed only once.
+        Returns False if the saved game could not be read.
+        """
+        from game import Game
+        from history import load_game
+        try:
+            board, elapsed = load_game(SAVED_GAME)
+            os.remove(SAVED_GAME)
+        except (OSError, ValueError):
+            return False
+        recycled = self._board_pool
+        self._board_pool = None
+        Game(self, self._root, board.get_rows(), board.get_columns(), board.get_bomb_count(), recycled=recycled,
+             board=board, elapsed=elapsed, save_to=SAVED_GAME, stats=self.get_stats_store)
+        return True
+
+    def get_no_guess_pool(self):
         """
-        Starts a new game of minesweeper in the root window.
+        Returns the pool of ready no-guess boards, loading it from its cache file on first use.
         """
-        Game(self, self._root, rows, columns, bomb_count)
+        if self._no_guess_pool is None:
+            from generator import BoardPool
+            self._no_guess_pool = BoardPool(NO_GUESS_CACHE)
+        return self._no_guess_pool
+
+    def get_stats_store(self):
+        """
+        Returns the store of finished games, opening STATS_DB on first use.
+        """
+        if self._stats is None:
+            from stats import StatsStore
+            self._stats = StatsStore(STATS_DB)
+        return self._stats
+
+    def recycle_board(self, frame, grid):
+        """
+        Keeps the (hidden) board widgets of a finished game so the next game can reset and reuse them.
+        """
+        self._board_pool = (frame, grid)
+
+def print_timings(timings):
+    """
+    Prints (label, seconds since the imports started) milestones with the time each phase took.
+    """
+    previous = 0.0
+    for label, elapsed in timings:
+        print(f'{label:<12} {1000 * (elapsed - previous):8.1f} ms {1000 * elapsed:8.1f} ms total')
+        previous = elapsed
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Play minesweeper.')
+    parser.add_argument('--profile-startup', action='store_true',
+                        help='print how long importing, building the menu and first drawing it took')
+    parser.add_argument('--instrument', action='store_true',
+                        help=f'collect latency metrics (F12 shows them; saved to {METRICS_FILE} after each game and on SIGUSR1)')
+    args = parser.parse_args(argv)
+    MinesweeperApp(args.profile_startup, args.instrument).run()
 
-MinesweeperApp()
\ No newline at end of file
+if __name__ == '__main__':
+    # lets the no-guess worker processes start inside a PyInstaller bundle
+    multiprocessing.freeze_support()
+    main()
\ No newline at end of file
@@ -0,0 +1,199 @@
+from board import READY
+from solver import Solver
+from probability import ProbabilityEngine
+
+def _open_center(board):
+    return board.index(board.get_rows() // 2, board.get_columns() // 2)
+
+def _open_corner(board):
+    return 0
+
+def _open_edge(board):
+    return board.index(0, board.get_columns() // 2)
+
+# first-click policies a player can open the game with, by name
+OPENINGS = {
+    'center': _open_center,
+    'corner': _open_corner,
+    'edge': _open_edge,
+}
+
+class Player ():
+    """
+    Base class for headless player strategies. A player is made for one game and asked for one move
+    at a time by next_move, which returns a tuple of form (action, index, guessed): action is 'reveal'
+    or 'flag', index is the flat index of the cell, and guessed is True if the move was not certain.
+    The opening names the first-click policy in OPENINGS.
+    """
+    name = 'player'
+
+    def __init__(self, rng, opening='center') -> None:
+        self._random = rng
+        self._opening = OPENINGS[opening]
+
+    def next_move(self, board):
+        raise NotImplementedError
+
+    def first_move(self, board):
+        """
+        Returns the flat index to open the game with, chosen by the player's opening. The first click
+        is never a mine, so it is not counted as a guess.
+        """
+        return self._opening(board)
+
+    def random_hidden(self, board):
+        """
+        Returns the flat index of a random cell that is neither revealed nor flagged.
+        """
+        size = board.get_rows() * board.get_columns()
+        for attempt in range(32):
+            index = self._random.randrange(size)
+            if not board.is_revealed(index) and not board.is_flagged(index):
+                return index
+        # most of the board is done; pick among the remaining cells directly
+        return self._random.choice([i for i in range(size) if not board.is_revealed(i) and not board.is_flagged(i)])
+
+
+class RandomPlayer (Player):
+    """
+    Reveals random cells until the game ends.
+    """
+    name = 'random'
+
+    def next_move(self, board):
+        if board.get_status() == READY:
+            return ('reveal', self.first_move(board), False)
+        return ('reveal', self.random_hidden(board), True)
+
+
+class SimplePlayer (Player):
+    """
+    Applies the single-cell rules to every revealed number: if its flags account for all its mines the
+    other hidden neighbours are safe, and if its hidden neighbours are exactly its remaining mines they
+    are all mines. Guesses a random cell when neither rule applies.
+    """
+    name = 'simple'
+
+    def __init__(self, rng, opening='center') -> None:
+        super().__init__(rng, opening)
+        self._safe = []
+        self._mines = []
+
+    def next_move(self, board):
+        if board.get_status() == READY:
+            return ('reveal', self.first_move(board), False)
+        for attempt in range(2):
+            while len(self._safe) > 0:
+                index = self._safe.pop()
+                if not board.is_revealed(index):
+                    return ('reveal', index, False)
+            while len(self._mines) > 0:
+                index = self._mines.pop()
+                if not board.is_flagged(index):
+                    return ('flag', index, False)
+            if attempt == 0:
+                self._deduce(board)
+        return ('reveal', self.random_hidden(board), True)
+
+    def _deduce(self, board):
+        """
+        A private method to collect every cell the single-cell rules prove safe or a mine.
+        """
+        safe = set()
+        mines = set()
+        for index in range(board.get_rows() * board.get_columns()):
+            count = board.get_count(index)
+            if count == 0 or not board.is_revealed(index):
+                continue
+            hidden = []
+            flags = 0
+            for adj in board.get_adjacent_indices(index):
+                if board.is_flagged(adj):
+                    flags += 1
+                elif not board.is_revealed(adj):
+                    hidden.append(adj)
+            if len(hidden) == 0:
+                continue
+            if flags == count:
+                safe.update(hidden)
+            elif count - flags == len(hidden):
+                mines.update(hidden)
+        self._safe = list(safe)
+        self._mines = list(mines)
+
+
+class SolverPlayer (Player):
+    """
+    Plays every move the constraint solver proves certain and guesses a random cell otherwise.
+    """
+    name = 'solver'
+
+    def __init__(self, rng, opening='center') -> None:
+        super().__init__(rng, opening)
+        self._solver = None
+
+    def next_move(self, board):
+        if board.get_status() == READY:
+            return ('reveal', self.first_move(board), False)
+        if self._solver is None:
+            self._solver = Solver(board)
+        move = self._solver.next_move()
+        if move is not None:
+            return (move[0], move[1], False)
+        return ('reveal', self.random_hidden(board), True)
+
+class ProbabilityPlayer (Player):
+    """
+    Plays every move the constraint solver proves certain; otherwise reveals the cell the probability
+    engine rates least likely to be a mine.
+    """
+    name = 'probability'
+
+    def __init__(self, rng, opening='center') -> None:
+        super().__init__(rng, opening)
+        self._solver = None
+        self._engine = None
+
+    def next_move(self, board):
+        if board.get_status() == READY:
+            return ('reveal', self.first_move(board), False)
+        if self._solver is None:
+            self._solver = Solver(board)
+            self._engine = ProbabilityEngine(board, self._solver)
+        move = self._solver.next_move()
+        if move is not None:
+            return (move[0], move[1], False)
+        probabilities, other = self._engine.compute()
+        best = None
+        best_probability = other
+        for index, probability in probabilities.items():
+            if ((best_probability is None or probability < best_probability)
+                    and not board.is_revealed(index) and not board.is_flagged(index)):
+                best = index
+                best_probability = probability
+        if best is None:
+            best = self.random_hidden_away_from_numbers(board, probabilities)
+        return ('reveal', best, True)
+
+    def random_hidden_away_from_numbers(self, board, probabilities):
+        """
+        Returns a random hidden cell that does not border a revealed number, falling back to any hidden
+        cell if there is none.
+        """
+        size = board.get_rows() * board.get_columns()
+        for attempt in range(32):
+            index = self._random.randrange(size)
+            if index not in probabilities and not board.is_revealed(index) and not board.is_flagged(index):
+                return index
+        candidates = [i for i in range(size) if i not in probabilities and not board.is_revealed(i) and not board.is_flagged(i)]
+        if len(candidates) == 0:
+            return self.random_hidden(board)
+        return self._random.choice(candidates)
+
+# strategies available to the simulation runner, by name
+STRATEGIES = {
+    RandomPlayer.name: RandomPlayer,
+    SimplePlayer.name: SimplePlayer,
+    SolverPlayer.name: SolverPlayer,
+    ProbabilityPlayer.name: ProbabilityPlayer,
+}
@@ -0,0 +1,12 @@
+"""
+The difficulty presets, kept apart from board.py so the start menu can list them without loading the
+game modules.
+"""
+
+# (rows, columns, mines) for each difficulty offered in the start menu
+PRESETS = {
+    'easy': (9, 9, 10),
+    'medium': (16, 16, 40),
+    'hard': (16, 30, 99),
+    'huge': (50000, 50000, 375000000), # generated chunk by chunk as it is explored (see chunks.py)
+}
@@ -0,0 +1,191 @@
+from math import comb
+from solver import Solver
+
+class ProbabilityEngine ():
+    """
+    Computes the exact probability that each hidden cell is a mine, given the revealed numbers and the
+    total number of mines.
+
+    Cells bordering the revealed numbers are split into connected components (two cells are connected
+    if some number touches both). Each component's mine arrangements are enumerated by backtracking
+    and tallied by how many mines they use. The components are then combined with the cells away from
+    the numbers, which can hold the remaining mines in any of C(cells, mines) ways. Component results
+    are cached by the component's constraints, so only components that changed since the last call are
+    enumerated again.
+    """
+    def __init__(self, board, solver=None) -> None:
+        self._board = board
+        # the solver keeps the frontier up to date and settles the certain cells before enumeration
+        self._solver = solver if solver is not None else Solver(board)
+        self._cache = {}
+
+    def compute(self):
+        """
+        Returns a tuple of form (probabilities, other): probabilities maps the flat index of every hidden
+        cell bordering a revealed number (and every cell the solver has decided) to its probability of
+        being a mine, and other is the probability for each remaining hidden cell, or None if there are
+        no such cells (or the revealed numbers contradict each other).
+        """
+        board = self._board
+        solver = self._solver
+        solver.solve()
+        mines = solver.get_mine_cells()
+        safe = solver.get_safe_cells()
+        probabilities = {}
+        for index in mines:
+            probabilities[index] = 1.0
+        for index in safe:
+            probabilities[index] = 0.0
+
+        components = self._find_components()
+        cache = {}
+        results = []
+        for key in components:
+            result = self._cache.get(key)
+            if result is None:
+                result = _enumerate(key)
+            cache[key] = result
+            results.append(result)
+        self._cache = cache # forget components that no longer exist
+
+        remaining = board.get_bomb_count() - len(mines)
+        hidden = board.get_rows() * board.get_columns() - board.get_revealed_count() - len(mines) - len(safe)
+        other_cells = hidden - sum(len(group) for result in results for group in result[0])
+
+        # totals[t] = number of arrangements of the frontier using t mines, combined over all components;
+        # prefix[i] and suffix[i] combine the components before and from i
+        prefix = [{0: 1}]
+        for result in results:
+            prefix.append(_combine(prefix[-1], result[1]))
+        suffix = [{0: 1}]
+        for result in reversed(results):
+            suffix.append(_combine(suffix[-1], result[1]))
+        suffix.reverse()
+        totals = prefix[-1]
+
+        weight = 0
+        other_weight = 0
+        for used, count in totals.items():
+            ways = count * _choose(other_cells, remaining - used)
+            weight += ways
+            other_weight += ways * (remaining - used)
+        if weight == 0:
+            return (probabilities, None) # the revealed numbers contradict each other
+
+        for i, (groups, counts, group_counts) in enumerate(results):
+            rest = _combine(prefix[i], suffix[i + 1])
+            mine_weight = [0] * len(groups)
+            for used, group_totals in group_counts.items():
+                # arrangements of everything outside this component when it uses this many mines
+                outside = sum(count * _choose(other_cells, remaining - used - rest_used) for rest_used, count in rest.items())
+                for g, total in enumerate(group_totals):
+                    mine_weight[g] += total * outside
+            for group, group_weight in zip(groups, mine_weight):
+                # the group's mines are spread evenly over its interchangeable cells
+                probability = group_weight / (weight * len(group))
+                for cell in group:
+                    probabilities[cell] = probability
+
+        other = other_weight / (weight * other_cells) if other_cells > 0 else None
+        return (probabilities, other)
+
+    def _find_components(self):
+        """
+        A private method to group the frontier constraints into independent components. Returns a list of
+        keys, each a frozenset of (unknown cells, mines) constraints that share no cell with another key.
+        """
+        constraints = []
+        owner = {} # unknown cell -> index of a constraint touching it
+        parent = []
+        def find(i):
+            while parent[i] != i:
+                parent[i] = parent[parent[i]]
+                i = parent[i]
+            return i
+        for index in self._solver.get_frontier():
+            unknown, mines = self._solver.get_constraint(index)
+            if len(unknown) == 0:
+                continue
+            position = len(constraints)
+            constraints.append((frozenset(unknown), mines))
+            parent.append(position)
+            for cell in unknown:
+                if cell in owner:
+                    parent[find(position)] = find(owner[cell])
+                else:
+                    owner[cell] = position
+        groups = {}
+        for position, constraint in enumerate(constraints):
+            groups.setdefault(find(position), set()).add(constraint)
+        return [frozenset(group) for group in groups.values()]
+
+def _choose(n, k):
+    if k < 0 or k > n:
+        return 0
+    return comb(n, k)
+
+def _combine(first, second):
+    """
+    Returns the convolution of two {mines used: arrangements} distributions.
+    """
+    combined = {}
+    for a, a_count in first.items():
+        for b, b_count in second.items():
+            combined[a + b] = combined.get(a + b, 0) + a_count * b_count
+    return combined
+
+def _enumerate(key):
+    """
+    Enumerates every mine arrangement of one component by backtracking. Cells touched by exactly the same
+    constraints are interchangeable, so they are grouped and the search picks how many mines each group
+    holds, counting the C(size, mines) ways to place them. Returns a tuple of form (groups, counts,
+    group_counts): groups is a list of lists of cells, counts maps a number of mines to how many
+    arrangements use it, and group_counts maps it to a list giving, for each group, the total number of
+    mines placed in that group over all of those arrangements.
+    """
+    # order the constraints along the board so neighbouring constraints are decided close together
+    constraints = sorted(key, key=lambda constraint: min(constraint[0]))
+    by_constraints = {}
+    for c, (unknown, mines) in enumerate(constraints):
+        for cell in unknown:
+            by_constraints.setdefault(cell, []).append(c)
+    members = {}
+    for cell, touching in by_constraints.items():
+        members.setdefault(tuple(touching), []).append(cell)
+    # visit groups in order of their first constraint so constraints are completed as early as possible
+    signatures = sorted(members)
+    groups = [members[signature] for signature in signatures]
+    need = [mines for unknown, mines in constraints]
+    open_cells = [len(unknown) for unknown, mines in constraints]
+
+    counts = {}
+    group_counts = {}
+    values = [0] * len(groups)
+
+    def place(i, used, ways):
+        if i == len(groups):
+            counts[used] = counts.get(used, 0) + ways
+            totals = group_counts.get(used)
+            if totals is None:
+                totals = group_counts[used] = [0] * len(groups)
+            for j, value in enumerate(values):
+                totals[j] += ways * value
+            return
+        size = len(groups[i])
+        touching = signatures[i]
+        for c in touching:
+            open_cells[c] -= size
+        for value in range(size + 1):
+            if all(0 <= need[c] - value <= open_cells[c] for c in touching):
+                for c in touching:
+                    need[c] -= value
+                values[i] = value
+                place(i + 1, used + value, ways * comb(size, value))
+                for c in touching:
+                    need[c] += value
+        for c in touching:
+            open_cells[c] += size
+        values[i] = 0
+
+    place(0, 0, 1)
+    return (groups, counts, group_counts)
@@ -0,0 +1,229 @@
+import tkinter as tk
+
+# icons a cell can show, indexed by the face code stored for each cell
+FACES = ['blank', 1, 2, 3, 4, 5, 6, 7, 8, 'flag', 'mine', 'xflag']
+_FACE_CODES = {name: code for code, name in enumerate(FACES)}
+_FACE_CODES[0] = _FACE_CODES['blank']
+REVEALED_FACE = 0x80 # set on a face code once the cell is revealed
+HIGHLIGHT_FACE = 0x40 # set on a face code while the cell is highlighted (e.g. by a hint)
+# boards with more cells than this keep only the faces that changed, in a dict
+SPARSE_FACES = 1 << 22
+
+class _SparseFaces (dict):
+    """
+    Face codes of a huge board by flat index; cells never changed read as 0 (blank) without being stored.
+    """
+    def __missing__(self, index):
+        return 0
+
+class CanvasGrid ():
+    """
+    Renders the board on a single scrollable canvas instead of one button per cell. The face of every
+    cell is kept in a bytearray (a dict for huge boards), and canvas items only exist for the cells inside the visible viewport:
+    when the view scrolls, items leaving the viewport are reused for the cells coming into it. Clicks
+    are mapped to cells by coordinate math and forwarded to the game like Cell button clicks.
+    """
+    def __init__(self, root, game, rows, columns, max_width=900, max_height=600) -> None:
+        self._game = game
+        self._rows = rows
+        self._columns = columns
+        self._size = game.get_icon('blank').width() + 2 # 1 pixel border on each side, like a button
+        self._faces = bytearray(rows * columns) if rows * columns <= SPARSE_FACES else _SparseFaces()
+        # (row, column) -> (background rectangle, image item) for every cell currently drawn
+        self._items = {}
+        self._spare = [] # item pairs scrolled out of view, kept for reuse
+        self._visible = (0, 0, 0, 0)
+        self._shades = {} # flat index -> background colour for shaded unrevealed cells
+
+        width = min(columns * self._size, max_width)
+        height = min(rows * self._size, max_height)
+        self._canvas = tk.Canvas(root, width=width, height=height, highlightthickness=0,
+                                 scrollregion=(0, 0, columns * self._size, rows * self._size))
+        self._canvas.grid(row=0, column=0)
+        if width < columns * self._size:
+            x_scroll = tk.Scrollbar(root, orient=tk.HORIZONTAL, command=self._xview)
+            x_scroll.grid(row=1, column=0, sticky='ew')
+            self._canvas['xscrollcommand'] = x_scroll.set
+        if height < rows * self._size:
+            y_scroll = tk.Scrollbar(root, orient=tk.VERTICAL, command=self._yview)
+            y_scroll.grid(row=0, column=1, sticky='ns')
+            self._canvas['yscrollcommand'] = y_scroll.set
+
+        self._canvas.bind('<ButtonRelease-1>', self.left_click)
+        self._canvas.bind('<Button-3>', self.right_click)
+        self._canvas.bind('<Configure>', lambda event: self._refresh())
+        self._canvas.bind('<MouseWheel>', self._on_wheel)
+        # X11 reports the wheel as buttons 4 (up) and 5 (down) instead of <MouseWheel>
+        self._canvas.bind('<Button-4>', self._on_wheel)
+        self._canvas.bind('<Button-5>', self._on_wheel)
+        self._refresh()
+
+    def center_on(self, row, column):
+        """
+        Scrolls the canvas so the cell at the given row, column is in the middle of the view.
+        """
+        width = max(self._canvas.winfo_width(), int(self._canvas['width']))
+        height = max(self._canvas.winfo_height(), int(self._canvas['height']))
+        self._canvas.xview_moveto(max(0, (column + 0.5) * self._size - width / 2) / (self._columns * self._size))
+        self._canvas.yview_moveto(max(0, (row + 0.5) * self._size - height / 2) / (self._rows * self._size))
+        self._refresh()
+
+    def _xview(self, *args):
+        """
+        A private method to scroll the canvas horizontally and redraw the viewport.
+        """
+        self._canvas.xview(*args)
+        self._refresh()
+
+    def _yview(self, *args):
+        """
+        A private method to scroll the canvas vertically and redraw the viewport.
+        """
+        self._canvas.yview(*args)
+        self._refresh()
+
+    def _on_wheel(self, event):
+        """
+        Scrolls the canvas with the mouse wheel (shift + wheel scrolls horizontally).
+        """
+        if event.num == 4 or event.num == 5:
+            steps = -1 if event.num == 4 else 1
+        else:
+            steps = -1 if event.delta > 0 else 1
+        if event.state & 0x1:
+            self._xview('scroll', steps, 'units')
+        else:
+            self._yview('scroll', steps, 'units')
+
+    def _cell_at(self, event):
+        """
+        A private method to return the (row, column) under the mouse for the given event, or None if the
+        event is outside the board.
+        """
+        row = int(self._canvas.canvasy(event.y) // self._size)
+        column = int(self._canvas.canvasx(event.x) // self._size)
+        if 0 <= row < self._rows and 0 <= column < self._columns:
+            return (row, column)
+        return None
+
+    def left_click(self, event):
+        """
+        Event handler for left-click on the canvas.
+        """
+        cell = self._cell_at(event)
+        if not self._game.is_frozen() and cell is not None and not self._faces[cell[0] * self._columns + cell[1]] & REVEALED_FACE:
+            self._game.left_click(*cell)
+
+    def right_click(self, event):
+        """
+        Event handler for right-click on the canvas.
+        """
+        cell = self._cell_at(event)
+        if not self._game.is_frozen() and cell is not None:
+            self._game.right_click(*cell)
+
+    def _refresh(self):
+        """
+        A private method to make sure exactly the cells inside the visible viewport have canvas items.
+        Items for cells that left the viewport are recycled for the cells that entered it; any left over
+        are hidden, so they do not show stale cells where they were.
+        """
+        size = self._size
+        left = int(self._canvas.canvasx(0)) // size
+        top = int(self._canvas.canvasy(0)) // size
+        width = max(self._canvas.winfo_width(), int(self._canvas['width']))
+        height = max(self._canvas.winfo_height(), int(self._canvas['height']))
+        right = min(self._columns, left + width // size + 2)
+        bottom = min(self._rows, top + height // size + 2)
+        visible = (top, bottom, left, right)
+        if visible == self._visible:
+            return
+        self._visible = visible
+
+        for cell in [cell for cell in self._items if not (top <= cell[0] < bottom and left <= cell[1] < right)]:
+            items = self._items.pop(cell)
+            for item in items:
+                self._canvas.itemconfigure(item, state='hidden')
+            self._spare.append(items)
+        for row in range(top, bottom):
+            for column in range(left, right):
+                if (row, column) not in self._items:
+                    self._draw(row, column)
+
+    def _draw(self, row, column):
+        """
+        A private method to create (or reuse) the canvas items of the cell at the given row, column and
+        draw its current face.
+        """
+        size = self._size
+        x = column * size
+        y = row * size
+        if len(self._spare) > 0:
+            background, image = self._spare.pop()
+            self._canvas.coords(background, x, y, x + size - 1, y + size - 1)
+            self._canvas.coords(image, x + size // 2, y + size // 2)
+            self._canvas.itemconfigure(background, state='normal')
+            self._canvas.itemconfigure(image, state='normal')
+        else:
+            background = self._canvas.create_rectangle(x, y, x + size - 1, y + size - 1, width=1)
+            image = self._canvas.create_image(x + size // 2, y + size // 2)
+        self._items[(row, column)] = (background, image)
+        self._paint(row, column)
+
+    def _paint(self, row, column):
+        """
+        A private method to update the drawn items of the cell at the given row, column, if it is visible.
+        """
+        items = self._items.get((row, column))
+        if items is None:
+            return
+        face = self._faces[row * self._columns + column]
+        if face & REVEALED_FACE:
+            self._canvas.itemconfigure(items[0], fill='gray64', outline='gray50')
+        elif face & HIGHLIGHT_FACE:
+            self._canvas.itemconfigure(items[0], fill='pale green', outline='white')
+        elif row * self._columns + column in self._shades:
+            self._canvas.itemconfigure(items[0], fill=self._shades[row * self._columns + column], outline='white')
+        else:
+            self._canvas.itemconfigure(items[0], fill='gray85', outline='white')
+        self._canvas.itemconfigure(items[1], image=self._game.get_icon(FACES[face & ~(REVEALED_FACE | HIGHLIGHT_FACE)]))
+
+    def reveal(self, row, column, name):
+        """
+        Shows the cell at the given row, column as revealed with the given icon.
+        """
+        self._faces[row * self._columns + column] = _FACE_CODES[name] | REVEALED_FACE
+        self._paint(row, column)
+
+    def conceal(self, row, column, name):
+        """
+        Shows the cell at the given row, column as unrevealed with the given icon.
+        """
+        self._faces[row * self._columns + column] = _FACE_CODES[name]
+        self._paint(row, column)
+
+    def set_icon(self, row, column, name):
+        """
+        Changes the icon of the cell at the given row, column.
+        """
+        index = row * self._columns + column
+        self._faces[index] = (self._faces[index] & (REVEALED_FACE | HIGHLIGHT_FACE)) | _FACE_CODES[name]
+        self._paint(row, column)
+
+    def highlight(self, row, column):
+        """
+        Highlights the cell at the given row, column.
+        """
+        self._faces[row * self._columns + column] |= HIGHLIGHT_FACE
+        self._paint(row, column)
+
+    def shade(self, row, column, colour):
+        """
+        Colours the background of the cell at the given row, column (None restores it).
+        """
+        index = row * self._columns + column
+        if colour is None:
+            self._shades.pop(index, None)
+        else:
+            self._shades[index] = colour
+        self._paint(row, column)
@@ -0,0 +1,336 @@
+"""
+Recording and playback of games. Each finished game is appended to an archive file as one record:
+a fixed header (board setup and the seed its mines were placed from), the mine layout when it did not
+come from the seed (no-guess boards), and a packed stream of (milliseconds since the previous event,
+action, row, column) events. A companion index file holds the offset of every record so any game can
+be read directly. Archives are read through mmap, so scanning millions of games never loads a whole
+file.
+
+Example:
+    python replay.py list ~/.minesweeper_replays
+    python replay.py play ~/.minesweeper_replays --game 3 --speed 2
+    python replay.py check ~/.minesweeper_replays
+"""
+import argparse
+import mmap
+import os
+import random
+import struct
+import sys
+import time
+from board import WON, LOST
+from chunks import make_board
+from generator import encode_mines, decode_mines
+from history import History
+from ioerrors import report_write_error
+
+_HEADER = struct.Struct('<4sHHIBQBI') # magic, rows, columns, mines, safe radius, seed, flags, event count
+_EVENT = struct.Struct('<IBHH') # milliseconds since previous event, action, row, column
+_OFFSET = struct.Struct('<Q')
+_MAGIC = b'MSRP'
+_HAS_LAYOUT = 0x01
+
+# event actions
+REVEAL = 0
+FLAG = 1
+UNDO = 2 # row and column are unused
+REDO = 3
+
+class Recorder ():
+    """
+    Collects the events of one game in memory and appends them to an archive when the game ends.
+    """
+    def __init__(self, path, rows, columns, mines, safe_radius, seed) -> None:
+        self._path = path
+        self._setup = (rows, columns, mines, safe_radius, seed)
+        self._events = bytearray()
+        self._count = 0
+        self._layout = None
+        self._last = time.perf_counter()
+
+    def record(self, action, row, column):
+        """
+        Records a REVEAL or FLAG (right-click) action on the cell at the given row, column, or an UNDO
+        or REDO (at 0, 0).
+        """
+        now = time.perf_counter()
+        self._events += _EVENT.pack(int(1000 * (now - self._last)), action, row, column)
+        self._last = now
+        self._count += 1
+
+    def set_layout(self, mines):
+        """
+        Stores the mine layout with the game, for boards whose mines were not placed from the seed.
+        """
+        self._layout = mines
+
+    def finish(self):
+        """
+        Appends the game to the archive and its offset to the index.
+        """
+        rows, columns, mines, safe_radius, seed = self._setup
+        flags = _HAS_LAYOUT if self._layout is not None else 0
+        record = _HEADER.pack(_MAGIC, rows, columns, mines, safe_radius, seed, flags, self._count)
+        if self._layout is not None:
+            record += encode_mines(rows * columns, self._layout)
+        append_record(self._path, record + bytes(self._events))
+
+def append_record(path, record):
+    """
+    Appends an encoded game to the archive at the given path and its offset to the index file.
+    """
+    with open(path, 'ab') as archive:
+        offset = archive.tell()
+        archive.write(record)
+    with open(path + '.idx', 'ab') as index:
+        index.write(_OFFSET.pack(offset))
+
+class Replay ():
+    """
+    One recorded game, read from a memory-mapped archive. The events are decoded only when iterated.
+    """
+    def __init__(self, view, offset) -> None:
+        magic, rows, columns, mines, safe_radius, seed, flags, count = _HEADER.unpack_from(view, offset)
+        if magic != _MAGIC:
+            raise ValueError(f'No replay record at offset {offset}.')
+        self.rows = rows
+        self.columns = columns
+        self.mines = mines
+        self.safe_radius = safe_radius
+        self.seed = seed
+        self.event_count = count
+        position = offset + _HEADER.size
+        self.layout = None
+        if flags & _HAS_LAYOUT:
+            length = (rows * columns + 7) // 8
+            self.layout = decode_mines(view[position:position + length])
+            position += length
+        self._events = view[position:position + count * _EVENT.size]
+        self.size = position + count * _EVENT.size - offset
+
+    def events(self):
+        """
+        Returns an iterator of (milliseconds since previous event, action, row, column) tuples.
+        """
+        return _EVENT.iter_unpack(self._events)
+
+    def make_board(self):
+        """
+        Returns a new board set up exactly like the recorded one, so the events replay onto it.
+        """
+        layout = self.layout
+        generator = (lambda board, index: layout) if layout is not None else None
+        return make_board(self.rows, self.columns, self.mines, random.Random(self.seed), self.safe_radius, generator)
+
+    def get_duration(self):
+        """
+        Returns the number of milliseconds from the start of recording to the last event.
+        """
+        return sum(event[0] for event in self.events())
+
+class ReplayArchive ():
+    """
+    Read access to an archive of recorded games. The file is memory-mapped, and games are found through
+    the index file when it exists (rebuilding it by scanning the headers otherwise).
+    """
+    def __init__(self, path) -> None:
+        self._path = path
+        self._file = open(path, 'rb')
+        size = os.fstat(self._file.fileno()).st_size
+        self._view = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) if size > 0 else b''
+        self._unreadable = 0 # bytes after the last whole record, when the archive is damaged or cut short
+        self._offsets = self._read_index()
+
+    def close(self):
+        if isinstance(self._view, mmap.mmap):
+            self._view.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _read_index(self):
+        """
+        A private method to load the record offsets from the index, or rebuild the index if it is missing
+        or does not cover the whole archive.
+        """
+        try:
+            with open(self._path + '.idx', 'rb') as index:
+                data = index.read()
+            offsets = [offset for (offset,) in _OFFSET.iter_unpack(data[:len(data) - len(data) % _OFFSET.size])]
+            if len(offsets) == 0 and len(self._view) == 0:
+                return offsets
+            if len(offsets) > 0 and offsets[-1] + Replay(self._view, offsets[-1]).size == len(self._view):
+                return offsets
+        except (OSError, ValueError, struct.error):
+            pass
+        return self.rebuild_index()
+
+    def rebuild_index(self):
+        """
+        Scans the archive header by header and returns the offsets. The scan stops at the first record
+        that is damaged or runs past the end of the file (e.g. one being written when the game was
+        closed); the games before it can still be read, and get_unreadable_size() tells how much was
+        left out. The index file is rewritten if it can be; reading works from the offsets alone, so an
+        archive in a read-only place can still be read.
+        """
+        offsets = []
+        position = 0
+        while position + _HEADER.size <= len(self._view):
+            try:
+                size = Replay(self._view, position).size
+            except (ValueError, struct.error):
+                break
+            if position + size > len(self._view):
+                break
+            offsets.append(position)
+            position += size
+        self._unreadable = len(self._view) - position
+        try:
+            with open(self._path + '.idx', 'wb') as index:
+                index.write(b''.join(_OFFSET.pack(offset) for offset in offsets))
+        except OSError as error:
+            report_write_error('the replay index', error)
+        return offsets
+
+    def get_unreadable_size(self):
+        """
+        Returns the number of bytes at the end of the archive that hold no whole record (0 when every
+        byte was read).
+        """
+        return self._unreadable
+
+    def __len__(self):
+        return len(self._offsets)
+
+    def __getitem__(self, number):
+        """
+        Returns the Replay of the game with the given number, read directly through the index.
+        """
+        return Replay(self._view, self._offsets[number])
+
+    def __iter__(self):
+        for offset in self._offsets:
+            yield Replay(self._view, offset)
+
+def play_headless(replay):
+    """
+    Applies every event of the replay to a fresh board as fast as possible and returns the board.
+    """
+    board = replay.make_board()
+    # snapshots are only kept for games where moves were undone
+    history = History(board) if any(event[1] == UNDO for event in replay.events()) else None
+    for delay, action, row, column in replay.events():
+        if action == FLAG:
+            board.toggle_flag(row, column)
+        elif action == UNDO:
+            history.undo()
+        elif action == REDO:
+            history.redo()
+        else:
+            board.reveal(row, column)
+        if history is not None:
+            history.checkpoint()
+    return board
+
+class TkPlayback ():
+    """
+    Replays a recorded game on a Game in the Tk UI, at real speed or faster. The events are scheduled
+    with after, each one the recorded delay (divided by speed) after the one before it.
+    """
+    def __init__(self, game, replay, speed=1.0) -> None:
+        self._game = game
+        self._events = replay.events()
+        self._speed = speed
+        self._widget = game.get_root()
+        self._schedule()
+
+    def _schedule(self):
+        """
+        A private method to schedule the next event, if there is one.
+        """
+        event = next(self._events, None)
+        if event is not None:
+            self._widget.after(int(event[0] / self._speed), self._play, event)
+
+    def _play(self, event):
+        """
+        A private method to apply one event to the game and schedule the next.
+        """
+        delay, action, row, column = event
+        if action == FLAG:
+            self._game.right_click(row, column)
+        elif action == UNDO:
+            self._game.undo()
+        elif action == REDO:
+            self._game.redo()
+        else:
+            self._game.left_click(row, column)
+        self._schedule()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Inspect and play back recorded minesweeper games.')
+    parser.add_argument('command', choices=['list', 'check', 'play'])
+    parser.add_argument('archive')
+    parser.add_argument('--game', type=int, default=-1, help='game number to play (default: the last one)')
+    parser.add_argument('--speed', type=float, default=1.0, help='playback speed multiplier in the UI')
+    parser.add_argument('--headless', action='store_true', help='play back without the UI')
+    args = parser.parse_args(argv)
+
+    with ReplayArchive(args.archive) as archive:
+        if archive.get_unreadable_size() > 0:
+            print(f'warning: the last {archive.get_unreadable_size()} bytes of {args.archive} are damaged or cut short; '
+                  f'only the {len(archive)} games before them can be read', file=sys.stderr)
+        if args.command == 'list':
+            for number, replay in enumerate(archive):
+                print(f'{number}: {replay.rows}x{replay.columns}, {replay.mines} mines, '
+                      f'{replay.event_count} events, {replay.get_duration() / 1000:.1f} s')
+        elif args.command == 'check':
+            # replays every game at full speed and tallies the outcomes
+            start = time.perf_counter()
+            outcomes = {WON: 0, LOST: 0}
+            for replay in archive:
+                status = play_headless(replay).get_status()
+                outcomes[status] = outcomes.get(status, 0) + 1
+            elapsed = time.perf_counter() - start
+            print(f'{len(archive)} games: {outcomes[WON]} won, {outcomes[LOST]} lost, '
+                  f'{len(archive) - outcomes[WON] - outcomes[LOST]} unfinished ({len(archive) / max(elapsed, 1e-9):.0f} games/sec)')
+        elif args.headless:
+            board = play_headless(archive[args.game])
+            print(board.get_status())
+        else:
+            play_in_window(archive[args.game], args.speed)
+
+def play_in_window(replay, speed=1.0):
+    """
+    Opens a window and plays the replay back in it.
+    """
+    import tkinter as tk
+    from game import Game
+
+    class _Viewer ():
+        # stands in for the app so the game's end-of-game pop-up works
+        def make_new_game(self, rows, columns, bomb_count, no_guess=False):
+            play()
+
+        def open_start_menu(self):
+            root.destroy()
+
+        def recycle_board(self, frame, grid):
+            frame.destroy()
+
+    def play():
+        game = Game(viewer, root, replay.rows, replay.columns, replay.mines, board=replay.make_board())
+        TkPlayback(game, replay, speed)
+
+    root = tk.Tk()
+    root.title('Minesweeper Replay')
+    viewer = _Viewer()
+    play()
+    root.mainloop()
+
+if __name__ == '__main__':
+    main()
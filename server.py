@@ -0,0 +1,295 @@
+"""
+An asyncio server hosting many concurrent minesweeper sessions for bots and thin clients, without Tk.
+Each session is just a headless board (one state byte per cell holding the adjacent mine count and the
+mine/flagged/revealed bits) played by the same rules as the game window. Sessions that go unused for the
+idle timeout are dropped, releasing their boards.
+
+Clients send one JSON object per line and get one JSON object per line back, in the same order. Every
+request has an 'op' and may carry an 'id', which is copied into the response. Failed requests get a
+response with an 'error' message instead.
+    {"op": "new", "preset": "hard"}                -> {"session": 1, "rows": 16, "columns": 30, "mines": 99}
+    {"op": "new", "rows": 20, "columns": 20, "mines": 50, "seed": 7, "safe_radius": 1}
+    {"op": "reveal", "session": 1, "row": 3, "column": 4}
+                                                   -> {"status": "playing", "revealed": [...], "counts": [...]}
+    {"op": "flag", "session": 1, "row": 0, "column": 0} -> {"flagged": true, "remaining": 98}
+    {"op": "view", "session": 1}                   -> {"status": ..., "cells": "--12F..."} (one character per cell)
+    {"op": "close", "session": 1}
+    {"op": "stats"}                                -> the server's session and move counts
+Cells in responses are flat indices (row * columns + column). The reveal that loses a game also gives the
+mine it hit ("mine") and lists every mine ("mines").
+
+Example:
+    python server.py --port 7469
+    python server.py --unix /tmp/minesweeper.sock
+"""
+import argparse
+import asyncio
+import collections
+import itertools
+import json
+import random
+import time
+from board import PRESETS, COUNT_MASK, MINE, FLAGGED, REVEALED, LOST
+from chunks import make_board, CHUNKED_THRESHOLD
+
+# largest board a session may have; bigger boards would be generated chunk by chunk and could grow
+# without bound as they are explored
+MAX_CELLS = CHUNKED_THRESHOLD
+# longest request line accepted, in bytes
+MAX_LINE = 1 << 16
+
+# character shown for each cell state in a view: hidden, flagged, revealed mine, or the mine count
+_VIEW = bytes(ord('F') if state & FLAGGED else
+              ord('*') if state & REVEALED and state & MINE else
+              ord('0') + (state & COUNT_MASK) if state & REVEALED else
+              ord('-') for state in range(256))
+
+class Session ():
+    """
+    One game being played on the server: its board and when it was last used.
+    """
+    def __init__(self, board, now) -> None:
+        self.board = board
+        self.last_used = now
+        self.moves = 0
+
+class GameServer ():
+    """
+    Holds the sessions and answers requests. handle takes a decoded request and returns the response,
+    so the game logic can be driven without a socket; serve_tcp and serve_unix put it on the network.
+    """
+    def __init__(self, idle_timeout=300.0, max_sessions=100000, rng=None) -> None:
+        self._idle_timeout = idle_timeout
+        self._max_sessions = max_sessions
+        self._random = rng if rng is not None else random.Random()
+        # session id -> Session, least recently used first, so expired sessions are always at the front
+        self._sessions = collections.OrderedDict()
+        self._ids = itertools.count(1)
+        self._started = time.monotonic()
+        self._moves = 0
+        self._games = 0
+        self._expired = 0
+        self._connections = 0
+        self._operations = {
+            'new': self._new,
+            'reveal': self._reveal,
+            'flag': self._flag,
+            'view': self._view,
+            'close': self._close,
+            'stats': self._stats,
+        }
+
+    def get_session_count(self):
+        return len(self._sessions)
+
+    def handle(self, request):
+        """
+        Returns the response dict for a decoded request dict.
+        """
+        try:
+            operation = self._operations.get(request.get('op'))
+            if operation is None:
+                raise ValueError(f"unknown op {request.get('op')!r}")
+            response = operation(request)
+        except (KeyError, TypeError, ValueError) as error:
+            message = f'missing field {error}' if isinstance(error, KeyError) else str(error)
+            response = {'error': message}
+        if 'id' in request:
+            response['id'] = request['id']
+        return response
+
+    def handle_line(self, line):
+        """
+        Returns the encoded response line for an encoded request line.
+        """
+        try:
+            request = json.loads(line)
+        except ValueError:
+            return b'{"error": "request is not valid JSON"}\n'
+        if not isinstance(request, dict):
+            return b'{"error": "request must be a JSON object"}\n'
+        return json.dumps(self.handle(request), separators=(',', ':')).encode() + b'\n'
+
+    def _session(self, request):
+        """
+        A private method to return the session a request names, marking it as just used.
+        """
+        session_id = request['session']
+        session = self._sessions.get(session_id)
+        if session is None:
+            raise ValueError(f'no session {session_id!r} (it may have expired)')
+        session.last_used = time.monotonic()
+        self._sessions.move_to_end(session_id)
+        return session
+
+    def _cell(self, board, request):
+        """
+        A private method to return the row, column a request names, checked against the board.
+        """
+        row = request['row']
+        column = request['column']
+        if not (isinstance(row, int) and isinstance(column, int) and not isinstance(row, bool) and not isinstance(column, bool)
+                and 0 <= row < board.get_rows() and 0 <= column < board.get_columns()):
+            raise ValueError(f'no cell at row {row!r}, column {column!r}')
+        return (row, column)
+
+    def _new(self, request):
+        if len(self._sessions) >= self._max_sessions:
+            self.expire_idle()
+            if len(self._sessions) >= self._max_sessions:
+                raise ValueError('too many sessions')
+        if 'preset' in request:
+            if request['preset'] not in PRESETS:
+                raise ValueError(f"unknown preset {request['preset']!r}")
+            rows, columns, mines = PRESETS[request['preset']]
+        else:
+            rows, columns, mines = request['rows'], request['columns'], request['mines']
+        if not all(isinstance(value, int) and not isinstance(value, bool) for value in (rows, columns, mines)) or rows < 1 or columns < 1 or mines < 0:
+            raise ValueError('rows, columns and mines must be positive integers')
+        safe_radius = request.get('safe_radius', 0)
+        if not isinstance(safe_radius, int) or isinstance(safe_radius, bool) or safe_radius < 0:
+            raise ValueError('safe_radius must be a non-negative integer')
+        if rows * columns > MAX_CELLS:
+            raise ValueError(f'boards are limited to {MAX_CELLS} cells')
+        # a seeded board gets its own generator; the rest share the server's, which needs no memory per session
+        seed = request.get('seed')
+        rng = random.Random(seed) if seed is not None else self._random
+        board = make_board(rows, columns, mines, rng, safe_radius)
+        session_id = next(self._ids)
+        self._sessions[session_id] = Session(board, time.monotonic())
+        self._games += 1
+        return {'session': session_id, 'rows': rows, 'columns': columns, 'mines': mines}
+
+    def _reveal(self, request):
+        session = self._session(request)
+        board = session.board
+        row, column = self._cell(board, request)
+        was_over = board.is_over()
+        revealed = board.reveal(row, column)
+        session.moves += 1
+        self._moves += 1
+        response = {'status': board.get_status(), 'revealed': revealed, 'counts': [board.get_count(index) for index in revealed]}
+        if board.get_status() == LOST and not was_over: # only the click that set off a mine reports it
+            response['mine'] = board.index(row, column)
+            response['mines'] = board.get_mines()
+        return response
+
+    def _flag(self, request):
+        session = self._session(request)
+        board = session.board
+        row, column = self._cell(board, request)
+        board.toggle_flag(row, column)
+        session.moves += 1
+        self._moves += 1
+        return {'flagged': board.is_flagged(board.index(row, column)), 'remaining': board.get_remaining_mines()}
+
+    def _view(self, request):
+        session = self._session(request)
+        board = session.board
+        return {'status': board.get_status(), 'remaining': board.get_remaining_mines(), 'moves': session.moves,
+                'cells': board.get_states().translate(_VIEW).decode()}
+
+    def _close(self, request):
+        if self._sessions.pop(request['session'], None) is None:
+            raise ValueError(f"no session {request['session']!r}")
+        return {'closed': True}
+
+    def _stats(self, request):
+        return {'sessions': len(self._sessions), 'games': self._games, 'moves': self._moves, 'expired': self._expired,
+                'connections': self._connections, 'uptime': time.monotonic() - self._started}
+
+    def expire_idle(self):
+        """
+        Drops every session that has not been used for the idle timeout, returning how many there were.
+        """
+        cutoff = time.monotonic() - self._idle_timeout
+        expired = 0
+        while len(self._sessions) > 0:
+            session_id, session = next(iter(self._sessions.items()))
+            if session.last_used > cutoff:
+                break
+            del self._sessions[session_id]
+            expired += 1
+        self._expired += expired
+        return expired
+
+    async def _expire_loop(self):
+        """
+        A private coroutine to drop idle sessions a few times per idle timeout.
+        """
+        while True:
+            await asyncio.sleep(max(0.05, min(self._idle_timeout / 4, 10.0)))
+            self.expire_idle()
+
+    async def _serve_connection(self, reader, writer):
+        """
+        A private coroutine to answer the requests on one connection until it closes.
+        """
+        self._connections += 1
+        pending = b'' # the start of a request line not yet complete
+        try:
+            while True:
+                data = await reader.read(MAX_LINE)
+                if not data:
+                    break
+                # answer every complete line that arrived with a single write, so a pipelining client
+                # costs one wake-up per read rather than one per request
+                *lines, pending = (pending + data).split(b'\n')
+                if len(lines) > 0:
+                    writer.write(b''.join([self.handle_line(line) for line in lines]))
+                    await writer.drain()
+                if len(pending) > MAX_LINE:
+                    # the stream cannot be resynchronised after an overlong line, so give up on it
+                    writer.write(b'{"error": "request line too long"}\n')
+                    break
+        except ConnectionError:
+            pass
+        finally:
+            self._connections -= 1
+            writer.close()
+
+    async def serve_tcp(self, host='127.0.0.1', port=7469):
+        """
+        Serves clients over TCP until cancelled.
+        """
+        server = await asyncio.start_server(self._serve_connection, host, port)
+        await self._serve(server)
+
+    async def serve_unix(self, path):
+        """
+        Serves clients over a Unix domain socket at the given path until cancelled.
+        """
+        server = await asyncio.start_unix_server(self._serve_connection, path)
+        await self._serve(server)
+
+    async def _serve(self, server):
+        expiry = asyncio.ensure_future(self._expire_loop())
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            expiry.cancel()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Serve minesweeper sessions over line-delimited JSON.')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=7469)
+    parser.add_argument('--unix', metavar='PATH', help='listen on a Unix domain socket instead of TCP')
+    parser.add_argument('--idle-timeout', type=float, default=300.0, help='seconds before an unused session is dropped')
+    parser.add_argument('--max-sessions', type=int, default=100000)
+    args = parser.parse_args(argv)
+
+    server = GameServer(args.idle_timeout, args.max_sessions)
+    if args.unix is not None:
+        print(f'serving on {args.unix}')
+        serving = server.serve_unix(args.unix)
+    else:
+        print(f'serving on {args.host}:{args.port}')
+        serving = server.serve_tcp(args.host, args.port)
+    try:
+        asyncio.run(serving)
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == '__main__':
+    main()
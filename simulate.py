@@ -0,0 +1,245 @@
+"""
+Runs many headless games of minesweeper with a player strategy and reports win rate, time to solve,
+how often a guess was forced, and throughput. Games are split into chunks that run across a process
+pool; each chunk has its own seeded random number generator, and only merged totals are kept, so
+memory use does not grow with the number of games. With --record, every game is also written to a
+statistics database (see stats.py) under the strategy's name.
+
+Example:
+    python simulate.py --preset hard --games 100000 --strategy simple
+    python simulate.py --preset hard --games 100000 --record ~/.minesweeper_stats.db
+"""
+import argparse
+import concurrent.futures
+import os
+import random
+import time
+from board import PRESETS, WON
+from chunks import make_board, CHUNKED_THRESHOLD
+from players import STRATEGIES
+from stats import StatsStore, game_row
+
+class SimulationStats ():
+    """
+    Running totals over a set of simulated games. Stats from different chunks are combined with merge.
+    Solve times are kept in a histogram with buckets of 1.25x width, so percentiles are approximate but
+    the memory used stays fixed.
+    """
+    def __init__(self) -> None:
+        self.games = 0
+        self.wins = 0
+        self.guessed_games = 0 # games that needed at least one guess after the first click
+        self.guesses = 0
+        self.moves = 0
+        self.seconds = 0.0
+        self.won_seconds = 0.0
+        self._won_times = {} # histogram bucket -> number of won games
+        self.records = [] # game_row of each game, when recording; written out per chunk rather than merged
+
+    def add_game(self, won, moves, guesses, seconds):
+        """
+        Records the result of one game.
+        """
+        self.games += 1
+        self.moves += moves
+        self.guesses += guesses
+        self.seconds += seconds
+        if guesses > 0:
+            self.guessed_games += 1
+        if won:
+            self.wins += 1
+            self.won_seconds += seconds
+            bucket = _bucket(seconds)
+            self._won_times[bucket] = self._won_times.get(bucket, 0) + 1
+
+    def merge(self, other):
+        """
+        Adds the totals of another SimulationStats to this one.
+        """
+        self.games += other.games
+        self.wins += other.wins
+        self.guessed_games += other.guessed_games
+        self.guesses += other.guesses
+        self.moves += other.moves
+        self.seconds += other.seconds
+        self.won_seconds += other.won_seconds
+        for bucket, count in other._won_times.items():
+            self._won_times[bucket] = self._won_times.get(bucket, 0) + count
+
+    def get_win_rate(self):
+        return self.wins / self.games if self.games else 0.0
+
+    def get_solve_time_percentile(self, percent):
+        """
+        Returns the approximate solve time in seconds below which the given percent of won games fall.
+        """
+        target = self.wins * percent / 100
+        seen = 0
+        for bucket in sorted(self._won_times):
+            seen += self._won_times[bucket]
+            if seen >= target:
+                return _bucket_seconds(bucket)
+        return 0.0
+
+    def report(self, elapsed):
+        """
+        Returns a multi-line summary of the results, given the wall-clock seconds the run took.
+        """
+        games = max(self.games, 1)
+        lines = [
+            f"games:         {self.games}",
+            f"win rate:      {100 * self.get_win_rate():.2f}%",
+            f"forced guess:  {100 * self.guessed_games / games:.2f}% of games ({self.guesses / games:.2f} guesses per game)",
+            f"moves:         {self.moves / games:.1f} per game",
+        ]
+        if self.wins:
+            lines.append(f"solve time:    mean {1000 * self.won_seconds / self.wins:.3f} ms, "
+                         f"p50 {1000 * self.get_solve_time_percentile(50):.3f} ms, "
+                         f"p95 {1000 * self.get_solve_time_percentile(95):.3f} ms")
+        lines.append(f"throughput:    {self.games / elapsed if elapsed > 0 else 0:.0f} games/sec ({elapsed:.2f} s)")
+        return '\n'.join(lines)
+
+_BUCKET_BASE = 1.25
+_BUCKET_MIN = 1e-6
+
+def _bucket(seconds):
+    """
+    Returns the histogram bucket holding the given number of seconds.
+    """
+    bucket = 0
+    limit = _BUCKET_MIN
+    while seconds > limit:
+        limit *= _BUCKET_BASE
+        bucket += 1
+    return bucket
+
+def _bucket_seconds(bucket):
+    """
+    Returns the upper bound in seconds of the given histogram bucket.
+    """
+    return _BUCKET_MIN * _BUCKET_BASE ** bucket
+
+def play_game(board, player):
+    """
+    Plays one game on the given board with the given player until it is won or lost. Returns a tuple of
+    form (won, moves, guesses).
+    """
+    moves = 0
+    guesses = 0
+    while not board.is_over():
+        action, index, guessed = player.next_move(board)
+        row, column = board.coordinates(index)
+        if action == 'flag':
+            board.toggle_flag(row, column)
+        else:
+            board.reveal(row, column)
+        moves += 1
+        if guessed:
+            guesses += 1
+    return (board.get_status() == WON, moves, guesses)
+
+def run_chunk(rows, columns, mines, strategy, seed, chunk, games, safe_radius=0, record=False):
+    """
+    Plays the given number of games with a generator seeded from (seed, chunk) and returns their
+    SimulationStats, with the record of every game if record is set. This is the unit of work sent to
+    each worker process.
+    """
+    rng = random.Random(f'{seed}:{chunk}')
+    player_class = STRATEGIES[strategy]
+    stats = SimulationStats()
+    for game in range(games):
+        start = time.perf_counter()
+        board = make_board(rows, columns, mines, rng, safe_radius)
+        won, moves, guesses = play_game(board, player_class(rng))
+        seconds = time.perf_counter() - start
+        stats.add_game(won, moves, guesses, seconds)
+        if record:
+            stats.records.append(game_row(rows, columns, mines, won, 1000 * seconds, moves, board.get_correct_flag_count(),
+                                          board.get_wrong_flag_count(), player=strategy))
+    return stats
+
+def positive_int(text):
+    """
+    Returns the integer a command-line argument gives, rejecting anything below 1 (for argparse's type).
+    """
+    value = int(text)
+    if value < 1:
+        raise argparse.ArgumentTypeError(f'{text} is not a positive integer')
+    return value
+
+def simulate(rows, columns, mines, strategy, games, seed=0, workers=None, chunk_size=1000, safe_radius=0, store=None):
+    """
+    Runs the given number of games split into chunks over a process pool and returns the merged
+    SimulationStats. Only a few chunks per worker are in flight at once and results are merged as
+    they complete, so memory stays flat however many games are played. Given a StatsStore, the games
+    of each chunk are queued to it as the chunk completes. Raises ValueError unless games, chunk_size
+    and workers (when given) are positive.
+    """
+    if games < 1 or chunk_size < 1 or (workers is not None and workers < 1):
+        raise ValueError('games, chunk_size and workers must be positive')
+    record = store is not None
+    def collect(result):
+        if record:
+            store.record_many(result.records)
+        stats.merge(result)
+
+    workers = workers or os.cpu_count() or 1
+    chunks = [(chunk, min(chunk_size, games - chunk * chunk_size)) for chunk in range((games + chunk_size - 1) // chunk_size)]
+    stats = SimulationStats()
+    if workers == 1:
+        for chunk, size in chunks:
+            collect(run_chunk(rows, columns, mines, strategy, seed, chunk, size, safe_radius, record))
+        return stats
+
+    with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as executor:
+        pending = set()
+        next_chunk = 0
+        while next_chunk < len(chunks) or len(pending) > 0:
+            while next_chunk < len(chunks) and len(pending) < 2 * workers:
+                chunk, size = chunks[next_chunk]
+                pending.add(executor.submit(run_chunk, rows, columns, mines, strategy, seed, chunk, size, safe_radius, record))
+                next_chunk += 1
+            done, pending = concurrent.futures.wait(pending, return_when=concurrent.futures.FIRST_COMPLETED)
+            for future in done:
+                collect(future.result())
+    return stats
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Simulate headless minesweeper games.')
+    # chunked boards are far too large to play to the end
+    playable = sorted(preset for preset, (rows, columns, mines) in PRESETS.items() if rows * columns <= CHUNKED_THRESHOLD)
+    parser.add_argument('--preset', choices=playable, default='easy')
+    parser.add_argument('--rows', type=int, help='custom board height (overrides --preset)')
+    parser.add_argument('--columns', type=int, help='custom board width (overrides --preset)')
+    parser.add_argument('--mines', type=int, help='custom number of mines (overrides --preset)')
+    parser.add_argument('-n', '--games', type=positive_int, default=10000)
+    parser.add_argument('--strategy', choices=sorted(STRATEGIES), default='simple')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--workers', type=positive_int, help='number of worker processes (default: one per core)')
+    parser.add_argument('--chunk-size', type=positive_int, default=1000)
+    parser.add_argument('--safe-radius', type=int, default=0, help='cells around the first click kept free of mines')
+    parser.add_argument('--record', metavar='DATABASE', help='also write every game to this statistics database')
+    args = parser.parse_args(argv)
+
+    rows, columns, mines = PRESETS[args.preset]
+    rows = args.rows or rows
+    columns = args.columns or columns
+    mines = args.mines if args.mines is not None else mines
+    if rows * columns > CHUNKED_THRESHOLD:
+        parser.error(f'boards are limited to {CHUNKED_THRESHOLD} cells')
+    if args.safe_radius < 0:
+        parser.error('--safe-radius cannot be negative')
+
+    store = StatsStore(args.record) if args.record is not None else None
+    start = time.perf_counter()
+    try:
+        stats = simulate(rows, columns, mines, args.strategy, args.games, args.seed, args.workers, args.chunk_size,
+                         args.safe_radius, store)
+    finally:
+        if store is not None:
+            store.close()
+    print(f"{rows}x{columns}, {mines} mines, strategy '{args.strategy}'")
+    print(stats.report(time.perf_counter() - start))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,196 @@
+class Solver ():
+    """
+    Deduces which hidden cells of a board are certainly safe and which are certainly mines from the
+    revealed numbers. The solver keeps a frontier of revealed numbered cells that still border cells
+    of unknown state, and updates it from the board's reveal events rather than rescanning the board.
+    Only constraints touched by a change are re-examined on the next call to solve.
+
+    Each frontier cell gives a constraint: its unknown neighbours hold its count minus its known mine
+    neighbours. A constraint is settled by the single-cell rules (no mines left, or as many mines as
+    unknown cells), or by comparing it with each overlapping constraint: bounding how many mines the
+    shared cells can hold decides the cells outside the overlap whenever the bound is tight. This
+    covers the subset rule as a special case. Flags placed by the player are not trusted.
+    """
+    def __init__(self, board) -> None:
+        self._board = board
+        self._frontier = set() # revealed numbered cells with unknown neighbours
+        self._dirty = set() # frontier cells whose constraint changed since the last solve
+        self._safe = set() # hidden cells proven safe
+        self._mines = set() # cells proven to be mines
+        self._moves = [] # (action, index) for newly proven cells, in the order they were proven
+        self._pending = [] # batches of revealed cells not yet added to the frontier
+        board.subscribe(self._on_board_event)
+        for index in board.get_revealed():
+            if not board.is_mine(index):
+                self._add_revealed(index)
+
+    def detach(self):
+        """
+        Stops following the board's events.
+        """
+        self._board.unsubscribe(self._on_board_event)
+
+    def _on_board_event(self, event, data):
+        """
+        Queues revealed cells; they are added to the frontier when the solver is next used, so a large
+        reveal costs nothing until then. A restored board is solved again from scratch.
+        """
+        if event == 'reveal':
+            self._pending.append(data)
+        elif event == 'restore':
+            # cells may be hidden again, and what was deduced from them must not carry over; start
+            # over from the revealed cells
+            self._frontier = set()
+            self._dirty = set()
+            self._safe = set()
+            self._mines = set()
+            self._moves = []
+            board = self._board
+            self._pending = [[index for index in board.get_revealed() if not board.is_mine(index)]]
+
+    def _catch_up(self):
+        """
+        A private method to add the queued revealed cells to the frontier.
+        """
+        while len(self._pending) > 0:
+            for index in self._pending.pop(0):
+                self._add_revealed(index)
+
+    def _add_revealed(self, index):
+        """
+        A private method to record a newly revealed cell: it joins the frontier if it has a number, and the
+        frontier cells around it are queued for re-examination.
+        """
+        self._safe.discard(index)
+        if self._board.get_count(index) > 0:
+            self._frontier.add(index)
+            self._dirty.add(index)
+        for adj in self._board.get_adjacent_indices(index):
+            if adj in self._frontier:
+                self._dirty.add(adj)
+
+    def get_frontier(self):
+        """
+        Returns a set of the revealed numbered cells that still border unknown cells.
+        """
+        self._catch_up()
+        return set(self._frontier)
+
+    def get_constraint(self, index):
+        """
+        Returns a tuple of form (unknown, mines) for the frontier cell at the given index:
+        the set of its neighbours not yet known to be safe or a mine, and how many mines are among them.
+        """
+        board = self._board
+        unknown = set()
+        mines = board.get_count(index)
+        for adj in board.get_adjacent_indices(index):
+            if board.is_revealed(adj) or adj in self._safe:
+                continue
+            if adj in self._mines:
+                mines -= 1
+            else:
+                unknown.add(adj)
+        return (unknown, mines)
+
+    def _mark(self, cells, is_mine):
+        """
+        A private method to record the given cells as proven mines or proven safe and to queue every
+        frontier cell next to them for re-examination.
+        """
+        known = self._mines if is_mine else self._safe
+        action = 'flag' if is_mine else 'reveal'
+        for cell in cells:
+            if cell in known:
+                continue
+            known.add(cell)
+            self._moves.append((action, cell))
+            for adj in self._board.get_adjacent_indices(cell):
+                if adj in self._frontier:
+                    self._dirty.add(adj)
+
+    def solve(self):
+        """
+        Re-examines every changed constraint until no more cells can be decided.
+        """
+        self._catch_up()
+        while len(self._dirty) > 0:
+            index = self._dirty.pop()
+            if index not in self._frontier:
+                continue
+            unknown, mines = self.get_constraint(index)
+            if len(unknown) == 0:
+                self._frontier.discard(index) # fully decided; it can never gain unknown cells again
+            elif mines == 0:
+                self._mark(unknown, False)
+            elif mines == len(unknown):
+                self._mark(unknown, True)
+            else:
+                self._compare_neighbours(index, unknown, mines)
+
+    def _compare_neighbours(self, index, unknown, mines):
+        """
+        A private method to compare the constraint of the given frontier cell with each frontier cell that
+        shares an unknown cell with it.
+        """
+        board = self._board
+        others = set()
+        for cell in unknown:
+            for adj in board.get_adjacent_indices(cell):
+                if adj in self._frontier and adj != index:
+                    others.add(adj)
+        for other in others:
+            other_unknown, other_mines = self.get_constraint(other)
+            shared = unknown & other_unknown
+            if len(shared) == 0:
+                continue
+            only_this = unknown - shared
+            only_other = other_unknown - shared
+            # the fewest and most mines the shared cells can hold given both constraints
+            fewest = max(0, mines - len(only_this), other_mines - len(only_other))
+            most = min(len(shared), mines, other_mines)
+            if self._settle(only_this, mines, fewest, most) | self._settle(only_other, other_mines, fewest, most):
+                return # the constraint changed; it has been queued again
+
+    def _settle(self, cells, mines, fewest, most):
+        """
+        A private method to decide the given cells if the bounds on the shared cells force them: they
+        hold mines minus however many the shared cells hold. Returns True if anything was decided.
+        """
+        if len(cells) == 0:
+            return False
+        if mines - most == len(cells):
+            self._mark(cells, True)
+            return True
+        if mines - fewest == 0:
+            self._mark(cells, False)
+            return True
+        return False
+
+    def get_safe_cells(self):
+        """
+        Returns a set of the hidden cells proven safe (call solve first to bring it up to date).
+        """
+        return set(self._safe)
+
+    def get_mine_cells(self):
+        """
+        Returns a set of the cells proven to be mines (call solve first to bring it up to date).
+        """
+        return set(self._mines)
+
+    def next_move(self):
+        """
+        Returns a certain move as a tuple of form (action, index), where action is 'reveal' for a proven
+        safe cell or 'flag' for a proven mine that is not flagged yet. Returns None if no cell is certain.
+        """
+        board = self._board
+        self.solve()
+        while len(self._moves) > 0:
+            action, index = self._moves[-1]
+            if action == 'reveal' and not board.is_revealed(index) and not board.is_flagged(index):
+                return self._moves[-1]
+            if action == 'flag' and not board.is_flagged(index):
+                return self._moves[-1]
+            self._moves.pop() # already played
+        return None
@@ -1,4 +1,5 @@
 import tkinter as tk
+from presets import PRESETS
 import os
 import sys
 
@@ -6,6 +7,7 @@ class StartMenu():
     def __init__(self, master, root) -> None:
         self._master = master
         self._root = root
+        self._instructions = None # text of instructions.txt, read once
         self._frame = tk.Frame(self._root, padx=20, pady=20)
         self._frame.pack()
 
@@ -26,31 +28,56 @@ class StartMenu():
         medium_mode.pack(anchor=tk.W)
         hard_mode = tk.Radiobutton(difficulty_frame, text="Hard", variable=self._difficulty, value='hard')
         hard_mode.pack(anchor=tk.W)
+        huge_mode = tk.Radiobutton(difficulty_frame, text="Huge", variable=self._difficulty, value='huge')
+        huge_mode.pack(anchor=tk.W)
+        self._no_guess = tk.BooleanVar(value=False)
+        no_guess_mode = tk.Checkbutton(difficulty_frame, text="No guessing", variable=self._no_guess)
+        no_guess_mode.pack(anchor=tk.W)
 
         # start game button
         self._new_game = tk.Button(self._frame, text='Start Game', command=self._start_game)
         self._new_game.pack()
+        # resumes the game saved with the Save button; enabled only while there is one
+        self._resume_button = tk.Button(self._frame, text='Resume Game', command=self._resume_game)
+        self._resume_button.pack()
+        self._update_resume_button()
         # button for instructions pop-up
         self._instructions_button = tk.Button(self._frame, text='Instructions', command=self._open_instructions)
         self._instructions_button.pack()
+        # button for the statistics pop-up
+        self._stats_button = tk.Button(self._frame, text='Statistics', command=self._open_statistics)
+        self._stats_button.pack()
     
     def _start_game(self):
         """
         Removes the start menu items from the root window, then requests a game to be started in the window.
         """
         self._frame.pack_forget() # remove start menu items from window
-        if self._difficulty.get() == 'easy':
-            self._master.make_new_game(9,9,10)
-        elif self._difficulty.get() == 'medium':
-            self._master.make_new_game(16,16,40)
-        else: # hard mode
-            self._master.make_new_game(16,30,99)
+        self._master.make_new_game(*PRESETS[self._difficulty.get()], no_guess=self._no_guess.get())
+
+    def _resume_game(self):
+        """
+        Removes the start menu items from the root window and resumes the saved game in it. If the save
+        cannot be read, the menu stays and the resume button is disabled.
+        """
+        self._frame.pack_forget()
+        if not self._master.resume_game():
+            self._frame.pack()
+            self._root.bell()
+        self._update_resume_button()
+
+    def _update_resume_button(self):
+        """
+        A private method to enable the resume button only while there is a saved game.
+        """
+        self._resume_button['state'] = tk.NORMAL if self._master.has_saved_game() else tk.DISABLED
     
     def open_menu(self):
         """
         Adds the menu elements to the root window. Note that nothing is removed from the root window
         before this; it is assumed the root window is empty. 
         """
+        self._update_resume_button()
         self._frame.pack()
 
     def _open_instructions(self):
@@ -63,12 +90,44 @@ class StartMenu():
         frame.pack()
         header = tk.Label(frame, text='Instructions', font=('Segoe UI', '12'))
         header.pack()
-        with open(self.resource_path('instructions.txt'), 'r') as text:
-            instructions = tk.Label(frame, text=text.read(), anchor='w', justify='left', wraplength=300)
+        instructions = tk.Label(frame, text=self.load_instructions(), anchor='w', justify='left', wraplength=300)
         instructions.pack()
         quit_button = tk.Button(frame, text='Close Instructions', command=instructions_window.destroy)
         quit_button.pack()
     
+    def _open_statistics(self):
+        """
+        Creates a pop-up with the win rate and solve times of every board setup played.
+        """
+        from stats import format_summary # sqlite is only loaded once statistics are needed
+        summary = self._master.get_stats_store().get_summary()
+        statistics_window = tk.Toplevel()
+        statistics_window.title("Statistics")
+        frame = tk.Frame(statistics_window, padx=20, pady=20)
+        frame.pack()
+        header = tk.Label(frame, text='Statistics', font=('Segoe UI', '12'))
+        header.pack()
+        if len(summary) == 0:
+            table = tk.Label(frame, text='No games finished yet.')
+        else:
+            table = tk.Label(frame, text=format_summary(summary), anchor='w', justify='left', font=('Courier', '10'))
+        table.pack()
+        dropped = self._master.get_stats_store().get_dropped_count()
+        if dropped > 0:
+            warning = tk.Label(frame, text=f'{dropped} games could not be saved and are not included.')
+            warning.pack()
+        quit_button = tk.Button(frame, text='Close Statistics', command=statistics_window.destroy)
+        quit_button.pack()
+
+    def load_instructions(self):
+        """
+        Returns the text of the instructions, reading the file only the first time.
+        """
+        if self._instructions is None:
+            with open(self.resource_path('instructions.txt'), 'r') as text:
+                self._instructions = text.read()
+        return self._instructions
+
     def resource_path(self, relative_path):
         """ 
         Get absolute path to resource, works for dev and for PyInstaller 
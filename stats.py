@@ -0,0 +1,292 @@
+"""
+A SQLite store of finished games, for personal bests, solve-time percentiles and win rates per board
+setup. Games are written by a background thread: record only queues the game, so finishing a game never
+waits on the disk, and everything queued by the time the writer wakes up goes into one transaction, so
+simulation runs can add millions of games quickly.
+
+Queries run on the caller's thread. A totals table keeps the game and win counts of each setup up to
+date as games are written, and the games table has an index on (setup, player, won, duration). A best
+time is read straight from the index. A percentile steps along the index to its position, which avoids
+sorting but still takes time in proportion to the won games before it (a few milliseconds with two
+million games of one setup).
+
+Example:
+    python stats.py ~/.minesweeper_stats.db
+    python stats.py ~/.minesweeper_stats.db --player solver
+"""
+import argparse
+import queue
+import sqlite3
+import threading
+import time
+from board import PRESETS
+from ioerrors import report_write_error
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS games (
+    id INTEGER PRIMARY KEY,
+    finished REAL NOT NULL,        -- unix time the game ended
+    setup TEXT NOT NULL,           -- preset name, or rows x columns / mines for a custom board
+    rows INTEGER NOT NULL,
+    columns INTEGER NOT NULL,
+    mines INTEGER NOT NULL,
+    seed INTEGER,                  -- seed the mines were placed from, when known
+    no_guess INTEGER NOT NULL,
+    player TEXT NOT NULL,          -- 'human', or the strategy of a simulated game
+    won INTEGER NOT NULL,
+    duration_ms INTEGER NOT NULL,
+    clicks INTEGER NOT NULL,
+    correct_flags INTEGER NOT NULL,
+    wrong_flags INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS games_by_time ON games (setup, player, won, duration_ms);
+CREATE TABLE IF NOT EXISTS totals (
+    setup TEXT NOT NULL,
+    player TEXT NOT NULL,
+    games INTEGER NOT NULL,
+    wins INTEGER NOT NULL,
+    PRIMARY KEY (setup, player)
+);
+"""
+_INSERT = ('INSERT INTO games (finished, setup, rows, columns, mines, seed, no_guess, player, won, duration_ms, clicks, '
+           'correct_flags, wrong_flags) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)')
+_ADD_TOTALS = ('INSERT INTO totals (setup, player, games, wins) VALUES (?, ?, ?, ?) ON CONFLICT (setup, player) '
+               'DO UPDATE SET games = games + excluded.games, wins = wins + excluded.wins')
+
+# most games written in one transaction
+BATCH_SIZE = 10000
+
+def setup_name(rows, columns, mines):
+    """
+    Returns the name games of the given setup are filed under: the preset's name, or e.g. '20x20/50'.
+    """
+    for name, preset in PRESETS.items():
+        if preset == (rows, columns, mines):
+            return name
+    return f'{rows}x{columns}/{mines}'
+
+def game_row(rows, columns, mines, won, duration_ms, clicks=0, correct_flags=0, wrong_flags=0, seed=None,
+             no_guess=False, player='human', finished=None):
+    """
+    Returns a finished game as a tuple ready to be written by StatsStore.record_many.
+    """
+    return (finished if finished is not None else time.time(), setup_name(rows, columns, mines), rows, columns, mines,
+            seed, int(no_guess), player, int(won), int(duration_ms), clicks, correct_flags, wrong_flags)
+
+class StatsStore ():
+    """
+    The statistics database at one path. Writes go through a queue to a background thread; queries use
+    a connection of the thread that created the store.
+    """
+    def __init__(self, path, batch_size=BATCH_SIZE) -> None:
+        self._path = path
+        self._batch_size = batch_size
+        self._connection = sqlite3.connect(path)
+        # write-ahead logging lets queries read while the writer thread has a transaction open
+        self._connection.execute('PRAGMA journal_mode=WAL')
+        self._connection.executescript(_SCHEMA)
+        self._connection.commit()
+        self._queue = queue.Queue() # lists of game rows, or None to stop the writer
+        self._dropped = 0 # games that could not be written
+        self._disabled = False # set if the writer thread cannot open the database; games are then dropped
+        self._writer = threading.Thread(target=self._write_loop, name='stats-writer', daemon=True)
+        self._writer.start()
+
+    def record(self, rows, columns, mines, won, duration_ms, clicks=0, correct_flags=0, wrong_flags=0, seed=None,
+               no_guess=False, player='human'):
+        """
+        Queues a finished game to be written. Returns at once.
+        """
+        if self._disabled:
+            self._dropped += 1
+            return
+        self._queue.put([game_row(rows, columns, mines, won, duration_ms, clicks, correct_flags, wrong_flags, seed,
+                                  no_guess, player)])
+
+    def record_many(self, games):
+        """
+        Queues a list of games made by game_row to be written. Returns at once.
+        """
+        if self._disabled:
+            self._dropped += len(games)
+            return
+        if len(games) > 0:
+            self._queue.put(games)
+
+    def flush(self):
+        """
+        Waits until every queued game has been written (or dropped, if the store is disabled).
+        """
+        if self._disabled:
+            return
+        self._queue.join()
+
+    def close(self):
+        """
+        Writes the queued games, stops the writer thread and closes the database.
+        """
+        self._queue.put(None)
+        self._writer.join()
+        self._connection.close()
+
+    def _write_loop(self):
+        """
+        A private method run by the writer thread: writes whatever is queued in one transaction per wake-up.
+        If the thread cannot open the database, the failure is reported and the store is disabled.
+        """
+        connection = None
+        try:
+            connection = sqlite3.connect(self._path)
+            # with write-ahead logging, NORMAL still never corrupts the database; at worst the last games
+            # written before a power cut are lost. The larger cache keeps the index pages being updated.
+            connection.execute('PRAGMA synchronous=NORMAL')
+            connection.execute('PRAGMA cache_size=-65536')
+        except sqlite3.Error as error:
+            report_write_error('statistics', error)
+            self._disabled = True
+            if connection is not None:
+                connection.close()
+            self._drop_queued()
+            return
+        try:
+            stop = False
+            while not stop:
+                games = []
+                taken = 0
+                item = self._queue.get()
+                while True:
+                    taken += 1
+                    if item is None:
+                        stop = True
+                        break
+                    games.extend(item)
+                    if len(games) >= self._batch_size:
+                        break
+                    try:
+                        item = self._queue.get_nowait()
+                    except queue.Empty:
+                        break
+                if len(games) > 0:
+                    self._write(connection, games)
+                for i in range(taken):
+                    self._queue.task_done()
+        finally:
+            connection.close()
+
+    def _drop_queued(self):
+        """
+        A private method run by the writer thread of a disabled store: counts every game queued from now
+        until close as dropped, so flush and close never wait on a writer that cannot write.
+        """
+        while True:
+            item = self._queue.get()
+            if item is not None:
+                self._dropped += len(item)
+            self._queue.task_done()
+            if item is None:
+                return
+
+    def _write(self, connection, games):
+        """
+        A private method to insert games and add them to the totals in one transaction.
+        """
+        totals = {} # (setup, player) -> [games, wins]
+        for game in games:
+            counts = totals.setdefault((game[1], game[7]), [0, 0])
+            counts[0] += 1
+            counts[1] += game[8]
+        try:
+            with connection:
+                connection.executemany(_INSERT, games)
+                connection.executemany(_ADD_TOTALS, [(setup, player, count, wins) for (setup, player), (count, wins) in totals.items()])
+        except sqlite3.Error as error:
+            self._dropped += len(games)
+            report_write_error('statistics', error)
+
+    def get_dropped_count(self):
+        """
+        Returns the number of games that could not be written to the database, including those dropped
+        because the store is disabled.
+        """
+        return self._dropped
+
+    def get_totals(self, setup, player='human'):
+        """
+        Returns a tuple of form (games, wins) for the given setup name.
+        """
+        row = self._connection.execute('SELECT games, wins FROM totals WHERE setup = ? AND player = ?', (setup, player)).fetchone()
+        return row if row is not None else (0, 0)
+
+    def get_win_rate(self, setup, player='human'):
+        games, wins = self.get_totals(setup, player)
+        return wins / games if games else 0.0
+
+    def get_best_time(self, setup, player='human'):
+        """
+        Returns the shortest duration in milliseconds of a won game of the given setup, or None.
+        """
+        return self._connection.execute('SELECT MIN(duration_ms) FROM games WHERE setup = ? AND player = ? AND won = 1',
+                                        (setup, player)).fetchone()[0]
+
+    def get_percentile(self, setup, percent, player='human'):
+        """
+        Returns the duration in milliseconds below which the given percent of won games of the given
+        setup fall, or None if none were won.
+        """
+        wins = self.get_totals(setup, player)[1]
+        if wins == 0:
+            return None
+        # walk the index to the right position rather than sorting
+        offset = min(wins - 1, int(wins * percent / 100))
+        row = self._connection.execute('SELECT duration_ms FROM games WHERE setup = ? AND player = ? AND won = 1 '
+                                       'ORDER BY duration_ms LIMIT 1 OFFSET ?', (setup, player, offset)).fetchone()
+        return row[0] if row is not None else None
+
+    def get_summary(self, player='human'):
+        """
+        Returns a list of (setup, games, wins, best ms, median ms, 90th percentile ms) tuples for every
+        setup the player has finished a game of, the most played first.
+        """
+        summary = []
+        for setup, games, wins in self._connection.execute('SELECT setup, games, wins FROM totals WHERE player = ? '
+                                                           'ORDER BY games DESC', (player,)).fetchall():
+            summary.append((setup, games, wins, self.get_best_time(setup, player), self.get_percentile(setup, 50, player),
+                            self.get_percentile(setup, 90, player)))
+        return summary
+
+    def get_players(self):
+        """
+        Returns a list of every player with recorded games.
+        """
+        return [row[0] for row in self._connection.execute('SELECT DISTINCT player FROM totals ORDER BY player')]
+
+def format_summary(summary):
+    """
+    Returns the rows of get_summary as lines of a text table.
+    """
+    def seconds(ms):
+        return f'{ms / 1000:.1f}' if ms is not None else '-'
+    lines = [f"{'setup':<14}{'games':>9}{'win rate':>10}{'best':>9}{'median':>9}{'p90':>9}  (s)"]
+    for setup, games, wins, best, median, slow in summary:
+        lines.append(f'{setup:<14}{games:>9}{100 * wins / games:>9.1f}%{seconds(best):>9}{seconds(median):>9}{seconds(slow):>9}')
+    return '\n'.join(lines)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Show minesweeper statistics.')
+    parser.add_argument('database')
+    parser.add_argument('--player', default='human', help="whose games to show: 'human' or a simulated strategy")
+    args = parser.parse_args(argv)
+
+    store = StatsStore(args.database)
+    try:
+        summary = store.get_summary(args.player)
+        if len(summary) == 0:
+            players = store.get_players()
+            print(f"No games by '{args.player}'." + (f" Players: {', '.join(players)}" if players else ''))
+        else:
+            print(format_summary(summary))
+    finally:
+        store.close()
+
+if __name__ == '__main__':
+    main()
@@ -1,10 +1,22 @@
 import time
 import tkinter as tk
 
+_NS_PER_MS = 1000000
+_NS_PER_SECOND = 1000000000
+
 class Timer ():
     def __init__(self, root) -> None:
-        self._start_time = None
-        self._end_time = None
+        self._root = root
+        # readings of the monotonic perf_counter_ns clock, so changes to the system clock do not matter
+        self._start_ns = None
+        self._end_ns = None
+        self._paused_ns = None # reading when the window was minimized, while it stays minimized
+        self._tick = None # id of the scheduled label update, if any
+        self._shown = None # text on the label, so it is only set when it changes
+        # a bind tag of this timer's own on the window, so its <Map> and <Unmap> bindings can be removed
+        # without touching any others bound to the window
+        self._tag = f'Timer{id(self)}'
+        self._bindings = None # ids of the tag's <Map> and <Unmap> bindings while the timer runs
         self._label = tk.Label(root, text='00:00')
 
     def get_label(self):
@@ -13,30 +25,96 @@ class Timer ():
         """
         return self._label
 
-    def start(self):
+    def start(self, elapsed=0.0):
         """
-        Starts the timer.
+        Starts the timer, counting from the given number of seconds (e.g. for a resumed game). The timer
+        is paused while the window is minimized, since the board cannot be played then.
         """
-        self._start_time = time.time()
+        self._start_ns = time.perf_counter_ns() - int(elapsed * _NS_PER_SECOND)
+        self._end_ns = None
+        self._paused_ns = None
+        if self._bindings is None:
+            self._bindings = (self._root.bind_class(self._tag, '<Map>', self._on_map),
+                              self._root.bind_class(self._tag, '<Unmap>', self._on_unmap))
+            self._root.bindtags((self._tag,) + self._root.bindtags())
+        self._cancel_tick()
         self._update_time()
 
+    def get_elapsed(self):
+        """
+        Returns the number of seconds the timer has run (0 if it has not been started).
+        """
+        return self._get_elapsed_ns() / _NS_PER_SECOND
+
+    def get_elapsed_ms(self):
+        """
+        Returns the whole number of milliseconds the timer has run (0 if it has not been started).
+        """
+        return self._get_elapsed_ns() // _NS_PER_MS
+
+    def _get_elapsed_ns(self):
+        """
+        A private method to return the number of nanoseconds the timer has run.
+        """
+        if self._start_ns is None:
+            return 0
+        if self._end_ns is not None:
+            return self._end_ns - self._start_ns
+        if self._paused_ns is not None:
+            return self._paused_ns - self._start_ns
+        return time.perf_counter_ns() - self._start_ns
+
     def is_active(self):
         """
         Returns a Boolean value indicating if the timer is currently running
         (i.e., has been started and has not been stopped).
         """
-        return self._start_time is not None and self._end_time is None
+        return self._start_ns is not None and self._end_ns is None
     
     def _update_time(self):
         """
-        A private method to update the time label each second.
+        A private method to update the time label each second. Each update is scheduled for just after
+        the next whole second of elapsed time, so a late update does not delay the ones after it.
         """
+        self._tick = None
         if self.is_active():
-            time_diff = time.time() - self._start_time
-            seconds = self._format_time(time_diff % 60)
-            minutes = self._format_time(time_diff // 60)
-            self._label['text']= minutes + ':' + seconds
-            self._label.after(1000, self._update_time) # recalls this function each second to update
+            elapsed = self._get_elapsed_ns()
+            total_seconds = elapsed // _NS_PER_SECOND
+            text = self._format_time(total_seconds // 60) + ':' + self._format_time(total_seconds % 60)
+            if text != self._shown:
+                self._label['text'] = text
+                self._shown = text
+            # rounded up to the millisecond so the update never runs just before the second turns over
+            delay = -(-(_NS_PER_SECOND - elapsed % _NS_PER_SECOND) // _NS_PER_MS)
+            self._tick = self._label.after(delay, self._update_time)
+
+    def _cancel_tick(self):
+        """
+        A private method to cancel the scheduled label update, if there is one.
+        """
+        if self._tick is not None:
+            self._label.after_cancel(self._tick)
+            self._tick = None
+
+    def _on_map(self, event):
+        """
+        A private method to resume the timer, and updating its label, when the window is shown again.
+        """
+        if self._paused_ns is not None:
+            # move the start forward by the time spent minimized, so that time is not counted
+            self._start_ns += time.perf_counter_ns() - self._paused_ns
+            self._paused_ns = None
+        if self._tick is None and self.is_active():
+            self._update_time()
+
+    def _on_unmap(self, event):
+        """
+        A private method to pause the timer while the window is minimized. The label is not updated
+        either, so a hidden game does not wake up every second.
+        """
+        if self.is_active() and self._paused_ns is None:
+            self._paused_ns = time.perf_counter_ns()
+        self._cancel_tick()
     
     def _format_time(self, time):
         """
@@ -52,15 +130,26 @@ class Timer ():
         """
         Stops the timer.
         """
-        self._end_time = time.time()
+        self._end_ns = self._paused_ns if self._paused_ns is not None else time.perf_counter_ns()
+        self._paused_ns = None
+        self._cancel_tick()
+        if self._bindings is not None:
+            # only this timer's tag carries these bindings, so removing them leaves the window's own alone
+            self._root.unbind_class(self._tag, '<Map>')
+            self._root.unbind_class(self._tag, '<Unmap>')
+            for funcid in self._bindings:
+                self._root.deletecommand(funcid)
+            self._root.bindtags(tuple(tag for tag in self._root.bindtags() if tag != self._tag))
+            self._bindings = None
     
     def get_final_time(self):
         """
-        Returns a tuple of form (minutes, seconds) representing the final time. Note that
-        the stopwatch must have been started and stopped to retrieve a final time. Otherwise,
-        None is returned. 
+        Returns a tuple of form (minutes, seconds, milliseconds) representing the final time, e.g.
+        ('01', '05', '042'). Note that the stopwatch must have been started and stopped to retrieve
+        a final time. Otherwise, None is returned. 
         """
-        if self._end_time is not None:
-            seconds = self._format_time((self._end_time - self._start_time) % 60)
-            minutes = self._format_time((self._end_time - self._start_time) // 60)
-            return (minutes, seconds)
\ No newline at end of file
+        if self._end_ns is not None:
+            total_ms = self.get_elapsed_ms()
+            seconds = self._format_time(total_ms // 1000 % 60)
+            minutes = self._format_time(total_ms // 60000)
+            return (minutes, seconds, f'{total_ms % 1000:03d}')
\ No newline at end of file
@@ -0,0 +1,172 @@
+"""
+Invariants of the headless Board, checked against naive reference implementations on seeded random
+boards: mine placement and adjacent counts, flood fill, the running counters, and undo/redo through
+snapshots. Run with python -m unittest (or pytest) from the repository root.
+"""
+import random
+import unittest
+from collections import deque
+from board import Board, READY, PLAYING, WON, LOST
+from history import History
+
+def naive_neighbours(rows, columns, index):
+    row, column = divmod(index, columns)
+    return [i * columns + j
+            for i in range(max(0, row - 1), min(rows, row + 2))
+            for j in range(max(0, column - 1), min(columns, column + 2))
+            if (i, j) != (row, column)]
+
+def naive_flood(board, index):
+    """
+    Returns the set of cells a reveal of the given safe, hidden cell should uncover: breadth-first
+    from it through cells with no adjacent mines, never entering flagged or revealed cells.
+    """
+    rows, columns = board.get_rows(), board.get_columns()
+    opened = {index}
+    queue = deque([index])
+    while len(queue) > 0:
+        cell = queue.popleft()
+        if board.get_count(cell) != 0:
+            continue
+        for adj in naive_neighbours(rows, columns, cell):
+            if adj not in opened and not board.is_revealed(adj) and not board.is_flagged(adj):
+                opened.add(adj)
+                queue.append(adj)
+    return opened
+
+def random_board(rng, safe_radius=0):
+    rows = rng.randint(1, 30)
+    columns = rng.randint(1, 30)
+    mines = rng.randint(0, rows * columns - 1)
+    return Board(rows, columns, mines, random.Random(rng.getrandbits(32)), safe_radius)
+
+def hidden_cells(board):
+    return [i for i in range(board.get_rows() * board.get_columns())
+            if not board.is_revealed(i) and not board.is_flagged(i)]
+
+class TestPlacement (unittest.TestCase):
+    def test_counts_match_naive(self):
+        rng = random.Random(1)
+        for trial in range(200):
+            board = random_board(rng, safe_radius=rng.choice([0, 1, 2]))
+            rows, columns = board.get_rows(), board.get_columns()
+            first = rng.randrange(rows * columns)
+            board.reveal(*board.coordinates(first))
+            mines = set(board.get_mines())
+            self.assertEqual(len(mines), board.get_bomb_count())
+            self.assertEqual(len(board.get_mines()), len(mines)) # no mine placed twice
+            for index in range(rows * columns):
+                self.assertEqual(board.is_mine(index), index in mines)
+                expected = sum(1 for adj in naive_neighbours(rows, columns, index) if adj in mines)
+                self.assertEqual(board.get_count(index), expected)
+
+    def test_safe_zone_is_mine_free(self):
+        rng = random.Random(2)
+        for trial in range(200):
+            board = random_board(rng, safe_radius=rng.choice([0, 1, 2]))
+            first = rng.randrange(board.get_rows() * board.get_columns())
+            zone = board.get_safe_zone(first)
+            board.reveal(*board.coordinates(first))
+            self.assertIn(first, zone)
+            self.assertFalse(any(board.is_mine(index) for index in zone))
+            self.assertNotEqual(board.get_status(), LOST)
+
+    def test_invalid_setups_raise(self):
+        with self.assertRaises(ValueError):
+            Board(3, 3, 9)
+        with self.assertRaises(ValueError):
+            Board(3, 3, 1, safe_radius=-1)
+
+class TestFloodFill (unittest.TestCase):
+    def test_reveal_matches_breadth_first_search(self):
+        rng = random.Random(3)
+        for trial in range(150):
+            board = random_board(rng)
+            board.reveal(*board.coordinates(rng.randrange(board.get_rows() * board.get_columns())))
+            while board.get_status() == PLAYING:
+                # flag cells now and then so the fill has to stop at them
+                if rng.random() < 0.5 and len(hidden_cells(board)) > 0:
+                    board.toggle_flag(*board.coordinates(rng.choice(hidden_cells(board))))
+                safe = [cell for cell in hidden_cells(board) if not board.is_mine(cell)]
+                if len(safe) == 0:
+                    break
+                cell = rng.choice(safe)
+                expected = naive_flood(board, cell)
+                revealed = board.reveal(*board.coordinates(cell))
+                self.assertEqual(len(revealed), len(set(revealed))) # each cell reported once
+                self.assertEqual(set(revealed), expected)
+
+class TestCounters (unittest.TestCase):
+    def assert_counters(self, board):
+        size = board.get_rows() * board.get_columns()
+        revealed = [i for i in range(size) if board.is_revealed(i)]
+        flagged = [i for i in range(size) if board.is_flagged(i)]
+        correct = sum(1 for i in flagged if board.is_mine(i))
+        self.assertEqual(board.get_revealed_count(), sum(1 for i in revealed if not board.is_mine(i)))
+        self.assertEqual(board.get_flag_count(), len(flagged))
+        self.assertEqual(sorted(board.get_flagged()), flagged)
+        self.assertEqual(board.get_correct_flag_count(), correct)
+        self.assertEqual(board.get_wrong_flag_count(), len(flagged) - correct)
+        self.assertEqual(board.get_remaining_mines(), board.get_bomb_count() - len(flagged))
+        self.assertEqual(sorted(board.get_revealed()), revealed)
+
+    def test_counters_follow_random_play(self):
+        rng = random.Random(4)
+        for trial in range(150):
+            board = random_board(rng)
+            self.assertEqual(board.get_status(), READY)
+            while not board.is_over():
+                cell = rng.choice(hidden_cells(board) + sorted(board.get_flagged()))
+                if rng.random() < 0.25 or board.is_flagged(cell):
+                    board.toggle_flag(*board.coordinates(cell))
+                else:
+                    board.reveal(*board.coordinates(cell))
+                self.assert_counters(board)
+                if board.get_status() == PLAYING:
+                    safe_left = board.get_rows() * board.get_columns() - board.get_bomb_count() - board.get_revealed_count()
+                    self.assertGreater(safe_left, 0)
+            if board.get_status() == WON:
+                self.assertEqual(board.get_revealed_count(), board.get_rows() * board.get_columns() - board.get_bomb_count())
+            states = board.get_states()
+            board.reveal(0, 0) # moves after the end are ignored
+            board.toggle_flag(0, 0)
+            self.assertEqual(board.get_states(), states)
+
+class TestUndoRedo (unittest.TestCase):
+    def test_round_trip(self):
+        rng = random.Random(5)
+        for trial in range(100):
+            board = random_board(rng)
+            board.reveal(*board.coordinates(rng.randrange(board.get_rows() * board.get_columns())))
+            history = History(board)
+            seen = [(board.get_states(), board.get_status(), board.get_revealed_count(), board.get_flag_count())]
+            while not board.is_over() and len(seen) < 15 and len(hidden_cells(board)) > 0:
+                cell = rng.choice(hidden_cells(board))
+                if rng.random() < 0.3:
+                    board.toggle_flag(*board.coordinates(cell))
+                else:
+                    board.reveal(*board.coordinates(cell))
+                history.checkpoint()
+                seen.append((board.get_states(), board.get_status(), board.get_revealed_count(), board.get_flag_count()))
+            for expected in reversed(seen[:-1]):
+                self.assertTrue(history.undo())
+                self.assertEqual((board.get_states(), board.get_status(), board.get_revealed_count(), board.get_flag_count()), expected)
+            self.assertFalse(history.undo())
+            for expected in seen[1:]:
+                self.assertTrue(history.redo())
+                self.assertEqual((board.get_states(), board.get_status(), board.get_revealed_count(), board.get_flag_count()), expected)
+            self.assertFalse(history.redo())
+
+    def test_states_reload(self):
+        rng = random.Random(6)
+        for trial in range(100):
+            board = random_board(rng)
+            board.reveal(*board.coordinates(rng.randrange(board.get_rows() * board.get_columns())))
+            copy = Board(board.get_rows(), board.get_columns(), board.get_bomb_count())
+            copy.set_states(board.get_states())
+            self.assertEqual(copy.get_status(), board.get_status())
+            self.assertEqual(sorted(copy.get_mines()), sorted(board.get_mines()))
+            self.assertEqual(copy.get_revealed_count(), board.get_revealed_count())
+
+if __name__ == '__main__':
+    unittest.main()
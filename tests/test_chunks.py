@@ -0,0 +1,101 @@
+"""
+ChunkedBoard against a plain Board: mines and adjacent counts across chunk edges, the safe zone, and
+random play with so few chunks kept decoded that they are evicted and reloaded all the time. Run with
+python -m unittest (or pytest) from the repository root.
+"""
+import random
+import unittest
+import chunks
+from board import Board, PLAYING
+from chunks import ChunkedBoard, CHUNK_SIZE
+
+def naive_neighbours(rows, columns, index):
+    row, column = divmod(index, columns)
+    return [i * columns + j
+            for i in range(max(0, row - 1), min(rows, row + 2))
+            for j in range(max(0, column - 1), min(columns, column + 2))
+            if (i, j) != (row, column)]
+
+def random_chunked_board(rng):
+    """
+    Returns a ChunkedBoard a few chunks across, sized so its last row and column of chunks are cut short.
+    """
+    rows = rng.randint(1, 3) * CHUNK_SIZE + rng.randint(1, CHUNK_SIZE - 1)
+    columns = rng.randint(1, 3) * CHUNK_SIZE + rng.randint(1, CHUNK_SIZE - 1)
+    mines = rng.randint(1, rows * columns // 5)
+    return ChunkedBoard(rows, columns, mines, random.Random(rng.getrandbits(32)), rng.choice([0, 1, 2]))
+
+class TestChunkedBoard (unittest.TestCase):
+    def setUp(self):
+        self.max_live_chunks = chunks.MAX_LIVE_CHUNKS
+        chunks.MAX_LIVE_CHUNKS = 2
+
+    def tearDown(self):
+        chunks.MAX_LIVE_CHUNKS = self.max_live_chunks
+
+    def test_counts_match_naive(self):
+        rng = random.Random(1)
+        for trial in range(10):
+            board = random_chunked_board(rng)
+            rows, columns = board.get_rows(), board.get_columns()
+            first = rng.randrange(rows * columns)
+            board.reveal(*board.coordinates(first))
+            mines = {index for index in range(rows * columns) if board.is_mine(index)}
+            self.assertEqual(len(mines), board.get_bomb_count())
+            self.assertLessEqual(set(board.get_mines()), mines) # unplayed chunks were dropped
+            self.assertFalse(any(index in mines for index in board.get_safe_zone(first)))
+            for index in range(rows * columns):
+                expected = sum(1 for adj in naive_neighbours(rows, columns, index) if adj in mines)
+                self.assertEqual(board.get_count(index), expected)
+            self.assertLessEqual(board.get_live_chunk_count(), chunks.MAX_LIVE_CHUNKS)
+
+    def test_mines_of_every_held_chunk(self):
+        chunks.MAX_LIVE_CHUNKS = self.max_live_chunks
+        rng = random.Random(3)
+        for trial in range(10):
+            board = random_chunked_board(rng)
+            size = board.get_rows() * board.get_columns()
+            board.reveal(*board.coordinates(rng.randrange(size)))
+            mines = {index for index in range(size) if board.is_mine(index)}
+            self.assertEqual(sorted(board.get_mines()), sorted(mines))
+
+    def test_play_matches_board(self):
+        rng = random.Random(2)
+        for trial in range(10):
+            chunked = random_chunked_board(rng)
+            rows, columns = chunked.get_rows(), chunked.get_columns()
+            size = rows * columns
+            # flags placed before the first click must survive the mines being placed
+            early_flags = rng.sample(range(size), 3)
+            for index in early_flags:
+                chunked.toggle_flag(*chunked.coordinates(index))
+            first = rng.choice([index for index in range(size) if index not in early_flags])
+            chunked.reveal(*chunked.coordinates(first))
+            mines = sorted(index for index in range(size) if chunked.is_mine(index))
+            board = Board(rows, columns, len(mines), None, chunked.get_safe_radius(), lambda board, index: mines)
+            for index in early_flags:
+                board.toggle_flag(*board.coordinates(index))
+            board.reveal(*board.coordinates(first))
+            stored = 0
+            for move in range(60):
+                if board.get_status() != PLAYING:
+                    break
+                row, column = divmod(rng.randrange(size), columns)
+                if rng.random() < 0.3:
+                    board.toggle_flag(row, column)
+                    chunked.toggle_flag(row, column)
+                elif not board.is_mine(board.index(row, column)) or rng.random() < 0.05:
+                    self.assertEqual(sorted(chunked.reveal(row, column)), sorted(board.reveal(row, column)))
+                stored = max(stored, chunked.get_stored_chunk_count())
+                self.assertEqual(chunked.get_status(), board.get_status())
+                self.assertEqual(chunked.get_revealed_count(), board.get_revealed_count())
+                self.assertEqual(chunked.get_flag_count(), board.get_flag_count())
+                self.assertEqual(chunked.get_correct_flag_count(), board.get_correct_flag_count())
+            self.assertGreater(stored, 0) # chunks were evicted with play on them and read back
+            for index in range(size):
+                self.assertEqual(chunked.is_revealed(index), board.is_revealed(index))
+                self.assertEqual(chunked.is_flagged(index), board.is_flagged(index))
+            self.assertEqual(sorted(chunked.get_revealed()), sorted(board.get_revealed()))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,103 @@
+"""
+No-guess generation and the BoardPool's keys: the mine bitmask encoding, the mirror symmetry that lets
+one stored board serve four first clicks, the order boards are filled in, and the cache file. Run with
+python -m unittest (or pytest) from the repository root.
+"""
+import os
+import random
+import tempfile
+import unittest
+from generator import (BoardPool, generate_no_guess, solve_from, encode_mines, decode_mines, _symmetries, _flip,
+                       NO_GUESS_SAFE_RADIUS)
+
+class TestEncoding (unittest.TestCase):
+    def test_mines_round_trip(self):
+        rng = random.Random(1)
+        for trial in range(200):
+            size = rng.randint(1, 2000)
+            mines = sorted(rng.sample(range(size), rng.randint(0, size)))
+            data = encode_mines(size, mines)
+            self.assertEqual(len(data), (size + 7) // 8)
+            self.assertEqual(decode_mines(data), mines)
+
+class TestSymmetry (unittest.TestCase):
+    def test_mirror_images_share_a_key(self):
+        for rows, columns in [(9, 9), (16, 16), (16, 30), (1, 5), (4, 1)]:
+            for row in range(rows):
+                for column in range(columns):
+                    canonical_row, canonical_column, flip_rows, flip_columns = _symmetries(rows, columns, row, column)
+                    self.assertLessEqual(canonical_row, (rows - 1) // 2)
+                    self.assertLessEqual(canonical_column, (columns - 1) // 2)
+                    mirrored = _symmetries(rows, columns, rows - 1 - row, columns - 1 - column)
+                    self.assertEqual(mirrored[:2], (canonical_row, canonical_column))
+                    # flipping the canonical cell back gives the clicked one
+                    back = _flip(rows, columns, [canonical_row * columns + canonical_column], flip_rows, flip_columns)
+                    self.assertEqual(back, [row * columns + column])
+
+    def test_flipped_board_is_solvable_from_the_mirrored_click(self):
+        rows, columns, mines = 9, 9, 10
+        rng = random.Random(2)
+        for first in [0, 4, 10, 40]:
+            layout = generate_no_guess(rows, columns, mines, first, rng=rng)
+            self.assertIsNotNone(layout)
+            self.assertTrue(solve_from(rows, columns, layout, first)[0])
+            row, column = divmod(first, columns)
+            for flip_rows, flip_columns in [(True, False), (False, True), (True, True)]:
+                clicked_row = rows - 1 - row if flip_rows else row
+                clicked_column = columns - 1 - column if flip_columns else column
+                flipped = _flip(rows, columns, layout, flip_rows, flip_columns)
+                self.assertTrue(solve_from(rows, columns, flipped, clicked_row * columns + clicked_column)[0])
+
+class TestBoardPool (unittest.TestCase):
+    def store(self, pool, rows, columns, layout, first_index):
+        """
+        Puts a board into the pool under the key of its (canonical) first click.
+        """
+        key = (rows, columns, len(layout), NO_GUESS_SAFE_RADIUS, first_index)
+        pool._boards.setdefault(key, []).append(encode_mines(rows * columns, layout))
+
+    def test_take_serves_every_mirror_image(self):
+        rows, columns, mines = 9, 30, 30
+        layout = generate_no_guess(rows, columns, mines, 2 * columns + 3, rng=random.Random(3))
+        pool = BoardPool(None)
+        for row, column in [(2, 3), (6, 3), (2, 26), (6, 26)]:
+            self.store(pool, rows, columns, layout, 2 * columns + 3)
+            taken = pool.take(rows, columns, mines, row * columns + column)
+            self.assertEqual(len(taken), mines)
+            self.assertTrue(solve_from(rows, columns, taken, row * columns + column)[0])
+        self.assertIsNone(pool.take(rows, columns, mines, 2 * columns + 3))
+        self.assertEqual(pool.get_ready_count(rows, columns, mines), 0)
+
+    def test_fill_order(self):
+        rows, columns, mines = 16, 30, 99
+        pool = BoardPool(None)
+        pool._submit = lambda: None # order only; start no worker processes
+        pool.fill(rows, columns, mines)
+        wanted = [divmod(key[4], columns) for key in pool._wanted]
+        self.assertEqual(len(wanted), 8 * 15) # one key per cell of a quadrant
+        self.assertEqual(set(wanted[:2]), {(7, 14), (0, 0)}) # the centre and the corner first
+        # a first click the player used comes first from then on
+        pool.take(rows, columns, mines, 3 * columns + 5)
+        self.assertEqual(divmod(pool._wanted[0][4], columns), (3, 5))
+        pool.fill(rows, columns, mines)
+        self.assertEqual(divmod(pool._wanted[0][4], columns), (3, 5))
+
+    def test_cache_round_trip(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'boards')
+            pool = BoardPool(path)
+            rng = random.Random(4)
+            for rows, columns, mines in [(9, 9, 10), (16, 16, 40)]:
+                for first in range(3):
+                    layout = sorted(rng.sample(range(rows * columns), mines))
+                    self.store(pool, rows, columns, layout, first)
+            pool._save()
+            loaded = BoardPool(path)
+            self.assertEqual(loaded._boards, pool._boards)
+            # a damaged file is ignored
+            with open(path, 'r+b') as file:
+                file.write(b'XXXX')
+            self.assertEqual(BoardPool(path)._boards, {})
+
+if __name__ == '__main__':
+    unittest.main()
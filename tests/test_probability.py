@@ -0,0 +1,80 @@
+"""
+The ProbabilityEngine against brute force: on small seeded boards, every mine arrangement consistent
+with the revealed numbers and the mine count is enumerated, and each hidden cell's share of them must
+match the engine's probability. Run with python -m unittest (or pytest) from the repository root.
+"""
+import itertools
+import random
+import unittest
+from board import Board, PLAYING
+from probability import ProbabilityEngine
+
+def brute_force(board):
+    """
+    Returns a dict of hidden cell -> probability of being a mine, counting every arrangement of the
+    board's mines over the hidden cells that agrees with all revealed numbers (None if none does).
+    """
+    size = board.get_rows() * board.get_columns()
+    hidden = [i for i in range(size) if not board.is_revealed(i)]
+    numbers = [(i, board.get_count(i), board.get_adjacent_indices(i)) for i in range(size) if board.is_revealed(i)]
+    counts = dict.fromkeys(hidden, 0)
+    total = 0
+    for mines in itertools.combinations(hidden, board.get_bomb_count()):
+        mines = set(mines)
+        if all(sum(1 for adj in adjacent if adj in mines) == count for i, count, adjacent in numbers):
+            total += 1
+            for cell in mines:
+                counts[cell] += 1
+    if total == 0:
+        return None
+    return {cell: count / total for cell, count in counts.items()}
+
+def small_boards(seed, trials):
+    """
+    Yields seeded boards in play with few enough hidden cells to enumerate, after one or more reveals.
+    """
+    rng = random.Random(seed)
+    made = 0
+    while made < trials:
+        rows = rng.randint(3, 5)
+        columns = rng.randint(3, 6)
+        board = Board(rows, columns, rng.randint(2, 6), random.Random(rng.getrandbits(32)))
+        board.reveal(rng.randrange(rows), rng.randrange(columns))
+        engine = ProbabilityEngine(board)
+        while board.get_status() == PLAYING:
+            hidden = [i for i in range(rows * columns) if not board.is_revealed(i)]
+            if len(hidden) <= 18:
+                made += 1
+                yield (board, engine)
+            safe = [i for i in hidden if not board.is_mine(i)]
+            board.reveal(*board.coordinates(rng.choice(safe)))
+
+class TestAgainstBruteForce (unittest.TestCase):
+    def test_probabilities_match_enumeration(self):
+        for board, engine in small_boards(8, 150):
+            expected = brute_force(board)
+            probabilities, other = engine.compute()
+            for cell, probability in expected.items():
+                if cell in probabilities:
+                    self.assertAlmostEqual(probabilities[cell], probability, places=9)
+                else:
+                    self.assertIsNotNone(other)
+                    self.assertAlmostEqual(other, probability, places=9)
+
+    def test_no_other_cells(self):
+        # every hidden cell borders a number: there is no off-frontier probability
+        board = Board(1, 3, 1, random.Random(1))
+        board.reveal(0, 1)
+        probabilities, other = ProbabilityEngine(board).compute()
+        self.assertIsNone(other)
+        self.assertEqual(probabilities, {0: 0.5, 2: 0.5})
+
+    def test_probabilities_sum_to_mine_count(self):
+        for board, engine in small_boards(9, 50):
+            probabilities, other = engine.compute()
+            hidden = [i for i in range(board.get_rows() * board.get_columns()) if not board.is_revealed(i)]
+            total = sum(probabilities[i] if i in probabilities else other for i in hidden)
+            self.assertAlmostEqual(total, board.get_bomb_count(), places=9)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,112 @@
+"""
+Recording and playback: games recorded with a Recorder are read back from the archive and replayed onto
+fresh boards, the index is rebuilt when it is missing or out of date, and an archive cut short still
+gives up the games before the damage. Run with python -m unittest (or pytest) from the repository root.
+"""
+import os
+import random
+import tempfile
+import unittest
+from board import Board
+from history import History
+from replay import Recorder, ReplayArchive, play_headless, REVEAL, FLAG, UNDO, REDO
+
+def record_game(path, rng, with_layout=False):
+    """
+    Plays a random game (flags, reveals and now and then an undo or redo), recording it to the archive
+    at path, and returns the board's final states.
+    """
+    rows, columns = rng.randint(2, 20), rng.randint(2, 20)
+    mines = rng.randint(1, rows * columns // 4 + 1)
+    seed = rng.getrandbits(32)
+    layout = sorted(rng.sample(range(rows * columns), mines)) if with_layout else None
+    generator = (lambda board, index: layout) if with_layout else None
+    board = Board(rows, columns, mines, random.Random(seed), 0, generator)
+    history = History(board)
+    recorder = Recorder(path, rows, columns, mines, 0, seed)
+    if with_layout:
+        recorder.set_layout(layout)
+    for move in range(40):
+        if board.is_over():
+            break
+        roll = rng.random()
+        # like the game, only undos and redos that did something are recorded
+        if roll < 0.1:
+            if history.undo():
+                recorder.record(UNDO, 0, 0)
+        elif roll < 0.15:
+            if history.redo():
+                recorder.record(REDO, 0, 0)
+        else:
+            row, column = rng.randrange(rows), rng.randrange(columns)
+            if roll < 0.35:
+                board.toggle_flag(row, column)
+                recorder.record(FLAG, row, column)
+            else:
+                board.reveal(row, column)
+                recorder.record(REVEAL, row, column)
+            history.checkpoint()
+    recorder.finish()
+    return board.get_states()
+
+class TestArchive (unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, 'replays')
+        rng = random.Random(1)
+        self.expected = [record_game(self.path, rng, with_layout=game % 3 == 0) for game in range(30)]
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def assert_replays(self, archive):
+        self.assertEqual(len(archive), len(self.expected))
+        for replay, states in zip(archive, self.expected):
+            self.assertEqual(play_headless(replay).get_states(), states)
+
+    def test_round_trip(self):
+        with ReplayArchive(self.path) as archive:
+            self.assert_replays(archive)
+            self.assertEqual(play_headless(archive[7]).get_states(), self.expected[7])
+            self.assertEqual(archive.get_unreadable_size(), 0)
+
+    def test_missing_index_is_rebuilt(self):
+        with open(self.path + '.idx', 'rb') as index:
+            data = index.read()
+        os.remove(self.path + '.idx')
+        with ReplayArchive(self.path) as archive:
+            self.assert_replays(archive)
+        with open(self.path + '.idx', 'rb') as index:
+            self.assertEqual(index.read(), data)
+
+    def test_stale_index_is_rebuilt(self):
+        with open(self.path + '.idx', 'r+b') as index:
+            index.truncate(5 * 8) # an index missing the last games
+        with ReplayArchive(self.path) as archive:
+            self.assert_replays(archive)
+
+    def test_damaged_tail(self):
+        size = os.path.getsize(self.path)
+        record_game(self.path, random.Random(2))
+        last = os.path.getsize(self.path) - size
+        with open(self.path, 'r+b') as file:
+            file.truncate(size + last // 2) # the last game was cut short
+        os.remove(self.path + '.idx')
+        with ReplayArchive(self.path) as archive:
+            self.assert_replays(archive)
+            self.assertEqual(archive.get_unreadable_size(), last // 2)
+        with open(self.path, 'ab') as file:
+            file.write(b'not a replay record at all')
+        os.remove(self.path + '.idx')
+        with ReplayArchive(self.path) as archive:
+            self.assert_replays(archive)
+
+    def test_empty_archive(self):
+        path = os.path.join(self.directory.name, 'empty')
+        open(path, 'wb').close()
+        with ReplayArchive(path) as archive:
+            self.assertEqual(len(archive), 0)
+            self.assertEqual(archive.get_unreadable_size(), 0)
+
+if __name__ == '__main__':
+    unittest.main()
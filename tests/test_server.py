@@ -0,0 +1,97 @@
+"""
+The game server's request handling, driven through GameServer.handle and handle_line without a socket:
+a game played to the end, and every kind of bad request getting an error response instead of an
+exception. Run with python -m unittest (or pytest) from the repository root.
+"""
+import json
+import random
+import unittest
+from board import PLAYING, LOST
+from server import GameServer, MAX_CELLS
+
+class TestServer (unittest.TestCase):
+    def setUp(self):
+        self.server = GameServer(rng=random.Random(1))
+
+    def new_game(self, **fields):
+        response = self.server.handle(dict(op='new', **fields))
+        self.assertNotIn('error', response)
+        return response['session']
+
+    def assert_error(self, request, text):
+        response = self.server.handle(request)
+        self.assertIn('error', response)
+        self.assertIn(text, response['error'])
+
+    def test_play(self):
+        session = self.new_game(preset='easy', id=5)
+        view = self.server.handle({'op': 'view', 'session': session})
+        self.assertEqual(view['cells'], '-' * 81)
+        response = self.server.handle({'op': 'reveal', 'session': session, 'row': 4, 'column': 4, 'id': 'a'})
+        self.assertEqual(response['id'], 'a')
+        self.assertIn(4 * 9 + 4, response['revealed'])
+        self.assertEqual(len(response['counts']), len(response['revealed']))
+        response = self.server.handle({'op': 'flag', 'session': session, 'row': 0, 'column': 0})
+        self.assertEqual(response['flagged'], 'F' == self.server.handle({'op': 'view', 'session': session})['cells'][0])
+        self.assertEqual(self.server.handle({'op': 'close', 'session': session}), {'closed': True})
+        self.assertEqual(self.server.get_session_count(), 0)
+
+    def test_only_the_losing_reveal_gives_the_mines(self):
+        # one row of four cells and one mine, seeded so that the first click leaves the game going: the
+        # mine is just past the revealed cells
+        session = self.new_game(rows=1, columns=4, mines=1, seed=1)
+        response = self.server.handle({'op': 'reveal', 'session': session, 'row': 0, 'column': 0})
+        self.assertEqual(response['status'], PLAYING)
+        self.assertNotIn('mines', response)
+        mine = max(response['revealed']) + 1
+        response = self.server.handle({'op': 'reveal', 'session': session, 'row': 0, 'column': mine})
+        self.assertEqual(response['status'], LOST)
+        self.assertEqual(response['mine'], mine)
+        self.assertEqual(response['mines'], [mine])
+        response = self.server.handle({'op': 'reveal', 'session': session, 'row': 0, 'column': 3})
+        self.assertEqual(response['status'], LOST)
+        self.assertNotIn('mine', response)
+        self.assertNotIn('mines', response)
+
+    def test_bad_requests(self):
+        self.assert_error({'op': 'explode'}, 'unknown op')
+        self.assert_error({}, 'unknown op')
+        self.assert_error({'op': 'new', 'preset': 'impossible'}, 'unknown preset')
+        self.assert_error({'op': 'new', 'rows': 9, 'columns': 9}, 'missing field')
+        for rows, columns, mines in [(True, 9, 10), (9, 9, False), (0, 9, 0), (9, -1, 0), (9, 9, -1), (9.0, 9, 10), ('9', 9, 10)]:
+            self.assert_error({'op': 'new', 'rows': rows, 'columns': columns, 'mines': mines}, 'positive integers')
+        self.assert_error({'op': 'new', 'rows': 3, 'columns': 3, 'mines': 9}, 'not a mine')
+        for radius in [-1, True, 1.5, '1']:
+            self.assert_error({'op': 'new', 'preset': 'easy', 'safe_radius': radius}, 'safe_radius')
+        self.assert_error({'op': 'new', 'rows': MAX_CELLS, 'columns': 2, 'mines': 1}, 'limited')
+        session = self.new_game(preset='easy')
+        for row, column in [(9, 0), (0, -1), ('0', 0), (0, None), (True, 0)]:
+            self.assert_error({'op': 'reveal', 'session': session, 'row': row, 'column': column}, 'no cell')
+        self.assert_error({'op': 'flag', 'session': session, 'row': 0}, 'missing field')
+        self.assert_error({'op': 'reveal', 'session': session + 1, 'row': 0, 'column': 0}, 'no session')
+        self.assert_error({'op': 'view'}, 'missing field')
+        self.assert_error({'op': 'close', 'session': session + 1, 'id': 3}, 'no session')
+        self.assertEqual(self.server.handle({'op': 'close', 'session': [], 'id': 3})['id'], 3)
+        self.assertEqual(self.server.get_session_count(), 1)
+
+    def test_bad_lines(self):
+        self.assertIn('not valid JSON', json.loads(self.server.handle_line(b'{"op": ')).get('error'))
+        self.assertIn('JSON object', json.loads(self.server.handle_line(b'[1, 2]')).get('error'))
+        self.assertIn('unknown op', json.loads(self.server.handle_line(b'{"op": 1}')).get('error'))
+        response = json.loads(self.server.handle_line(b'{"op": "stats", "id": 9}'))
+        self.assertEqual((response['id'], response['sessions']), (9, 0))
+
+    def test_limits(self):
+        server = GameServer(idle_timeout=-1.0, max_sessions=2)
+        for game in range(5):
+            self.assertNotIn('error', server.handle({'op': 'new', 'preset': 'easy'}))
+        # a full server dropped the idle sessions to make room each time
+        self.assertEqual(server.expire_idle(), 1)
+        self.assertEqual(server.get_session_count(), 0)
+        server = GameServer(idle_timeout=300.0, max_sessions=2)
+        server.handle({'op': 'new', 'preset': 'easy'})
+        server.handle({'op': 'new', 'preset': 'easy'})
+        self.assertIn('too many sessions', server.handle({'op': 'new', 'preset': 'easy'})['error'])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,107 @@
+"""
+Deductions of the incremental Solver: hand-made positions that need the subset and overlap rules, and
+seeded random games in which every move it calls certain must be right. Run with python -m unittest
+(or pytest) from the repository root.
+"""
+import random
+import unittest
+from board import Board, REVEALED, WON, LOST
+from solver import Solver
+
+def position(rows, columns, mines, revealed):
+    """
+    Returns a board with the given mines and the given cells revealed.
+    """
+    board = Board(rows, columns, len(mines))
+    board.set_mines(mines)
+    states = bytearray(board.get_states())
+    for index in revealed:
+        states[index] |= REVEALED
+    board.set_states(bytes(states))
+    return board
+
+class TestDeductions (unittest.TestCase):
+    def test_subset_rule(self):
+        # a b c      hidden, with the mine at b
+        # 1 1 1      each number sees two or three of a, b, c; no single one decides anything
+        # 0 0 0
+        board = position(3, 3, [1], range(3, 9))
+        solver = Solver(board)
+        solver.solve()
+        # {a, b} holds 1 and is inside {a, b, c} holding 1, so c is safe; then {b, c} holding 1 makes b a mine
+        self.assertEqual(solver.get_safe_cells(), {0, 2})
+        self.assertEqual(solver.get_mine_cells(), {1})
+
+    def test_overlap_rule(self):
+        # x1 x2 x3 x4    hidden, mines at x3 and x4
+        # y1 y2 y3 y4    y2 and y3 revealed, mine at y4
+        board = position(2, 4, [2, 3, 7], [5, 6])
+        solver = Solver(board)
+        self.assertEqual(solver.get_constraint(5), ({0, 1, 2, 4}, 1))
+        self.assertEqual(solver.get_constraint(6), ({1, 2, 3, 7}, 3))
+        solver.solve()
+        # neither constraint contains the other, but x2 and x3 can hold at most one mine, so the other
+        # two cells of y3 are mines, and at least one, so the other two cells of y2 are safe
+        self.assertEqual(solver.get_safe_cells(), {0, 4})
+        self.assertEqual(solver.get_mine_cells(), {3, 7})
+
+    def test_undecidable_position(self):
+        # one mine between two cells that only a guess can tell apart
+        board = position(2, 2, [0], [2, 3])
+        solver = Solver(board)
+        self.assertIsNone(solver.next_move())
+        self.assertEqual(solver.get_safe_cells(), set())
+
+    def test_player_flags_are_not_trusted(self):
+        board = position(3, 3, [1], range(3, 9))
+        board.toggle_flag(0, 0) # a wrong flag on a safe cell
+        solver = Solver(board)
+        solver.solve()
+        self.assertEqual(solver.get_safe_cells(), {0, 2})
+        self.assertEqual(solver.get_mine_cells(), {1})
+
+    def test_moves_until_done(self):
+        board = position(3, 3, [1], range(3, 9))
+        solver = Solver(board)
+        played = set()
+        move = solver.next_move()
+        while move is not None:
+            played.add(move)
+            action, index = move
+            if action == 'flag':
+                board.toggle_flag(*board.coordinates(index))
+            else:
+                board.reveal(*board.coordinates(index))
+            move = solver.next_move()
+        # each certain move is offered until played, and then no more
+        self.assertEqual(played, {('reveal', 0), ('reveal', 2), ('flag', 1)})
+        self.assertEqual(board.get_status(), WON)
+
+class TestRandomGames (unittest.TestCase):
+    def test_certain_moves_are_right(self):
+        rng = random.Random(7)
+        for trial in range(100):
+            rows = rng.randint(4, 16)
+            columns = rng.randint(4, 30)
+            board = Board(rows, columns, rng.randint(1, rows * columns // 4), random.Random(rng.getrandbits(32)), 1)
+            solver = Solver(board)
+            board.reveal(rows // 2, columns // 2)
+            while not board.is_over():
+                move = solver.next_move()
+                if move is None:
+                    # guess a safe cell so the game goes on
+                    safe = [i for i in range(rows * columns) if not board.is_revealed(i) and not board.is_mine(i)
+                            and not board.is_flagged(i)]
+                    move = ('reveal', rng.choice(safe))
+                action, index = move
+                if action == 'flag':
+                    self.assertTrue(board.is_mine(index))
+                    board.toggle_flag(*board.coordinates(index))
+                else:
+                    self.assertFalse(board.is_mine(index))
+                    board.reveal(*board.coordinates(index))
+            self.assertNotEqual(board.get_status(), LOST)
+            self.assertTrue(solver.get_mine_cells() <= set(board.get_mines()))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,95 @@
+"""
+The statistics store: games recorded through the writer thread, the totals kept alongside them, best
+times and percentiles against a sorted list, and a store whose writer cannot open the database. Run with
+python -m unittest (or pytest) from the repository root.
+"""
+import contextlib
+import io
+import os
+import random
+import sqlite3
+import tempfile
+import threading
+import unittest
+from unittest import mock
+import stats
+from ioerrors import get_write_error_count
+from stats import StatsStore, game_row, setup_name
+
+class TestStatsStore (unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, 'stats.db')
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_setup_names(self):
+        self.assertEqual(setup_name(16, 30, 99), 'hard')
+        self.assertEqual(setup_name(20, 20, 50), '20x20/50')
+
+    def test_record_and_query(self):
+        store = StatsStore(self.path, batch_size=7)
+        rng = random.Random(1)
+        durations = {'easy': [], '20x20/50': []}
+        games = {'easy': 0, '20x20/50': 0}
+        for game in range(300):
+            rows, columns, mines = rng.choice([(9, 9, 10), (20, 20, 50)])
+            won = rng.random() < 0.6
+            duration = rng.randint(1000, 100000)
+            setup = setup_name(rows, columns, mines)
+            games[setup] += 1
+            if won:
+                durations[setup].append(duration)
+            if game % 2 == 0:
+                store.record(rows, columns, mines, won, duration)
+            else:
+                store.record_many([game_row(rows, columns, mines, won, duration)])
+        store.record_many([game_row(9, 9, 10, True, 1, player='solver')] * 5)
+        store.record_many([])
+        store.flush()
+        for setup in durations:
+            wins = sorted(durations[setup])
+            self.assertEqual(store.get_totals(setup), (games[setup], len(wins)))
+            self.assertAlmostEqual(store.get_win_rate(setup), len(wins) / games[setup])
+            self.assertEqual(store.get_best_time(setup), wins[0])
+            for percent in [0, 10, 50, 90, 99, 100]:
+                self.assertEqual(store.get_percentile(setup, percent), wins[min(len(wins) - 1, len(wins) * percent // 100)])
+        self.assertEqual(store.get_totals('easy', 'solver'), (5, 5))
+        self.assertEqual(store.get_totals('hard'), (0, 0))
+        self.assertIsNone(store.get_best_time('hard'))
+        self.assertIsNone(store.get_percentile('hard', 50))
+        self.assertEqual(store.get_players(), ['human', 'solver'])
+        self.assertEqual(sorted(store.get_summary()), sorted((setup, games[setup], len(durations[setup]), store.get_best_time(setup),
+                                                             store.get_percentile(setup, 50), store.get_percentile(setup, 90)) for setup in games))
+        self.assertEqual([row[1] for row in store.get_summary()], sorted(games.values(), reverse=True)) # the most played first
+        self.assertEqual(store.get_dropped_count(), 0)
+        store.record(9, 9, 10, True, 500)
+        store.close() # writes what is still queued
+        store = StatsStore(self.path)
+        self.assertEqual(store.get_best_time('easy'), 500)
+        self.assertEqual(store.get_totals('easy')[0], games['easy'] + 1)
+        store.close()
+
+    def test_writer_that_cannot_open_the_database(self):
+        connect = sqlite3.connect
+        def failing_connect(*args, **kwargs):
+            if threading.current_thread().name == 'stats-writer':
+                raise sqlite3.OperationalError('unable to open database file')
+            return connect(*args, **kwargs)
+        failures = get_write_error_count('statistics')
+        with mock.patch.object(stats.sqlite3, 'connect', failing_connect), contextlib.redirect_stderr(io.StringIO()):
+            store = StatsStore(self.path)
+            store.record(9, 9, 10, True, 500)
+            store.record_many([game_row(9, 9, 10, False, 700)] * 3)
+            store.flush() # must not wait forever on the writer
+            self.assertEqual(store.get_dropped_count(), 4)
+            store.record(9, 9, 10, True, 500)
+            store.flush()
+            self.assertEqual(store.get_dropped_count(), 5)
+            self.assertEqual(store.get_totals('easy'), (0, 0))
+            store.close()
+        self.assertEqual(get_write_error_count('statistics'), failures + 1)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,156 @@
+"""
+The Timer with a fake clock and stand-ins for the Tk window and label (no display is needed): elapsed
+time, when the label is updated, pausing while the window is minimized, and leaving the window's own
+bindings alone when stopped. Run with python -m unittest (or pytest) from the repository root.
+"""
+import unittest
+from unittest import mock
+import stopwatch
+from stopwatch import Timer
+
+class FakeClock ():
+    def __init__(self) -> None:
+        self.now = 5000000000
+
+    def perf_counter_ns(self):
+        return self.now
+
+    def advance(self, ms):
+        self.now += ms * 1000000
+
+class FakeLabel (dict):
+    """
+    A label that keeps its options and the one update scheduled on it.
+    """
+    def __init__(self, root, **options) -> None:
+        super().__init__(options)
+        self.scheduled = {} # id -> (delay in ms, function)
+        self.ids = 0
+
+    def after(self, delay, function):
+        self.ids += 1
+        self.scheduled[self.ids] = (delay, function)
+        return self.ids
+
+    def after_cancel(self, id):
+        del self.scheduled[id]
+
+class FakeRoot ():
+    """
+    A window with bind tags and class bindings, as far as the timer uses them.
+    """
+    def __init__(self) -> None:
+        self.tags = ('.', 'Tk', 'all')
+        self.class_bindings = {} # (tag, sequence) -> funcid
+        self.commands = set()
+
+    def bindtags(self, tags=None):
+        if tags is None:
+            return self.tags
+        self.tags = tuple(tags)
+
+    def bind_class(self, tag, sequence, function):
+        funcid = f'{id(function)}{sequence}'
+        self.class_bindings[(tag, sequence)] = function
+        self.commands.add(funcid)
+        return funcid
+
+    def unbind_class(self, tag, sequence):
+        del self.class_bindings[(tag, sequence)]
+
+    def deletecommand(self, funcid):
+        self.commands.remove(funcid)
+
+class TestTimer (unittest.TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        patches = [mock.patch.object(stopwatch, 'time', self.clock), mock.patch.object(stopwatch.tk, 'Label', FakeLabel)]
+        for patch in patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+        self.root = FakeRoot()
+        self.root.class_bindings[('.', '<Map>')] = 'the window\'s own binding'
+        self.timer = Timer(self.root)
+        self.label = self.timer.get_label()
+
+    def run_tick(self):
+        """
+        Moves the clock to the scheduled label update and runs it. Returns its delay in milliseconds.
+        """
+        self.assertEqual(len(self.label.scheduled), 1)
+        id, (delay, function) = self.label.scheduled.popitem()
+        self.clock.advance(delay)
+        function()
+        return delay
+
+    def event(self, sequence):
+        self.root.class_bindings[(self.root.tags[0], sequence)](None)
+
+    def test_elapsed_and_ticks(self):
+        self.assertEqual(self.timer.get_elapsed(), 0)
+        self.assertFalse(self.timer.is_active())
+        self.timer.start()
+        self.assertTrue(self.timer.is_active())
+        self.assertEqual(self.label['text'], '00:00')
+        self.clock.advance(250)
+        self.assertEqual(self.timer.get_elapsed_ms(), 250)
+        self.assertEqual(self.run_tick(), 1000) # scheduled when started
+        self.assertEqual(self.label['text'], '00:01')
+        self.assertEqual(self.run_tick(), 750) # just as the second turns over
+        self.assertEqual(self.label['text'], '00:02')
+        # an update that runs late does not delay the ones after it
+        delay, function = self.label.scheduled.popitem()[1]
+        self.clock.advance(delay + 40)
+        function()
+        self.assertEqual(self.label['text'], '00:03')
+        self.assertEqual(self.run_tick(), 960)
+        for second in range(61):
+            self.run_tick()
+        self.assertEqual(self.label['text'], '01:05')
+        self.assertIsNone(self.timer.get_final_time())
+
+    def test_resumed_start(self):
+        self.timer.start(65.25)
+        self.assertEqual(self.label['text'], '01:05')
+        self.assertEqual(self.timer.get_elapsed_ms(), 65250)
+        self.assertEqual(self.run_tick(), 750)
+
+    def test_paused_while_minimized(self):
+        self.timer.start()
+        self.clock.advance(3500)
+        self.event('<Unmap>')
+        self.assertEqual(self.label.scheduled, {}) # no updates while minimized
+        self.clock.advance(60000)
+        self.assertEqual(self.timer.get_elapsed_ms(), 3500)
+        self.event('<Map>')
+        self.assertEqual(self.timer.get_elapsed_ms(), 3500)
+        self.assertEqual(self.label['text'], '00:03')
+        self.assertEqual(self.run_tick(), 500)
+        self.clock.advance(100)
+        self.event('<Unmap>')
+        self.clock.advance(5000)
+        self.timer.stop() # stopped while minimized: the minimized time is not counted
+        self.assertEqual(self.timer.get_final_time(), ('00', '04', '100'))
+        self.assertFalse(self.timer.is_active())
+
+    def test_stop(self):
+        self.timer.start()
+        self.assertEqual(len(self.root.tags), 4)
+        self.clock.advance(125042)
+        self.timer.stop()
+        self.clock.advance(9000)
+        self.assertEqual(self.timer.get_final_time(), ('02', '05', '042'))
+        self.assertEqual(self.label.scheduled, {})
+        # only the timer's own tag and bindings are removed
+        self.assertEqual(self.root.tags, ('.', 'Tk', 'all'))
+        self.assertEqual(self.root.class_bindings, {('.', '<Map>'): 'the window\'s own binding'})
+        self.assertEqual(self.root.commands, set())
+        # a restarted timer binds again, once
+        self.timer.start()
+        self.timer.start()
+        self.assertEqual(len(self.root.tags), 4)
+        self.assertEqual(len(self.root.commands), 2)
+        self.assertEqual(len(self.label.scheduled), 1)
+
+if __name__ == '__main__':
+    unittest.main()
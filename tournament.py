@@ -0,0 +1,292 @@
+"""
+Plays player strategies against each other on identical boards. Each difficulty preset gets a board set
+fixed by the tournament seed, and every entrant plays every board in it, so differences in win rate come
+from the strategies rather than from luck of the draw. An entrant is a strategy from players.STRATEGIES,
+optionally with a first-click policy from players.OPENINGS after an '@' (e.g. 'probability@corner').
+
+A board is a seeded shuffle of its cells: the mines are the first cells of the shuffle outside the safe
+zone around the first click. Every entrant opening in the same place gets exactly the same mines, and
+the first click is still never a mine. The player's own guesses come from a generator seeded by the
+board and entrant, so results do not depend on how work is split between processes.
+
+Boards are split into chunks that run across a process pool. Each finished chunk is appended to the
+checkpoint file as one JSON line, so a long run can be interrupted and continued later by running the
+same command again: chunks already in the file are not played again.
+
+Example:
+    python tournament.py --boards 10000 --checkpoint results.jsonl
+    python tournament.py --presets hard --entrants solver probability probability@corner --boards 2000
+"""
+import argparse
+import concurrent.futures
+import itertools
+import json
+import math
+import os
+import random
+import time
+from board import Board, PRESETS
+from chunks import CHUNKED_THRESHOLD
+from players import STRATEGIES, OPENINGS
+from simulate import play_game, positive_int
+
+# z score of a 95% confidence interval
+_Z95 = 1.959964
+
+def parse_entrant(entrant):
+    """
+    Returns a tuple of form (strategy, opening) for an entrant name, raising ValueError for unknown names.
+    """
+    strategy, _, opening = entrant.partition('@')
+    opening = opening or 'center'
+    if strategy not in STRATEGIES or opening not in OPENINGS:
+        raise ValueError(f'unknown entrant {entrant!r}')
+    return (strategy, opening)
+
+def default_entrants():
+    """
+    Returns every strategy with every opening.
+    """
+    return [strategy if opening == 'center' else f'{strategy}@{opening}'
+            for strategy in sorted(STRATEGIES) for opening in OPENINGS]
+
+def shuffled_cells(seed, preset, number, size):
+    """
+    Returns the cells of board number of the preset's board set in their seeded order.
+    """
+    cells = list(range(size))
+    random.Random(f'{seed}:{preset}:{number}').shuffle(cells)
+    return cells
+
+def _first_outside(cells, mines):
+    """
+    A private function to return a board generator that takes the first mines cells of the given order
+    lying outside the safe zone of the first click.
+    """
+    def generate(board, first_index):
+        safe = set(board.get_safe_zone(first_index))
+        return list(itertools.islice((index for index in cells if index not in safe), mines))
+    return generate
+
+def wilson_interval(wins, games, z=_Z95):
+    """
+    Returns a tuple of form (low, high) bounding the true win rate given wins out of games, using the
+    Wilson score interval (which stays inside [0, 1] and is sound for rates near 0 or 1).
+    """
+    if games == 0:
+        return (0.0, 1.0)
+    rate = wins / games
+    denominator = 1 + z * z / games
+    centre = (rate + z * z / (2 * games)) / denominator
+    spread = z * math.sqrt(rate * (1 - rate) / games + z * z / (4 * games * games)) / denominator
+    return (max(0.0, centre - spread), min(1.0, centre + spread))
+
+def run_chunk(preset, entrants, seed, chunk, first, count, safe_radius=0):
+    """
+    Plays boards first to first + count - 1 of the preset's board set with every entrant and returns a
+    dict of entrant -> [games, wins, guesses, moves, seconds]. This is the unit of work sent to each
+    worker process.
+    """
+    rows, columns, mines = PRESETS[preset]
+    players = [(entrant, STRATEGIES[strategy], opening) for entrant, (strategy, opening)
+               in zip(entrants, [parse_entrant(entrant) for entrant in entrants])]
+    results = {entrant: [0, 0, 0, 0, 0.0] for entrant in entrants}
+    for number in range(first, first + count):
+        generator = _first_outside(shuffled_cells(seed, preset, number, rows * columns), mines)
+        for entrant, player_class, opening in players:
+            rng = random.Random(f'{seed}:{preset}:{number}:{entrant}')
+            start = time.perf_counter()
+            board = Board(rows, columns, mines, rng, safe_radius, generator)
+            won, moves, guesses = play_game(board, player_class(rng, opening))
+            totals = results[entrant]
+            totals[0] += 1
+            totals[1] += won
+            totals[2] += guesses
+            totals[3] += moves
+            totals[4] += time.perf_counter() - start
+    return results
+
+class TournamentStats ():
+    """
+    Totals of each entrant on each preset, built up a chunk at a time.
+    """
+    def __init__(self) -> None:
+        self._totals = {} # (preset, entrant) -> [games, wins, guesses, moves, seconds]
+
+    def add(self, preset, results):
+        """
+        Adds the results of one chunk (as returned by run_chunk) for the given preset.
+        """
+        for entrant, counts in results.items():
+            totals = self._totals.setdefault((preset, entrant), [0, 0, 0, 0, 0.0])
+            for i in range(len(counts)):
+                totals[i] += counts[i]
+
+    def get_totals(self, preset, entrant):
+        """
+        Returns a tuple of form (games, wins, guesses, moves, seconds).
+        """
+        return tuple(self._totals.get((preset, entrant), (0, 0, 0, 0, 0.0)))
+
+    def get_win_rate(self, preset, entrant):
+        games, wins = self.get_totals(preset, entrant)[:2]
+        return wins / games if games else 0.0
+
+    def report(self, presets, entrants):
+        """
+        Returns a table per preset of every entrant's win rate with its 95% confidence interval, the
+        forced guesses per game and the time per game, the best entrant first.
+        """
+        lines = []
+        for preset in presets:
+            rows, columns, mines = PRESETS[preset]
+            lines.append(f'{preset} ({rows}x{columns}, {mines} mines)')
+            lines.append(f"  {'entrant':<22}{'games':>8}{'win rate':>10}{'95% interval':>18}{'guesses':>9}{'ms/game':>9}")
+            for entrant in sorted(entrants, key=lambda entrant: -self.get_win_rate(preset, entrant)):
+                games, wins, guesses, moves, seconds = self.get_totals(preset, entrant)
+                if games == 0:
+                    continue
+                low, high = wilson_interval(wins, games)
+                interval = f'{100 * low:.2f}-{100 * high:.2f}%'
+                lines.append(f'  {entrant:<22}{games:>8}{100 * wins / games:>9.2f}%{interval:>18}'
+                             f'{guesses / games:>9.2f}{1000 * seconds / games:>9.3f}')
+        return '\n'.join(lines)
+
+class Checkpoint ():
+    """
+    The results file of a tournament: a header line with the settings, then one line per finished chunk.
+    Opening an existing file reads back the chunks it holds; a line cut short by an interruption is dropped.
+    """
+    def __init__(self, path, settings) -> None:
+        self._path = path
+        self._done = {} # (preset, chunk) -> results
+        if os.path.exists(path):
+            self._read(settings)
+        else:
+            with open(path, 'w') as file:
+                file.write(json.dumps(settings) + '\n')
+
+    def _read(self, settings):
+        """
+        A private method to load the chunks of an existing file, which must be for the same settings.
+        """
+        with open(self._path, 'rb') as file:
+            data = file.read()
+        complete = data.rfind(b'\n') + 1 # anything after the last newline was being written when stopped
+        lines = data[:complete].split(b'\n')[:-1]
+        if len(lines) == 0 or json.loads(lines[0]) != settings:
+            raise ValueError(f'{self._path} holds results of a tournament with different settings.')
+        for line in lines[1:]:
+            record = json.loads(line)
+            self._done[(record['preset'], record['chunk'])] = record['results']
+        if complete < len(data):
+            with open(self._path, 'r+b') as file:
+                file.truncate(complete)
+
+    def get_done(self):
+        """
+        Returns a dict of (preset, chunk) -> results of the chunks already finished.
+        """
+        return self._done
+
+    def add(self, preset, chunk, results):
+        """
+        Appends a finished chunk to the file, flushed to disk before returning.
+        """
+        with open(self._path, 'a') as file:
+            file.write(json.dumps({'preset': preset, 'chunk': chunk, 'results': results}) + '\n')
+            file.flush()
+            os.fsync(file.fileno())
+        self._done[(preset, chunk)] = results
+
+def run_tournament(presets, entrants, boards, seed=0, workers=None, chunk_size=50, safe_radius=0, checkpoint=None):
+    """
+    Plays every entrant on the given number of boards of each preset over a process pool and returns a
+    tuple of form (TournamentStats, number of boards played by this run). Given the path of a checkpoint
+    file, finished chunks are saved to it as they complete and chunks already in it are skipped. Raises
+    ValueError for an unknown entrant, or unless boards, chunk_size and workers (when given) are positive.
+    """
+    if boards < 1 or chunk_size < 1 or (workers is not None and workers < 1):
+        raise ValueError('boards, chunk_size and workers must be positive')
+    for entrant in entrants:
+        parse_entrant(entrant)
+    settings = {'presets': list(presets), 'entrants': list(entrants), 'boards': boards, 'seed': seed,
+                'chunk_size': chunk_size, 'safe_radius': safe_radius}
+    saved = Checkpoint(checkpoint, settings) if checkpoint is not None else None
+    done = saved.get_done() if saved is not None else {}
+    stats = TournamentStats()
+    work = []
+    for preset in presets:
+        for chunk in range((boards + chunk_size - 1) // chunk_size):
+            if (preset, chunk) in done:
+                stats.add(preset, done[(preset, chunk)])
+            else:
+                work.append((preset, chunk, chunk * chunk_size, min(chunk_size, boards - chunk * chunk_size)))
+    played = 0
+    def collect(preset, chunk, results):
+        if saved is not None:
+            saved.add(preset, chunk, results)
+        stats.add(preset, results)
+
+    workers = workers or os.cpu_count() or 1
+    if workers == 1:
+        for preset, chunk, first, count in work:
+            collect(preset, chunk, run_chunk(preset, entrants, seed, chunk, first, count, safe_radius))
+            played += count
+        return (stats, played)
+
+    executor = concurrent.futures.ProcessPoolExecutor(max_workers=workers)
+    pending = {} # future -> (preset, chunk, count)
+    try:
+        next_chunk = 0
+        while next_chunk < len(work) or len(pending) > 0:
+            while next_chunk < len(work) and len(pending) < 2 * workers:
+                preset, chunk, first, count = work[next_chunk]
+                future = executor.submit(run_chunk, preset, entrants, seed, chunk, first, count, safe_radius)
+                pending[future] = (preset, chunk, count)
+                next_chunk += 1
+            finished, unfinished = concurrent.futures.wait(pending, return_when=concurrent.futures.FIRST_COMPLETED)
+            for future in finished:
+                preset, chunk, count = pending.pop(future)
+                collect(preset, chunk, future.result())
+                played += count
+    finally:
+        # on an interruption, drop the queued chunks rather than waiting for them; the saved ones stay
+        executor.shutdown(wait=len(pending) == 0, cancel_futures=True)
+    return (stats, played)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Play minesweeper strategies against each other on identical boards.')
+    playable = sorted(preset for preset, (rows, columns, mines) in PRESETS.items() if rows * columns <= CHUNKED_THRESHOLD)
+    parser.add_argument('--presets', nargs='+', choices=playable, default=playable)
+    parser.add_argument('--entrants', nargs='+', metavar='STRATEGY[@OPENING]',
+                        help=f"strategies ({', '.join(sorted(STRATEGIES))}) with an optional opening "
+                             f"({', '.join(OPENINGS)}); default: every combination")
+    parser.add_argument('-n', '--boards', type=positive_int, default=1000, help='boards per preset')
+    parser.add_argument('--seed', type=int, default=0, help='picks the board sets')
+    parser.add_argument('--workers', type=positive_int, help='number of worker processes (default: one per core)')
+    parser.add_argument('--chunk-size', type=positive_int, default=50, help='boards per unit of work')
+    parser.add_argument('--safe-radius', type=int, default=0, help='cells around the first click kept free of mines')
+    parser.add_argument('--checkpoint', metavar='PATH', help='save finished chunks here and resume from them')
+    args = parser.parse_args(argv)
+    entrants = args.entrants or default_entrants()
+    if args.safe_radius < 0:
+        parser.error('--safe-radius cannot be negative')
+
+    start = time.perf_counter()
+    try:
+        stats, played = run_tournament(args.presets, entrants, args.boards, args.seed, args.workers, args.chunk_size,
+                                       args.safe_radius, args.checkpoint)
+    except ValueError as error:
+        parser.error(str(error))
+    except KeyboardInterrupt:
+        if args.checkpoint is not None:
+            print(f'\ninterrupted; run the same command again to continue from {args.checkpoint}')
+        return
+    elapsed = time.perf_counter() - start
+    print(stats.report(args.presets, entrants))
+    print(f'throughput: {played / elapsed if elapsed > 0 else 0:.1f} boards/sec, '
+          f'{played * len(entrants) / elapsed if elapsed > 0 else 0:.1f} games/sec ({played} boards in {elapsed:.2f} s)')
+
+if __name__ == '__main__':
+    main()